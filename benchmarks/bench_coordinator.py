@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Mesure des chemins critiques du coordinateur sur une machine à états
+Home Assistant synthétique (aucune instance Home Assistant en cours ni
+véhicule requis, seul le paquet homeassistant doit être installé) :
+
+    python benchmarks/bench_coordinator.py
+    python benchmarks/bench_coordinator.py --entities 50000 --sessions 5000 --refreshes 200
+
+Pour chaque scénario (nombre d'entités × nombre de sessions d'historique),
+les étapes suivantes sont mesurées :
+
+- startup : construction du coordinateur (sur la boucle d'événements)
+- learning_load : chargement de l'historique et des courbes (en exécuteur)
+- first_refresh : première mise à jour BMW (construction de l'index d'entités)
+- refresh : mise à jour BMW en régime établi (SOC modifié à chaque tour)
+- predict : ChargeLearning.predict_charge_time
+- save : écriture de l'historique compacté (ChargeLearning.async_flush)
+
+Latences en millisecondes (p50/p95/max) ; mémoire mesurée par tracemalloc
+sur un passage séparé : pic transitoire et mémoire retenue par appel.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+from bmw_ix3_plugin.charge_model import MODEL_VERSION, curve_from_sessions  # noqa: E402
+from bmw_ix3_plugin.charge_session import ChargeSession, to_epoch  # noqa: E402
+from bmw_ix3_plugin.coordinator import BMWiX3Coordinator  # noqa: E402
+
+ENTRY_ID = "bench"
+
+# Entités BMW CarData typiques (entity_id, nom amical, état initial)
+CARDATA_ENTITIES = (
+    ("sensor.bmw_ix3_state_of_charge_last_known", "iX3 State of charge (last known)", "42"),
+    ("sensor.bmw_ix3_state_of_charge_predicted", "iX3 State of charge (predicted)", "42"),
+    ("sensor.bmw_ix3_charging_status", "iX3 Charging status", "charging"),
+    ("sensor.bmw_ix3_predicted_charge_speed", "iX3 Predicted charge speed", "7.4"),
+    ("sensor.bmw_ix3_electric_range", "iX3 Electric range", "190"),
+    ("sensor.bmw_ix3_charging_time_remaining", "iX3 Charging time remaining", "240"),
+    ("sensor.bmw_ix3_target_state_of_charge", "iX3 Target state of charge", "80"),
+)
+BATTERY_ENTITY = CARDATA_ENTITIES[0][0]
+
+# Sessions d'historique générées (catégorie, puissance kW, SOC cible)
+SESSION_PROFILES = (("7kw", 7.4, 80.0), ("7kw", 7.4, 100.0), ("11kw", 11.0, 80.0),
+                    ("11kw", 11.0, 100.0), ("22kw", 22.0, 80.0))
+
+
+def _percentile(values, percent):
+    """Percentile simple (valeurs triées)."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def populate_states(hass: HomeAssistant, count: int, bmw_share: float) -> None:
+    """Remplit la machine à états avec count entités dont une part BMW."""
+    bmw_count = max(len(CARDATA_ENTITIES), int(count * bmw_share))
+    for entity_id, name, state in CARDATA_ENTITIES:
+        hass.states.async_set(entity_id, state, {"friendly_name": name})
+
+    # Autres capteurs BMW CarData sans rôle (pneus, portes, kilométrage...)
+    for index in range(bmw_count - len(CARDATA_ENTITIES)):
+        hass.states.async_set(
+            f"sensor.bmw_cardata_attribute_{index}",
+            str(index % 100),
+            {"friendly_name": f"BMW CarData attribute {index}"},
+        )
+
+    # Reste de l'installation : entités sans rapport avec le véhicule
+    domains = ("sensor", "binary_sensor", "light", "switch", "climate")
+    for index in range(count - bmw_count):
+        domain = domains[index % len(domains)]
+        hass.states.async_set(
+            f"{domain}.room_{index // 50}_device_{index}",
+            "on" if index % 2 else "21.5",
+            {"friendly_name": f"Room {index // 50} device {index}", "unit_of_measurement": "°C"},
+        )
+
+
+def synthetic_history(sessions: int, points: int) -> dict:
+    """Historique d'apprentissage de sessions réparties entre catégories."""
+    history = {category: [] for category, _, _ in SESSION_PROFILES}
+    start = datetime(2024, 1, 1, 22, 0)
+    for index in range(sessions):
+        session_key, power_kw, target_soc = SESSION_PROFILES[index % len(SESSION_PROFILES)]
+        start_soc = random.uniform(10.0, 50.0)
+        minutes_per_percent = 80.0 * 60 / 100 / power_kw
+        session_start = start + timedelta(days=index)
+        session = ChargeSession(session_key, session_key, target_soc, power_kw,
+                                to_epoch(session_start), round(start_soc, 1))
+        for step in range(points):
+            soc = start_soc + (target_soc - start_soc) * step / max(1, points - 1)
+            session.append(session_start + timedelta(minutes=step * 5), round(soc, 1),
+                           round((target_soc - soc) * minutes_per_percent, 1), power_kw)
+        session.complete(session_start + timedelta(minutes=points * 5))
+        history[session_key].append(session)
+    return history
+
+
+class StageStats:
+    """Latences et mémoire d'une étape."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latencies = []
+        self.peak_kib = 0.0
+        self.retained_kib = 0.0
+
+    def row(self, scenario: str) -> str:
+        """Ligne du tableau de résultats."""
+        values = self.latencies
+        return (f"{scenario:<22} {self.name:<14} {len(values):>6} "
+                f"{_percentile(values, 50):>9.3f} {_percentile(values, 95):>9.3f} "
+                f"{max(values):>9.3f} {statistics.mean(values):>9.3f} "
+                f"{self.peak_kib:>11.1f} {self.retained_kib:>11.1f}")
+
+
+async def _measure(stats: StageStats, call, iterations: int, prepare=None) -> None:
+    """Chronomètre call() puis mesure sa mémoire sur un passage sous tracemalloc."""
+    for _ in range(iterations):
+        if prepare:
+            prepare()
+        begin = time.perf_counter()
+        result = call()
+        if asyncio.iscoroutine(result):
+            await result
+        stats.latencies.append((time.perf_counter() - begin) * 1000)
+
+    if prepare:
+        prepare()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = call()
+    if asyncio.iscoroutine(result):
+        await result
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats.peak_kib = (peak - before) / 1024
+    stats.retained_kib = (after - before) / 1024
+
+
+async def run_scenario(args, entities: int, sessions: int) -> list:
+    """Exécute un scénario complet dans un répertoire de configuration temporaire."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        storage_dir = os.path.join(config_dir, "bmw_ix3_learning")
+        os.makedirs(storage_dir)
+        with open(os.path.join(storage_dir, f"charge_history_{ENTRY_ID}.json"), "w",
+                  encoding="utf-8") as f:
+            history = synthetic_history(sessions, args.points)
+            json.dump({key: [session.as_dict() for session in key_sessions]
+                       for key, key_sessions in history.items()}, f)
+        # Modèles appris correspondants (sinon reconstruits au chargement)
+        with open(os.path.join(storage_dir, f"charge_model_{ENTRY_ID}.json"), "w",
+                  encoding="utf-8") as f:
+            json.dump({
+                "version": MODEL_VERSION,
+                "models": {key: curve_from_sessions(sessions).as_dict()
+                           for key, sessions in history.items()},
+            }, f)
+
+        hass = HomeAssistant(config_dir)
+        populate_states(hass, entities, args.bmw_share)
+
+        results = []
+
+        # Passage mémoire sur un premier coordinateur, arrêté avant la mesure
+        # de latence (deux coordinateurs partageraient le journal)
+        startup = StageStats("startup")
+        learning_load = StageStats("learning_load")
+        first_refresh = StageStats("first_refresh")
+        tracemalloc.start()
+        probe = BMWiX3Coordinator(hass, {}, ENTRY_ID)
+        for stats, call in ((learning_load, probe.charge_learning.async_load),
+                            (first_refresh, probe._update_bmw_data)):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await call()
+            after, peak = tracemalloc.get_traced_memory()
+            stats.peak_kib, stats.retained_kib = (peak - before) / 1024, (after - before) / 1024
+        tracemalloc.stop()
+        await probe.async_shutdown()
+
+        tracemalloc.start()
+        begin = time.perf_counter()
+        coordinator = BMWiX3Coordinator(hass, {}, ENTRY_ID)
+        startup.latencies.append((time.perf_counter() - begin) * 1000)
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        startup.peak_kib, startup.retained_kib = peak / 1024, after / 1024
+        results.append(startup)
+
+        # Chargement de l'historique : lecture et courbes en exécuteur
+        begin = time.perf_counter()
+        await coordinator.charge_learning.async_load()
+        learning_load.latencies.append((time.perf_counter() - begin) * 1000)
+        results.append(learning_load)
+
+        begin = time.perf_counter()
+        await coordinator._update_bmw_data()
+        first_refresh.latencies.append((time.perf_counter() - begin) * 1000)
+        results.append(first_refresh)
+
+        socs = itertools.cycle(f"{soc:.1f}" for soc in range(20, 80))
+
+        def change_soc():
+            hass.states.async_set(
+                BATTERY_ENTITY, next(socs), {"friendly_name": CARDATA_ENTITIES[0][1]}
+            )
+
+        refresh = StageStats("refresh")
+        await _measure(refresh, coordinator._update_bmw_data, args.refreshes, change_soc)
+        results.append(refresh)
+
+        learning = coordinator.charge_learning
+        predict = StageStats("predict")
+        await _measure(
+            predict,
+            lambda: learning.predict_charge_time(random.uniform(10, 79), 80.0, 7.4),
+            args.predictions,
+        )
+        results.append(predict)
+
+        def mark_dirty():
+            learning._history_dirty = True
+
+        save = StageStats("save")
+        await _measure(save, learning.async_flush, args.saves, mark_dirty)
+        results.append(save)
+
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+        return results
+
+
+async def run(args) -> None:
+    """Enchaîne les scénarios demandés."""
+    random.seed(args.seed)
+    print(f"{'scénario':<22} {'étape':<14} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'max ms':>9} {'moy. ms':>9} {'pic Kio':>11} {'retenu Kio':>11}")
+    for entities, sessions in itertools.product(args.entities, args.sessions):
+        scenario = f"{entities}e/{sessions}s"
+        for stats in await run_scenario(args, entities, sessions):
+            print(stats.row(scenario))
+        sys.stdout.flush()
+
+    # ru_maxrss est en Kio sous Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"RSS maximal du processus: {peak_rss / 1024:.1f} Mio")
+
+
+def main() -> None:
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Benchmark des chemins critiques du coordinateur")
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="nombre d'entités de la machine à états")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 500, 5000],
+                        help="nombre de sessions de l'historique d'apprentissage")
+    parser.add_argument("--points", type=int, default=60, help="points par session")
+    parser.add_argument("--bmw-share", type=float, default=0.02,
+                        help="part des entités nommées comme BMW CarData")
+    parser.add_argument("--refreshes", type=int, default=100)
+    parser.add_argument("--predictions", type=int, default=1000)
+    parser.add_argument("--saves", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="journaux du plugin")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
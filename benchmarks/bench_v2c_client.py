@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Mesure de latence et de comportement en panne du client V2C Trydan
+contre le simulateur local (aucune borne ni Home Assistant requis) :
+
+    python benchmarks/bench_v2c_client.py --requests 200 --latency 0.02 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(__file__))
+from v2c_trydan_simulator import TrydanSimulator, start_simulator  # noqa: E402
+
+# Chargement direct du module client (sans importer le paquet Home Assistant)
+CLIENT_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "bmw_ix3_plugin", "v2c_client.py"
+)
+_spec = importlib.util.spec_from_file_location("v2c_client", CLIENT_PATH)
+v2c_client = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(v2c_client)
+
+
+def _percentile(values, percent):
+    """Percentile simple (valeurs triées)."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+async def run(args) -> None:
+    """Lance le simulateur puis enchaîne les lectures du client."""
+    simulator = TrydanSimulator(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        hang_rate=args.hang_rate,
+    )
+    runner = await start_simulator(simulator)
+    host, port = runner.addresses[0][:2]
+
+    latencies = []
+    errors = {}
+    async with aiohttp.ClientSession() as session:
+        client = v2c_client.V2CTrydanClient(session, host, port)
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            begin = time.perf_counter()
+            try:
+                await client.async_get_status()
+                latencies.append((time.perf_counter() - begin) * 1000)
+            except v2c_client.V2CError as err:
+                name = type(err).__name__
+                errors[name] = errors.get(name, 0) + 1
+        elapsed = time.perf_counter() - started
+
+    simulator.stop()
+    await runner.cleanup()
+
+    print(f"Requêtes: {args.requests} en {elapsed:.2f} s "
+          f"(requêtes reçues par le simulateur: {simulator.requests})")
+    if latencies:
+        print(f"Latence (ms): p50={_percentile(latencies, 50):.2f} "
+              f"p95={_percentile(latencies, 95):.2f} max={max(latencies):.2f} "
+              f"moyenne={statistics.mean(latencies):.2f}")
+    print(f"Erreurs: {errors or 'aucune'}")
+
+
+def main() -> None:
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Benchmark du client V2C Trydan")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Simulateur local de la borne V2C Trydan (API HTTP /RealTimeData et /write)
+Permet de tester et mesurer le client V2C du plugin sans borne réelle :
+
+    python benchmarks/v2c_trydan_simulator.py --port 8080 --latency 0.05 --failure-rate 0.1
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from aiohttp import web
+
+# Tension par phase (V)
+VOLTAGE = 230.0
+
+
+class TrydanSimulator:
+    """État simulé d'une borne Trydan."""
+
+    def __init__(self, phases: int = 1, intensity: int = 32, latency: float = 0.0,
+                 jitter: float = 0.0, failure_rate: float = 0.0, hang_rate: float = 0.0) -> None:
+        self.phases = phases
+        self.intensity = intensity
+        self.paused = 0
+        self.charge_state = 2  # 0 = déconnecté, 1 = connecté, 2 = en charge
+        self.charge_energy = 0.0
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self._last_tick = time.monotonic()
+        self._stopped = asyncio.Event()
+        self.requests = 0
+
+    def stop(self) -> None:
+        """Libère les requêtes figées (avant l'arrêt du serveur)."""
+        self._stopped.set()
+
+    @property
+    def charge_power(self) -> float:
+        """Puissance de charge instantanée (W)."""
+        if self.charge_state != 2 or self.paused:
+            return 0.0
+        return self.intensity * VOLTAGE * self.phases
+
+    def tick(self) -> None:
+        """Intègre l'énergie chargée depuis le dernier appel."""
+        now = time.monotonic()
+        self.charge_energy += self.charge_power / 1000.0 * (now - self._last_tick) / 3600.0
+        self._last_tick = now
+
+    async def _simulate_network(self) -> None:
+        """Applique la latence et les pannes configurées."""
+        self.requests += 1
+        if random.random() < self.hang_rate:
+            # Borne figée : pas de réponse avant l'arrêt (teste les délais du client)
+            await self._stopped.wait()
+            raise web.HTTPServiceUnavailable(text="simulator stopped")
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if random.random() < self.failure_rate:
+            raise web.HTTPInternalServerError(text="simulated failure")
+
+    async def real_time_data(self, request: web.Request) -> web.Response:
+        """GET /RealTimeData."""
+        await self._simulate_network()
+        self.tick()
+        return web.json_response({
+            "ID": "SIMULATOR",
+            "ChargeState": self.charge_state,
+            "ReadyState": 0,
+            "ChargePower": round(self.charge_power, 1),
+            "ChargeEnergy": round(self.charge_energy, 3),
+            "SlaveError": 0,
+            "ChargeTime": 0,
+            "HousePower": 0.0,
+            "FVPower": 0.0,
+            "Paused": self.paused,
+            "Locked": 0,
+            "Timer": 0,
+            "Intensity": self.intensity,
+            "Dynamic": 0,
+            "MinIntensity": 6,
+            "MaxIntensity": 32,
+            "PauseDynamic": 0,
+        }, content_type="text/html")
+
+    async def write(self, request: web.Request) -> web.Response:
+        """GET /write/Clé=Valeur."""
+        await self._simulate_network()
+        self.tick()
+        key, _, value = request.match_info["assignment"].partition("=")
+        try:
+            number = int(value)
+        except ValueError:
+            raise web.HTTPBadRequest(text=f"invalid value: {value}")
+
+        if key == "Paused":
+            self.paused = 1 if number else 0
+        elif key == "Intensity":
+            self.intensity = max(6, min(32, number))
+        elif key == "ChargeState":
+            self.charge_state = number
+        else:
+            raise web.HTTPNotFound(text=f"unknown key: {key}")
+        return web.Response(text="OK")
+
+    def make_app(self) -> web.Application:
+        """Application aiohttp exposant l'API Trydan."""
+        app = web.Application()
+        app.router.add_get("/RealTimeData", self.real_time_data)
+        app.router.add_get("/write/{assignment}", self.write)
+        return app
+
+
+async def start_simulator(simulator: TrydanSimulator, host: str = "127.0.0.1",
+                          port: int = 0) -> web.AppRunner:
+    """Démarre le simulateur et retourne le runner (port réel dans runner.addresses)."""
+    runner = web.AppRunner(simulator.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner
+
+
+def main() -> None:
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Simulateur de borne V2C Trydan")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--phases", type=int, default=1, choices=(1, 3))
+    parser.add_argument("--latency", type=float, default=0.0, help="latence fixe (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latence aléatoire ajoutée (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="part de réponses HTTP 500")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="part de requêtes sans réponse")
+    args = parser.parse_args()
+
+    simulator = TrydanSimulator(
+        phases=args.phases,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        hang_rate=args.hang_rate,
+    )
+    print(f"Simulateur Trydan sur http://{args.host}:{args.port}/RealTimeData")
+    web.run_app(simulator.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from homeassistant.helpers.typing import ConfigType
 
 from .const import DOMAIN
 from .coordinator import BMWiX3Coordinator
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -12,6 +13,7 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Configuration du plugin BMW iX3."""
     _LOGGER.info("Initialisation du plugin BMW iX3")
+    await async_setup_services(hass)
     return True
 
 
@@ -19,9 +21,23 @@ async def async_setup_entry(hass: HomeAssistant, entry):
     """Configuration d'une entrée du plugin."""
     hass.data.setdefault(DOMAIN, {})
     
-    # Création du coordinateur
-    coordinator = BMWiX3Coordinator(hass, entry.data, entry.entry_id)
-    await coordinator.async_config_entry_first_refresh()
+    # Création du coordinateur (les options complètent la configuration)
+    coordinator = BMWiX3Coordinator(hass, {**entry.data, **entry.options}, entry.entry_id)
+    if await coordinator.async_restore():
+        # Entités créées avec le dernier instantané, mise à jour en arrière-plan
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            # ConfigEntryNotReady : libérer le suivi tarifaire, les minuteries
+            # et le chargement de l'apprentissage démarrés par async_restore
+            await coordinator.async_shutdown()
+            raise
+    coordinator.auto_stop.async_start()
+    coordinator.plan_executor.async_start()
     
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
@@ -32,9 +48,17 @@ async def async_setup_entry(hass: HomeAssistant, entry):
         entry, ["sensor", "switch", "number"]
     )
     
+    # Recharger l'entrée quand les options changent
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry) -> None:
+    """Recharge l'entrée après une modification des options."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry):
     """Déchargement d'une entrée du plugin."""
     # Arrêt du coordinateur
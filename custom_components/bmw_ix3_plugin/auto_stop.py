@@ -0,0 +1,213 @@
+"""Arrêt automatique local de la charge au seuil de 80%."""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Optional
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    AUTO_STOP_THRESHOLD,
+    BATTERY_CAPACITY,
+    CHARGE_EFFICIENCY,
+)
+from .v2c_client import V2CError
+
+if TYPE_CHECKING:
+    from .coordinator import BMWiX3Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Avance de la première vérification sur le franchissement prédit (secondes,
+# au moins 10% du temps restant pour absorber l'erreur de prédiction)
+AUTO_STOP_MIN_LEAD = 60
+AUTO_STOP_LEAD_RATIO = 0.1
+
+# Bornes de l'intervalle des vérifications rapprochées (secondes)
+AUTO_STOP_MIN_CHECK = 5
+AUTO_STOP_MAX_CHECK = 60
+
+# Écart de SOC sous le seuil qui réarme l'arrêt (nouvelle session)
+AUTO_STOP_REARM_MARGIN = 1.0
+
+
+class AutoStopController:
+    """Arrête la borne V2C au franchissement du seuil, sans automatisation YAML.
+
+    À chaque mise à jour du coordinateur, le franchissement est prédit
+    (courbe apprise ou théorique) et une vérification est planifiée juste
+    avant. Chaque vérification relit la borne (énergie et puissance) pour
+    estimer le SOC depuis la dernière valeur BMW, puis arrête la charge ou
+    replanifie la vérification au franchissement estimé.
+    """
+
+    def __init__(self, coordinator: "BMWiX3Coordinator") -> None:
+        """Initialise le contrôleur."""
+        self.coordinator = coordinator
+        self.hass = coordinator.hass
+        self.threshold = AUTO_STOP_THRESHOLD
+        self.predicted_stop: Optional[datetime] = None
+
+        self._unsub_coordinator: Optional[Callable[[], None]] = None
+        self._unsub_check: Optional[Callable[[], None]] = None
+        # Échéance (horloge monotone) de la vérification planifiée
+        self._check_due: Optional[float] = None
+        # Arrêt déjà effectué pour cette session (conservé au redémarrage)
+        self.fired = False
+
+        # Référence d'estimation : dernier SOC BMW et heure associée, puis
+        # première lecture du compteur d'énergie de la borne depuis ce SOC et
+        # énergie intégrée (puissance × durée) à cette lecture
+        self._reference_soc: Optional[float] = None
+        self._reference_time = 0.0
+        self._reference_energy: Optional[float] = None
+        self._reference_integrated = 0.0
+
+    @callback
+    def async_start(self) -> None:
+        """S'abonne aux mises à jour du coordinateur."""
+        if self._unsub_coordinator is None:
+            self._unsub_coordinator = self.coordinator.async_add_listener(self._handle_update)
+
+    @callback
+    def async_stop(self) -> None:
+        """Annule la vérification planifiée et se désabonne."""
+        self._cancel_check()
+        if self._unsub_coordinator:
+            self._unsub_coordinator()
+            self._unsub_coordinator = None
+
+    @callback
+    def _handle_update(self) -> None:
+        """Prédit le franchissement du seuil et planifie la vérification."""
+        data = self.coordinator.data or {}
+        bmw_data = data.get("bmw", {})
+        soc = bmw_data.get("battery_level")
+        charging = bmw_data.get("charging_status") == "CHARGING"
+
+        if soc is not None and soc < self.threshold - AUTO_STOP_REARM_MARGIN:
+            self.fired = False
+
+        if (not self.coordinator.auto_stop_enabled or not self.coordinator.v2c_client
+                or not charging or soc is None or self.fired):
+            self._cancel_check()
+            self.predicted_stop = None
+            return
+
+        if soc != self._reference_soc:
+            # Nouveau SOC BMW : la prédiction repart de maintenant. L'énergie
+            # de référence est relevée à la prochaine lecture de la borne
+            self._reference_soc = soc
+            self._reference_energy = None
+            self._reference_integrated = 0.0
+            self._reference_time = time.monotonic()
+
+        if soc >= self.threshold:
+            self.hass.async_create_task(self._async_stop_charging(soc))
+            return
+
+        power_kw = self.coordinator.effective_power(bmw_data)
+        minutes = self.coordinator.get_charge_time(soc, self.threshold, power_kw)
+        if minutes is None:
+            return
+
+        # Un SOC inchangé (mise à jour sans nouveau relevé BMW) ne décale pas
+        # le franchissement : le temps écoulé depuis le relevé est déduit
+        seconds = minutes * 60
+        lead = max(AUTO_STOP_MIN_LEAD, seconds * AUTO_STOP_LEAD_RATIO)
+        remaining = max(0.0, seconds - (time.monotonic() - self._reference_time))
+        self.predicted_stop = datetime.now() + timedelta(seconds=remaining)
+        self._schedule_check(max(AUTO_STOP_MIN_CHECK, remaining - lead), keep_sooner=True)
+
+    def _schedule_check(self, delay: float, keep_sooner: bool = False) -> None:
+        """(Re)planifie la prochaine vérification.
+
+        Avec keep_sooner, une vérification déjà prévue plus tôt (dont les
+        vérifications rapprochées en cours) est conservée.
+        """
+        due = time.monotonic() + delay
+        if keep_sooner and self._unsub_check and self._check_due is not None and self._check_due <= due:
+            return
+        self._cancel_check()
+        self._check_due = due
+        self._unsub_check = async_call_later(self.hass, delay, self._async_check)
+
+    def _cancel_check(self) -> None:
+        """Annule la vérification planifiée."""
+        if self._unsub_check:
+            self._unsub_check()
+            self._unsub_check = None
+        self._check_due = None
+
+    async def _async_check(self, _now: datetime) -> None:
+        """Vérification rapide : estime le SOC courant depuis la borne."""
+        self._unsub_check = None
+        self._check_due = None
+        if self.fired or self._reference_soc is None or not self.coordinator.v2c_client:
+            return
+
+        try:
+            await self._async_check_charger()
+        except V2CError as err:
+            _LOGGER.warning("Arrêt auto : lecture V2C impossible (%s)", err)
+            self._schedule_check(AUTO_STOP_MAX_CHECK)
+        except Exception:  # pylint: disable=broad-except
+            # Une erreur inattendue ne doit pas interrompre la chaîne de vérifications
+            _LOGGER.exception("Arrêt auto : vérification en échec")
+            self._schedule_check(AUTO_STOP_MAX_CHECK)
+
+    async def _async_check_charger(self) -> None:
+        """Lit la borne, arrête la charge au seuil ou replanifie la vérification."""
+        status = await self.coordinator.v2c_client.async_get_status()
+        power_kw = status["charging_power"]
+        if power_kw <= 0:
+            # Charge suspendue ou creux de puissance : relire la borne plus tard
+            self._schedule_check(AUTO_STOP_MAX_CHECK)
+            return
+
+        soc = self._estimate_soc(status)
+        if soc >= self.threshold:
+            await self._async_stop_charging(soc)
+            return
+
+        # Temps avant franchissement à la puissance mesurée
+        energy_needed = (self.threshold - soc) / 100.0 * BATTERY_CAPACITY / CHARGE_EFFICIENCY
+        seconds = energy_needed / power_kw * 3600
+        self.predicted_stop = datetime.now() + timedelta(seconds=seconds)
+        self._schedule_check(min(AUTO_STOP_MAX_CHECK, max(AUTO_STOP_MIN_CHECK, seconds)))
+
+    def _estimate_soc(self, status: dict) -> float:
+        """SOC estimé : dernier SOC BMW + énergie chargée depuis.
+
+        L'énergie vient du compteur de la borne s'il a augmenté depuis sa
+        première lecture, sinon (compteur absent, à zéro ou figé) de la
+        puissance mesurée intégrée depuis le relevé BMW.
+        """
+        energy = status.get("charge_energy")
+        integrated_kwh = status["charging_power"] * (time.monotonic() - self._reference_time) / 3600
+
+        if energy is not None and (self._reference_energy is None or energy < self._reference_energy):
+            # Première lecture depuis le SOC BMW (ou compteur remis à zéro)
+            self._reference_energy = energy
+            self._reference_integrated = integrated_kwh
+
+        if energy is not None and energy > self._reference_energy:
+            # Énergie intégrée jusqu'à la première lecture, puis compteur
+            charged_kwh = self._reference_integrated + energy - self._reference_energy
+        else:
+            charged_kwh = integrated_kwh
+        return self._reference_soc + charged_kwh * CHARGE_EFFICIENCY / BATTERY_CAPACITY * 100.0
+
+    async def _async_stop_charging(self, soc: float) -> None:
+        """Suspend la charge sur la borne."""
+        if self.fired:
+            return
+        self.fired = True
+        self._cancel_check()
+        self.predicted_stop = None
+
+        _LOGGER.info("Arrêt automatique de la charge à %.1f%% (seuil %.0f%%)", soc, self.threshold)
+        if not await self.coordinator.control_v2c_charging(False):
+            # Nouvel essai à la prochaine mise à jour
+            self.fired = False
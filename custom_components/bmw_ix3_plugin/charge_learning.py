@@ -1,16 +1,62 @@
 """Système d'apprentissage des courbes de recharge BMW iX3."""
+import asyncio
 import json
 import logging
+import math
 import os
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
 
-from .const import DOMAIN
+from .charge_model import (
+    MODEL_VERSION,
+    QUANTILES,
+    RateCurve,
+    RateSampler,
+    add_session_points,
+    curve_from_sessions,
+)
+from .charge_session import ChargeSession, to_epoch
+from .const import DOMAIN, STORAGE_DIR
+from .profiling import RefreshProfiler, STAGE_SAVE_HISTORY
+from .storage import read_json, write_atomic
 
 _LOGGER = logging.getLogger(__name__)
 
+# Fenêtre de regroupement des écritures de l'historique (secondes)
+SAVE_DELAY = 30
+
+# Points gardés en attente pendant le chargement (les plus anciens sont
+# abandonnés au-delà, soit plus d'une journée de mises à jour)
+PENDING_RECORDS_LIMIT = 2000
+
+# Nombre minimal de sessions pour utiliser une courbe apprise
+MIN_SESSIONS_FOR_PREDICTION = 2
+
+# États de charge sans information (entités BMW pas encore disponibles au
+# démarrage, erreur de lecture) : la session en cours n'est pas interrompue
+INDETERMINATE_STATUSES = ("UNKNOWN", "ERROR")
+
+# Au-delà de cet écart entre deux points, la charge reprise est une nouvelle
+# session (véhicule débranché pendant un arrêt de Home Assistant, par exemple)
+SESSION_RESUME_GAP = timedelta(hours=1)
+
+# Types d'enregistrement du journal de session (JSON Lines)
+JOURNAL_START = "start"
+JOURNAL_POINT = "point"
+
+# Sessions conservées par catégorie de chargeur (session_key)
+MAX_SESSIONS_PER_KEY = 50
+
+# Points conservés dans tout l'historique (une vingtaine d'octets par point
+# en mémoire, une trentaine en JSON) : au-delà, les sessions anciennes les
+# moins informatives sont retirées
+HISTORY_POINT_BUDGET = 20000
+
 # Catégories de puissance de chargeur (kW)
 CHARGER_CATEGORIES = {
     "7kw": (5.0, 9.0),      # 5-9 kW (chargeur domestique)
@@ -24,63 +70,237 @@ CHARGER_CATEGORIES = {
 class ChargeLearning:
     """Système d'apprentissage des courbes de recharge."""
     
-    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        profiler: Optional[RefreshProfiler] = None,
+    ) -> None:
         """Initialise le système d'apprentissage."""
         self.hass = hass
         self.entry_id = entry_id
+        # Mesure des écritures (diagnostics), facultative
+        self.profiler = profiler or RefreshProfiler()
         # Stocker dans le répertoire de configuration Home Assistant
-        storage_dir = hass.config.path("bmw_ix3_learning")
-        os.makedirs(storage_dir, exist_ok=True)
-        self.storage_path = os.path.join(storage_dir, f"charge_history_{entry_id}.json")
+        # (créé au chargement, hors de la boucle d'événements)
+        self.storage_dir = hass.config.path(STORAGE_DIR)
+        self.storage_path = os.path.join(self.storage_dir, f"charge_history_{entry_id}.json")
+        # Journal en ajout seul de la session en cours, compacté dans
+        # l'historique à chaque fin de session
+        self.journal_path = os.path.join(self.storage_dir, f"charge_journal_{entry_id}.jsonl")
+        # Modèles appris en ligne (tranches de SOC), écrits avec le journal
+        self.model_path = os.path.join(self.storage_dir, f"charge_model_{entry_id}.json")
         
-        self.history: Dict[str, List[Dict[str, Any]]] = {}
-        self.current_session: Optional[Dict[str, Any]] = None
-        self.last_soc: Optional[float] = None
-        self.last_time_remaining: Optional[float] = None
+        self.history: Dict[str, List[ChargeSession]] = {}
+        self.current_session: Optional[ChargeSession] = None
+        self._last_point_time: Optional[datetime] = None
+        # Vitesse de charge apprise par catégorie, mise à jour à chaque point
+        self.models: Dict[str, RateCurve] = {}
+        # Intervalles entre changements de SOC de la session en cours
+        self._rate_sampler = RateSampler()
+        # La session en cours a déjà été comptée dans son modèle
+        self._session_counted = False
+        # Incrémenté à chaque changement des courbes (prédictions à recalculer)
+        self.curves_version = 0
         
-        # Charger l'historique existant
-        self._load_history()
+        # Chargement en arrière-plan (async_load) : jusque-là les prédictions
+        # retombent sur le calcul théorique et les points reçus sont mis en attente
+        self.loaded = False
+        self._pending_records: Deque[Tuple[Any, ...]] = deque(maxlen=PENDING_RECORDS_LIMIT)
+
+        # Callbacks appelés avec chaque session terminée (statistiques)
+        self._session_listeners: List[Callable[[ChargeSession], None]] = []
+
+        # Écriture différée : regroupée puis exécutée hors de la boucle
+        self._unsub_save: Optional[Callable[[], None]] = None
+        self._journal_pending: List[str] = []
+        self._history_dirty = False
+        self._models_dirty = False
+        self._save_lock = asyncio.Lock()
+        self._unsub_final_write: Optional[Callable[[], None]] = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+        )
     
-    def _load_history(self) -> None:
-        """Charge l'historique depuis le fichier."""
+    async def async_load(self) -> None:
+        """Charge l'historique et reprend une session interrompue (en exécuteur).
+
+        La lecture des fichiers (et la reconstruction des modèles s'ils
+        manquent) se fait hors de la boucle d'événements ; les points reçus
+        pendant le chargement sont ensuite rejoués dans l'ordre. En cas
+        d'échec, l'apprentissage repart d'un historique vide.
+        """
+        if self.loaded:
+            return
+
         try:
-            if os.path.exists(self.storage_path):
-                with open(self.storage_path, "r", encoding="utf-8") as f:
-                    self.history = json.load(f)
-                _LOGGER.info("Historique de charge chargé: %s sessions", 
-                           sum(len(sessions) for sessions in self.history.values()))
-            else:
-                self.history = {}
-                _LOGGER.info("Aucun historique existant, création d'un nouveau")
+            history, session, models, rebuilt, trimmed = await self.hass.async_add_executor_job(
+                _load_learning_files, self.storage_dir, self.storage_path, self.journal_path, self.model_path
+            )
         except Exception as err:
-            _LOGGER.error("Erreur lors du chargement de l'historique: %s", err)
-            self.history = {}
-    
+            _LOGGER.error("Erreur lors du chargement de l'historique de charge, apprentissage repris à vide: %s", err)
+            history, session, models, rebuilt, trimmed = {}, None, {}, False, False
+        self.history = history
+        self.current_session = session
+        self.models = models
+        self.curves_version += 1
+        self.loaded = True
+        if session is not None:
+            self._last_point_time = session.last_time
+            for index in range(len(session)):
+                sample = self._sample_point(index)
+                self._session_counted = self._session_counted or sample is not None
+        if rebuilt:
+            _LOGGER.info("Modèles de charge reconstruits depuis l'historique: %s", ", ".join(models) or "aucun")
+            self._models_dirty = True
+        if rebuilt or trimmed:
+            self._history_dirty = True
+            self._save_history()
+
+        _LOGGER.info("Historique de charge chargé: %s sessions",
+                    sum(len(sessions) for sessions in history.values()))
+        if session is not None:
+            _LOGGER.info("Session de charge reprise depuis le journal: %s (%s points)",
+                        session.session_key, len(session))
+
+        pending = self._pending_records
+        self._pending_records = deque(maxlen=PENDING_RECORDS_LIMIT)
+        for record in pending:
+            self.record_charging_data(*record)
+
+    def async_add_session_listener(
+        self, session_callback: Callable[[ChargeSession], None]
+    ) -> Callable[[], None]:
+        """Enregistre un callback appelé avec chaque session terminée."""
+        self._session_listeners.append(session_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._session_listeners.remove(session_callback)
+
+        return remove_listener
+
+    def _append_journal(self, record_type: str, record: Dict[str, Any]) -> None:
+        """Ajoute un enregistrement au journal (écrit au prochain flush)."""
+        self._journal_pending.append(
+            json.dumps({"type": record_type, **record}, ensure_ascii=False, separators=(",", ":"))
+        )
+        self._save_history()
+
     def _save_history(self) -> None:
-        """Sauvegarde l'historique dans le fichier."""
-        try:
-            with open(self.storage_path, "w", encoding="utf-8") as f:
-                json.dump(self.history, f, indent=2, ensure_ascii=False)
-            _LOGGER.debug("Historique sauvegardé")
-        except Exception as err:
-            _LOGGER.error("Erreur lors de la sauvegarde de l'historique: %s", err)
+        """Planifie une sauvegarde différée de l'historique et du journal.
+
+        Les demandes rapprochées sont regroupées en une seule écriture après
+        SAVE_DELAY secondes.
+        """
+        if self._unsub_save is None:
+            self._unsub_save = async_call_later(self.hass, SAVE_DELAY, self._async_save_later)
+
+    @callback
+    def _async_save_later(self, _now: datetime) -> None:
+        """Déclenche l'écriture planifiée."""
+        self._unsub_save = None
+        self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Écrit immédiatement les données en attente (hors de la boucle d'événements).
+
+        Sans session finalisée, seules les nouvelles lignes du journal sont
+        ajoutées. Après une fin de session, l'historique est réécrit
+        (compaction) et le journal repart de la session suivante.
+        """
+        if self._unsub_save:
+            self._unsub_save()
+            self._unsub_save = None
+        if not self.loaded:
+            # Rien à écrire avant le chargement (l'historique serait écrasé)
+            return
+
+        async with self._save_lock:
+            journal_lines = self._journal_pending
+            self._journal_pending = []
+            compact = self._history_dirty
+            self._history_dirty = False
+            models_dirty = self._models_dirty
+            self._models_dirty = False
+
+            # Encodage compact sur la boucle (instantané cohérent), écriture en exécuteur
+            try:
+                with self.profiler.measure(STAGE_SAVE_HISTORY):
+                    payload = (
+                        json.dumps(
+                            {
+                                session_key: [session.as_dict() for session in sessions]
+                                for session_key, sessions in self.history.items()
+                            },
+                            ensure_ascii=False,
+                            separators=(",", ":"),
+                        )
+                        if compact else None
+                    )
+                    model_payload = (
+                        json.dumps(
+                            {
+                                "version": MODEL_VERSION,
+                                "models": {key: model.as_dict() for key, model in self.models.items()},
+                            },
+                            separators=(",", ":"),
+                        )
+                        if models_dirty else None
+                    )
+                    await self.hass.async_add_executor_job(
+                        _write_files, self.storage_path, payload, self.journal_path, journal_lines,
+                        self.model_path, model_payload,
+                    )
+                _LOGGER.debug("Apprentissage sauvegardé (compaction: %s, lignes journal: %s)",
+                            compact, len(journal_lines))
+            except Exception as err:
+                _LOGGER.error("Erreur lors de la sauvegarde de l'historique: %s", err)
+                # Réessayer au prochain flush
+                self._journal_pending = journal_lines + self._journal_pending
+                self._history_dirty = self._history_dirty or compact
+                self._models_dirty = self._models_dirty or models_dirty
+
+    async def _async_final_write(self, _event: Event) -> None:
+        """Dernière écriture à l'arrêt de Home Assistant."""
+        self._unsub_final_write = None
+        if self._unsub_save:
+            await self.async_flush()
+
+    async def async_shutdown(self) -> None:
+        """Écrit les données en attente et libère les abonnements."""
+        if self._unsub_final_write:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        if self._unsub_save:
+            await self.async_flush()
     
-    def _get_charger_category(self, power_kw: float) -> str:
+    def _sample_point(self, index: int) -> Optional[Tuple[float, float, float, float]]:
+        """Intervalle de charge terminé par un point de la session en cours."""
+        session = self.current_session
+        return self._rate_sampler.add(session.timestamps[index], session.soc[index], session.power[index])
+
+    def _update_model(self, session_key: str) -> None:
+        """Ajoute au modèle de la catégorie l'intervalle terminé par le dernier point.
+
+        Un intervalle (entre deux changements de SOC) ne touche que les
+        tranches de SOC qu'il traverse.
+        """
+        sample = self._sample_point(-1)
+        if sample is None:
+            return
+        model = self.models.get(session_key)
+        if model is None:
+            model = self.models[session_key] = RateCurve()
+        if not self._session_counted:
+            model.sessions += 1
+            self._session_counted = True
+        model.add(sample)
+        self._models_dirty = True
+        self.curves_version += 1
+
+    def get_charger_category(self, power_kw: float) -> str:
         """Détermine la catégorie de chargeur selon la puissance."""
-        for category, (min_power, max_power) in CHARGER_CATEGORIES.items():
-            if min_power <= power_kw < max_power:
-                return category
-        # Par défaut, utiliser la catégorie la plus proche
-        if power_kw < 9.0:
-            return "7kw"
-        elif power_kw < 15.0:
-            return "11kw"
-        elif power_kw < 30.0:
-            return "22kw"
-        elif power_kw < 70.0:
-            return "50kw"
-        else:
-            return "150kw"
+        return charger_category(power_kw)
     
     def record_charging_data(
         self,
@@ -89,93 +309,138 @@ class ChargeLearning:
         power_kw: float,
         target_soc: float,
         charging_status: str,
+        timestamp: Optional[datetime] = None,
     ) -> None:
         """Enregistre les données de recharge pour l'apprentissage."""
+        if timestamp is None:
+            timestamp = datetime.now()
+        if not self.loaded:
+            # Rejoué à la fin du chargement de l'historique
+            self._pending_records.append(
+                (soc, time_remaining, power_kw, target_soc, charging_status, timestamp)
+            )
+            return
+
+        if charging_status in INDETERMINATE_STATUSES:
+            # État inconnu (redémarrage, entités indisponibles) : la session continue
+            return
+
         if charging_status != "CHARGING":
             # Si on n'est plus en charge, finaliser la session précédente
             if self.current_session:
-                self._finalize_session()
+                self._finalize_session(timestamp)
             return
         
-        charger_category = self._get_charger_category(power_kw)
-        session_key = f"{charger_category}_{int(target_soc)}"
+        if (self.current_session and self._last_point_time is not None
+                and timestamp - self._last_point_time > SESSION_RESUME_GAP):
+            # Interruption trop longue : la session reprise est terminée au dernier point
+            self._finalize_session(self._last_point_time)
+
+        session_key = get_session_key(power_kw)
         
         # Démarrer une nouvelle session si nécessaire
-        if not self.current_session or self.current_session.get("session_key") != session_key:
+        if not self.current_session or self.current_session.session_key != session_key:
             if self.current_session:
-                self._finalize_session()
+                self._finalize_session(timestamp)
             
-            self.current_session = {
-                "session_key": session_key,
-                "charger_category": charger_category,
-                "target_soc": target_soc,
-                "power_kw": power_kw,
-                "start_time": datetime.now().isoformat(),
-                "start_soc": soc,
-                "data_points": [],
-            }
+            self.current_session = new_session(soc, power_kw, target_soc, timestamp)
+            self._rate_sampler = RateSampler()
+            self._session_counted = False
+            self._append_journal(JOURNAL_START, self.current_session.header())
             _LOGGER.info("Nouvelle session d'apprentissage: %s (cible: %s%%, puissance: %s kW)",
                         session_key, target_soc, power_kw)
         
-        # Enregistrer un point de données
-        current_time = datetime.now()
-        data_point = {
-            "timestamp": current_time.isoformat(),
-            "soc": soc,
-            "time_remaining": time_remaining,
-            "power_kw": power_kw,
-        }
-        
-        self.current_session["data_points"].append(data_point)
+        self._last_point_time = timestamp
         
-        # Sauvegarder toutes les 10 minutes ou si le SOC a changé significativement
-        if (self.last_soc is None or abs(soc - self.last_soc) >= 5.0 or
-            (self.last_time_remaining and time_remaining and 
-             abs(time_remaining - self.last_time_remaining) >= 10.0)):
-            self._save_history()
-            self.last_soc = soc
-            self.last_time_remaining = time_remaining
+        # Enregistrer un point de données, seulement s'il apporte une information
+        if not self.current_session.append(timestamp, soc, time_remaining, power_kw):
+            return
+
+        # Le modèle apprend pendant la session : les prédictions s'améliorent
+        # dès le point suivant, sans attendre la fin de la session
+        self._update_model(session_key)
+
+        # Ajout au journal : coût proportionnel au point, pas à l'historique
+        self._append_journal(JOURNAL_POINT, new_data_point(soc, time_remaining, power_kw, timestamp))
     
-    def _finalize_session(self) -> None:
+    def _finalize_session(self, end_time: Optional[datetime] = None) -> None:
         """Finalise la session en cours et l'ajoute à l'historique."""
         if not self.current_session:
             return
         
         session = self.current_session
-        session["end_time"] = datetime.now().isoformat()
-        
-        # Calculer les statistiques de la session
-        if session["data_points"]:
-            start_soc = session["data_points"][0]["soc"]
-            end_soc = session["data_points"][-1]["soc"]
-            session["end_soc"] = end_soc
-            session["soc_gained"] = end_soc - start_soc
-            
-            # Calculer le temps réel écoulé
-            start_time = datetime.fromisoformat(session["start_time"])
-            end_time = datetime.fromisoformat(session["end_time"])
-            session["actual_duration_minutes"] = (end_time - start_time).total_seconds() / 60.0
+        session.complete(end_time or datetime.now())
         
         # Ajouter à l'historique
-        session_key = session["session_key"]
+        session_key = session.session_key
         if session_key not in self.history:
             self.history[session_key] = []
         
         self.history[session_key].append(session)
         
-        # Garder seulement les 50 dernières sessions par catégorie
-        if len(self.history[session_key]) > 50:
-            self.history[session_key] = self.history[session_key][-50:]
+        # Garder seulement les dernières sessions par catégorie, dans le budget de points
+        if len(self.history[session_key]) > MAX_SESSIONS_PER_KEY:
+            self.history[session_key] = self.history[session_key][-MAX_SESSIONS_PER_KEY:]
+        apply_history_budget(self.history)
         
         _LOGGER.info("Session finalisée: %s (SOC: %s%% → %s%%, Durée: %s min)",
-                    session_key, session.get("start_soc"), session.get("end_soc"),
-                    session.get("actual_duration_minutes", 0))
+                    session_key, session.start_soc, session.end_soc,
+                    session.actual_duration_minutes)
         
+        for session_callback in list(self._session_listeners):
+            session_callback(session)
+
+        # Compaction : la session rejoint l'historique, le journal est remis à zéro
+        self._journal_pending.clear()
+        self._history_dirty = True
         self._save_history()
         self.current_session = None
-        self.last_soc = None
-        self.last_time_remaining = None
+        self._last_point_time = None
     
+    def import_sessions(self, sessions: List[ChargeSession]) -> int:
+        """Ajoute à l'historique des sessions terminées importées (ordre chronologique).
+
+        Les sessions qui chevauchent une session déjà connue (enregistrée en
+        direct ou importée auparavant) sont ignorées. Les points des autres
+        rejoignent les modèles de leur catégorie, et l'historique est réécrit
+        une fois. Retourne le nombre de sessions ajoutées.
+        """
+        known = [
+            (session.start, session.end)
+            for key_sessions in self.history.values()
+            for session in key_sessions
+            if session.end is not None
+        ]
+        if self.current_session is not None:
+            known.append((self.current_session.start, math.inf))
+
+        imported_keys = set()
+        imported = 0
+        for session in sessions:
+            if any(session.start < known_end and known_start < session.end for known_start, known_end in known):
+                continue
+            known.append((session.start, session.end))
+            self.history.setdefault(session.session_key, []).append(session)
+            model = self.models.get(session.session_key)
+            if model is None:
+                model = self.models[session.session_key] = RateCurve()
+            add_session_points(model, session)
+            imported_keys.add(session.session_key)
+            imported += 1
+            for session_callback in list(self._session_listeners):
+                session_callback(session)
+
+        for session_key in imported_keys:
+            key_sessions = sorted(self.history[session_key], key=lambda session: session.start)
+            self.history[session_key] = key_sessions[-MAX_SESSIONS_PER_KEY:]
+        apply_history_budget(self.history)
+        if imported:
+            self.curves_version += 1
+            self._history_dirty = True
+            self._models_dirty = True
+            self._save_history()
+        return imported
+
     def predict_charge_time(
         self,
         current_soc: float,
@@ -183,83 +448,71 @@ class ChargeLearning:
         power_kw: float,
     ) -> Optional[float]:
         """Prédit le temps de charge basé sur l'historique d'apprentissage."""
-        charger_category = self._get_charger_category(power_kw)
-        session_key = f"{charger_category}_{int(target_soc)}"
-        
-        # Si pas assez de données, retourner None (utiliser le calcul théorique)
-        if session_key not in self.history or len(self.history[session_key]) < 2:
-            _LOGGER.debug("Pas assez de données historiques pour %s (besoin: 2+, disponible: %s)",
-                        session_key, len(self.history.get(session_key, [])))
+        energy = self.predict_charge_energy(current_soc, target_soc, power_kw)
+        if energy is None:
             return None
-        
-        sessions = self.history[session_key]
-        
-        # Extraire les courbes d'apprentissage
-        learning_curves = []
-        for session in sessions:
-            if not session.get("data_points"):
-                continue
-            
-            # Construire une courbe SOC → temps restant
-            curve = {}
-            for point in session["data_points"]:
-                soc = round(point["soc"], 1)
-                time_remaining = point.get("time_remaining")
-                if time_remaining is not None:
-                    if soc not in curve:
-                        curve[soc] = []
-                    curve[soc].append(time_remaining)
-            
-            if curve:
-                learning_curves.append(curve)
-        
-        if not learning_curves:
+        predicted_time = energy / power_kw * 60
+
+        _LOGGER.debug("Prédiction basée sur l'apprentissage: %s min (SOC: %s%%, Cible: %s%%, Puissance: %s kW)",
+                     predicted_time, current_soc, target_soc, power_kw)
+
+        return predicted_time
+
+    def predict_charge_time_quantiles(
+        self,
+        current_soc: float,
+        target_soc: float,
+        power_kw: float,
+    ) -> Optional[Dict[str, float]]:
+        """Temps de charge p10/p50/p90 (minutes) appris ; None sans apprentissage suffisant.
+
+        p90 : temps dépassé une session sur dix seulement, à retenir pour
+        démarrer au plus tard sans risquer de manquer la cible.
+        """
+        quantiles = {}
+        for statistic in QUANTILES:
+            energy = self.predict_charge_energy(current_soc, target_soc, power_kw, statistic)
+            if energy is None:
+                return None
+            quantiles[statistic] = energy / power_kw * 60
+        return quantiles
+
+    def predict_charge_energy(
+        self,
+        current_soc: float,
+        target_soc: float,
+        power_kw: float,
+        statistic: str = "mean",
+    ) -> Optional[float]:
+        """Énergie équivalente à puissance nominale (kWh) apprise entre deux SOC.
+
+        Le temps vaut cette énergie divisée par la puissance, pour toute
+        cible : une même courbe sert toutes les cibles et toutes les
+        puissances de la catégorie. statistic : "mean" ou un quantile
+        ("p10", "p50", "p90").
+        """
+        if power_kw <= 0:
             return None
+        session_key = get_session_key(power_kw)
         
-        # Prédire le temps pour le SOC actuel
-        # Utiliser la moyenne des temps restants pour des SOC similaires
-        predicted_times = []
-        
-        for curve in learning_curves:
-            # Trouver les points les plus proches du SOC actuel
-            closest_socs = sorted(
-                curve.keys(),
-                key=lambda x: abs(x - current_soc)
-            )[:3]  # Prendre les 3 plus proches
-            
-            if not closest_socs:
-                continue
-            
-            # Moyenne pondérée par la distance
-            total_weight = 0.0
-            weighted_time = 0.0
-            
-            for soc in closest_socs:
-                times = curve[soc]
-                avg_time = sum(times) / len(times)
-                distance = abs(soc - current_soc)
-                weight = 1.0 / (distance + 0.1)  # Éviter division par zéro
-                weighted_time += avg_time * weight
-                total_weight += weight
-            
-            if total_weight > 0:
-                predicted_times.append(weighted_time / total_weight)
-        
-        if not predicted_times:
+        # Si pas assez de données, retourner None (utiliser le calcul théorique) ;
+        # la session en cours compte dès son premier intervalle
+        model = self.models.get(session_key)
+        if model is None or model.sessions < MIN_SESSIONS_FOR_PREDICTION:
+            _LOGGER.debug("Pas assez de données historiques pour %s (besoin: 2+, disponible: %s)",
+                        session_key, model.sessions if model else 0)
             return None
         
-        # Moyenne des prédictions de toutes les courbes
-        predicted_time = sum(predicted_times) / len(predicted_times)
-        
-        _LOGGER.debug("Prédiction basée sur l'apprentissage: %s min (SOC: %s%%, Cible: %s%%, Puissance: %s kW)",
-                     predicted_time, current_soc, target_soc, power_kw)
-        
-        return predicted_time
+        # Différence de deux sommes cumulées ; None hors des SOC appris
+        return model.energy(current_soc, target_soc, statistic)
     
     def get_learning_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques d'apprentissage."""
         stats = {
+            "loaded": self.loaded,
             "total_sessions": sum(len(sessions) for sessions in self.history.values()),
+            "total_points": _history_points(self.history),
+            "point_budget": HISTORY_POINT_BUDGET,
             "categories": {},
         }
         
@@ -267,7 +520,248 @@ class ChargeLearning:
             if sessions:
                 stats["categories"][session_key] = {
                     "count": len(sessions),
-                    "latest": sessions[-1].get("end_time", "N/A"),
+                    "latest": sessions[-1].end_time.isoformat() if sessions[-1].end is not None else "N/A",
                 }
         
+        for session_key, model in self.models.items():
+            stats["categories"].setdefault(session_key, {"count": 0, "latest": "N/A"})["model"] = model.summary()
+
         return stats
+
+
+def charger_category(power_kw: float) -> str:
+    """Catégorie de chargeur selon la puissance (la plus proche hors plages)."""
+    for category, (min_power, max_power) in CHARGER_CATEGORIES.items():
+        if min_power <= power_kw < max_power:
+            return category
+    # Par défaut, utiliser la catégorie la plus proche
+    if power_kw < 9.0:
+        return "7kw"
+    elif power_kw < 15.0:
+        return "11kw"
+    elif power_kw < 30.0:
+        return "22kw"
+    elif power_kw < 70.0:
+        return "50kw"
+    else:
+        return "150kw"
+
+
+def get_session_key(power_kw: float) -> str:
+    """Clé d'apprentissage : catégorie de chargeur (indépendante du SOC cible)."""
+    return charger_category(power_kw)
+
+
+def new_session(soc: float, power_kw: float, target_soc: float, timestamp: datetime) -> ChargeSession:
+    """Nouvelle session d'apprentissage (sans point)."""
+    return ChargeSession(
+        get_session_key(power_kw),
+        charger_category(power_kw),
+        target_soc,
+        power_kw,
+        to_epoch(timestamp),
+        soc,
+    )
+
+
+def new_data_point(
+    soc: float, time_remaining: Optional[float], power_kw: float, timestamp: datetime
+) -> Dict[str, Any]:
+    """Point de données d'une session (enregistrement du journal)."""
+    return {
+        "timestamp": timestamp.isoformat(),
+        "soc": soc,
+        "time_remaining": time_remaining,
+        "power_kw": power_kw,
+    }
+
+
+def apply_history_budget(history: Dict[str, List[ChargeSession]]) -> bool:
+    """Retire des sessions jusqu'à respecter HISTORY_POINT_BUDGET ; True si l'historique a changé.
+
+    La session retirée est, parmi la moitié la plus ancienne de
+    l'historique, celle qui a le moins appris (SOC gagné), puis la plus
+    ancienne. Les modèles appris ne changent pas : l'historique ne sert
+    qu'à les reconstruire et aux statistiques.
+    """
+    total = _history_points(history)
+    if total <= HISTORY_POINT_BUDGET:
+        return False
+    sessions = sorted(
+        (session for key_sessions in history.values() for session in key_sessions),
+        key=lambda session: session.start,
+    )
+    evicted = set()
+    while total > HISTORY_POINT_BUDGET and sessions:
+        older = sessions[:max(len(sessions) // 2, 1)]
+        victim = min(
+            range(len(older)),
+            key=lambda index: (abs(older[index].soc_gained), index),
+        )
+        session = sessions.pop(victim)
+        evicted.add(id(session))
+        total -= len(session)
+    for session_key, key_sessions in history.items():
+        history[session_key] = [session for session in key_sessions if id(session) not in evicted]
+    _LOGGER.info("Historique de charge réduit au budget de %s points: %s sessions retirées",
+                HISTORY_POINT_BUDGET, len(evicted))
+    return True
+
+
+def _history_points(history: Dict[str, List[ChargeSession]]) -> int:
+    """Nombre de points de l'historique."""
+    return sum(len(session) for key_sessions in history.values() for session in key_sessions)
+
+
+def _read_history(history_path: str) -> Tuple[Dict[str, List[ChargeSession]], bool]:
+    """Lit l'historique des sessions (vide si absent ou illisible).
+
+    Retourne aussi True si des sessions étaient au format d'une version
+    précédente (liste de points) : l'historique est alors réécrit.
+    """
+    history: Dict[str, List[ChargeSession]] = {}
+    legacy = False
+    try:
+        if not os.path.exists(history_path):
+            _LOGGER.info("Aucun historique existant, création d'un nouveau")
+            return history, False
+        with open(history_path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        for session_key, sessions in content.items():
+            key_sessions = history[session_key] = []
+            for session in sessions:
+                legacy = legacy or "data_points" in session
+                try:
+                    key_sessions.append(ChargeSession.from_dict(session))
+                except (KeyError, TypeError, ValueError) as err:
+                    _LOGGER.warning("Session de charge illisible ignorée: %s", err)
+    except Exception as err:
+        _LOGGER.error("Erreur lors du chargement de l'historique: %s", err)
+    return history, legacy
+
+
+def _read_journal(journal_path: str) -> Optional[ChargeSession]:
+    """Reconstruit la session en cours depuis le journal."""
+    if not os.path.exists(journal_path):
+        return None
+
+    session: Optional[ChargeSession] = None
+    try:
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par un arrêt brutal
+                    continue
+                record_type = record.pop("type", None)
+                if record_type == JOURNAL_START:
+                    session = ChargeSession.from_header(record)
+                elif record_type == JOURNAL_POINT and session is not None:
+                    session.append(
+                        datetime.fromisoformat(record["timestamp"]),
+                        record["soc"],
+                        record.get("time_remaining"),
+                        record.get("power_kw") or 0.0,
+                    )
+    except Exception as err:
+        _LOGGER.error("Erreur lors de la lecture du journal de charge: %s", err)
+        return None
+    return session
+
+
+def _load_learning_files(
+    storage_dir: str,
+    history_path: str,
+    journal_path: str,
+    model_path: str,
+) -> Tuple[
+    Dict[str, List[ChargeSession]],
+    Optional[ChargeSession],
+    Dict[str, RateCurve],
+    bool,
+    bool,
+]:
+    """Lit l'historique, le journal et les modèles (exécuteur).
+
+    Sans fichier de modèles à jour (première version, format changé),
+    l'historique est regroupé par catégorie et les modèles sont reconstruits
+    une fois à partir des points enregistrés, y compris ceux de la session
+    en cours. L'historique est ensuite réduit à ses points informatifs et
+    au budget de points. Retourne aussi (reconstruit, à réécrire).
+    """
+    os.makedirs(storage_dir, exist_ok=True)
+    history, legacy = _read_history(history_path)
+    session = _read_journal(journal_path)
+    if session is not None:
+        session.session_key = get_session_key(session.power_kw)
+    models = _read_models(model_path)
+    if models is not None:
+        return history, session, models, False, _trim_history(history) or legacy
+
+    history = _group_by_category(history)
+    models = {
+        session_key: curve_from_sessions(sessions)
+        for session_key, sessions in history.items()
+    }
+    if session is not None:
+        model = models.get(session.session_key)
+        if model is None:
+            model = models[session.session_key] = RateCurve()
+        add_session_points(model, session)
+    models = {key: model for key, model in models.items() if model.samples}
+    return history, session, models, True, _trim_history(history) or legacy
+
+
+def _trim_history(history: Dict[str, List[ChargeSession]]) -> bool:
+    """Sous-échantillonne les sessions puis applique le budget ; True si l'historique a changé."""
+    trimmed = False
+    for key_sessions in history.values():
+        for session in key_sessions:
+            trimmed = session.downsample() > 0 or trimmed
+    return apply_history_budget(history) or trimmed
+
+
+def _group_by_category(history: Dict[str, List[ChargeSession]]) -> Dict[str, List[ChargeSession]]:
+    """Regroupe les sessions par catégorie (anciennes clés catégorie_cible)."""
+    grouped: Dict[str, List[ChargeSession]] = {}
+    for sessions in history.values():
+        for session in sessions:
+            session.session_key = get_session_key(session.power_kw)
+            grouped.setdefault(session.session_key, []).append(session)
+    for session_key, sessions in grouped.items():
+        sessions.sort(key=lambda session: session.start)
+        grouped[session_key] = sessions[-MAX_SESSIONS_PER_KEY:]
+    return grouped
+
+
+def _read_models(model_path: str) -> Optional[Dict[str, RateCurve]]:
+    """Lit les modèles (None si absents, illisibles ou d'un autre format)."""
+    content = read_json(model_path, "Modèles de charge illisibles, reconstruits: %s")
+    try:
+        if content is None or content.get("version") != MODEL_VERSION:
+            return None
+        return {key: RateCurve.from_dict(model) for key, model in content["models"].items()}
+    except (ValueError, KeyError, TypeError, IndexError, AttributeError) as err:
+        _LOGGER.warning("Modèles de charge illisibles, reconstruits: %s", err)
+        return None
+
+
+def _write_files(
+    history_path: str,
+    history_payload: Optional[str],
+    journal_path: str,
+    journal_lines: List[str],
+    model_path: str,
+    model_payload: Optional[str],
+) -> None:
+    """Écrit l'historique compacté (si fourni), les modèles puis le journal."""
+    if model_payload is not None:
+        write_atomic(model_path, model_payload)
+    if history_payload is not None:
+        write_atomic(history_path, history_payload)
+        # L'historique contient désormais tout le journal précédent
+        write_atomic(journal_path, "".join(f"{line}\n" for line in journal_lines))
+    elif journal_lines:
+        with open(journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{line}\n" for line in journal_lines))
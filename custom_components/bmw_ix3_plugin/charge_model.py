@@ -0,0 +1,357 @@
+"""Modèle de charge appris en ligne : vitesse de charge par tranche de SOC."""
+import bisect
+from typing import Any, Dict, List, Optional, Tuple
+
+from .charge_session import ChargeSession
+
+# Version du format du fichier des modèles
+MODEL_VERSION = 3
+
+# Tranches de 1 % de SOC (0-1 %, …, 99-100 %)
+SOC_BINS = 100
+
+# Tranches extrapolées (%) au-delà des tranches observées
+RATE_EXTRAPOLATION = 5
+
+# Au-delà de cette énergie par % (kWh), la charge était en pause : intervalle ignoré
+MAX_ENERGY_PER_PERCENT = 5.0
+
+# Quantiles estimés par tranche (temps de charge p10/p50/p90) et probabilités
+# des marqueurs P² : extrêmes, quantiles et points intermédiaires
+QUANTILES = {"p10": 0.1, "p50": 0.5, "p90": 0.9}
+SKETCH_MARKERS = (0.0, 0.05, 0.1, 0.3, 0.5, 0.7, 0.9, 0.95, 1.0)
+
+# Valeurs gardées telles quelles (quantiles exacts) avant de passer aux marqueurs
+SKETCH_EXACT = 32
+
+# Intervalle de charge entre deux changements de SOC :
+# (SOC de départ, SOC d'arrivée, minutes, puissance kW)
+RateSample = Tuple[float, float, float, float]
+
+
+class QuantileSketch:
+    """Quantiles en flux (algorithme P² étendu), mémoire constante.
+
+    Neuf marqueurs suivent le minimum, le maximum, p10, p50, p90 et des
+    points intermédiaires ; chaque valeur déplace les marqueurs en O(1)
+    par interpolation parabolique. Les SKETCH_EXACT premières valeurs sont
+    gardées (quantiles exacts), puis placent les marqueurs à leurs rangs :
+    des sessions peu nombreuses ou arrivées dans l'ordre (vieillissement de
+    la batterie) ne faussent pas l'amorçage.
+    """
+
+    def __init__(
+        self,
+        count: int = 0,
+        heights: Optional[List[float]] = None,
+        positions: Optional[List[int]] = None,
+    ) -> None:
+        """Initialise l'estimateur."""
+        self.count = count
+        # Valeurs triées (amorçage), puis hauteurs et rangs des marqueurs
+        self.heights: List[float] = heights or []
+        self.positions: List[int] = positions or []
+
+    def add(self, value: float) -> None:
+        """Ajoute une valeur en O(1)."""
+        heights = self.heights
+        self.count += 1
+        if self.count <= SKETCH_EXACT:
+            bisect.insort(heights, value)
+            return
+        if self.count == SKETCH_EXACT + 1:
+            self._place_markers()
+            heights = self.heights
+
+        positions = self.positions
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[-1]:
+            heights[-1] = value
+            cell = len(heights) - 2
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        for index in range(cell + 1, len(positions)):
+            positions[index] += 1
+
+        for index in range(1, len(heights) - 1):
+            delta = 1 + (self.count - 1) * SKETCH_MARKERS[index] - positions[index]
+            if ((delta >= 1 and positions[index + 1] - positions[index] > 1)
+                    or (delta <= -1 and positions[index - 1] - positions[index] < -1)):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = heights[index] + step * (
+                        (heights[index + step] - heights[index])
+                        / (positions[index + step] - positions[index])
+                    )
+                heights[index] = height
+                positions[index] += step
+
+    def _place_markers(self) -> None:
+        """Remplace les valeurs gardées par les marqueurs, à leurs rangs."""
+        values = self.heights
+        self.heights = [self._exact(values, probability) for probability in SKETCH_MARKERS]
+        self.positions = [round(1 + probability * (len(values) - 1)) for probability in SKETCH_MARKERS]
+
+    @staticmethod
+    def _exact(values: List[float], probability: float) -> float:
+        """Quantile interpolé de valeurs triées."""
+        rank = probability * (len(values) - 1)
+        low = int(rank)
+        high = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
+    def _parabolic(self, index: int, step: int) -> float:
+        """Hauteur ajustée d'un marqueur (formule parabolique P²)."""
+        q, n = self.heights, self.positions
+        return q[index] + step / (n[index + 1] - n[index - 1]) * (
+            (n[index] - n[index - 1] + step) * (q[index + 1] - q[index]) / (n[index + 1] - n[index])
+            + (n[index + 1] - n[index] - step) * (q[index] - q[index - 1]) / (n[index] - n[index - 1])
+        )
+
+    def quantile(self, probability: float) -> Optional[float]:
+        """Quantile estimé ; None sans valeur."""
+        if not self.heights:
+            return None
+        if self.count > SKETCH_EXACT:
+            return self.heights[SKETCH_MARKERS.index(probability)]
+        return self._exact(self.heights, probability)
+
+    def as_list(self) -> List[Any]:
+        """Forme compacte pour l'enregistrement JSON."""
+        return [self.count, self.heights, self.positions]
+
+
+class SocBin:
+    """Tranche de SOC : moyenne et variance pondérées (Welford) et quantiles de l'énergie par %."""
+
+    def __init__(
+        self,
+        weight: float = 0.0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        sketch: Optional[QuantileSketch] = None,
+    ) -> None:
+        """Initialise la tranche."""
+        self.weight = weight
+        self.mean = mean
+        self.m2 = m2
+        self.sketch = sketch or QuantileSketch()
+
+    def add(self, value: float, weight: float) -> None:
+        """Ajoute une valeur pondérée en O(1)."""
+        self.weight += weight
+        delta = value - self.mean
+        self.mean += delta * weight / self.weight
+        self.m2 += weight * delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Variance pondérée de l'énergie par %."""
+        return self.m2 / self.weight if self.weight > 0 else 0.0
+
+    def value(self, statistic: str) -> float:
+        """Moyenne ("mean") ou quantile ("p10", "p50", "p90") de l'énergie par %."""
+        if statistic == "mean":
+            return self.mean
+        quantile = self.sketch.quantile(QUANTILES[statistic])
+        return self.mean if quantile is None else quantile
+
+    def as_list(self) -> List[Any]:
+        """Forme compacte pour l'enregistrement JSON."""
+        return [self.weight, self.mean, self.m2, self.sketch.as_list()]
+
+
+class RateSampler:
+    """Découpe les points d'une session en intervalles entre changements de SOC.
+
+    Le premier intervalle est ignoré (le SOC initial a pu être atteint
+    avant le premier point), ainsi que les baisses de SOC (bruit de mesure).
+    """
+
+    def __init__(self) -> None:
+        """Initialise le découpage."""
+        self.last_soc: Optional[float] = None
+        # Dernier changement de SOC : (horodatage en secondes, SOC, puissance)
+        self.anchor: Optional[Tuple[int, float, float]] = None
+
+    def add(self, timestamp: int, soc: float, power_kw: float) -> Optional[RateSample]:
+        """Ajoute un point (horodatage en secondes) ; retourne l'intervalle terminé par ce point."""
+        last_soc = self.last_soc
+        self.last_soc = soc
+        if last_soc is None or soc == last_soc:
+            return None
+        if soc < last_soc:
+            self.anchor = None
+            return None
+
+        sample = None
+        if self.anchor is not None:
+            anchor_time, anchor_soc, anchor_power = self.anchor
+            minutes = (timestamp - anchor_time) / 60.0
+            powers = [power for power in (anchor_power, power_kw) if power > 0]
+            if minutes > 0 and powers:
+                sample = (anchor_soc, soc, minutes, sum(powers) / len(powers))
+        self.anchor = (timestamp, soc, power_kw)
+        return sample
+
+
+class RateCurve:
+    """Vitesse de charge apprise d'une catégorie de chargeur, pour toute cible.
+
+    Chaque tranche de 1 % de SOC garde l'énergie équivalente à puissance
+    nominale nécessaire pour la franchir (minutes × kW / 60), comme le
+    calcul théorique : le temps entre deux SOC est la somme des tranches
+    divisée par la puissance. Les sommes cumulées (préfixes) sont
+    recalculées en O(SOC_BINS) après une mise à jour, puis chaque
+    prédiction est une différence de deux préfixes, quelle que soit la
+    cible.
+
+    Les quantiles d'une prédiction somment les quantiles des tranches :
+    les tranches d'une même session évoluent ensemble (température,
+    chargeur), la dispersion n'est donc pas réduite par la somme.
+    """
+
+    def __init__(self) -> None:
+        """Initialise une courbe vide."""
+        self.bins: Dict[int, SocBin] = {}
+        # Sessions ayant contribué au moins un intervalle
+        self.sessions = 0
+        self.samples = 0
+        # Préfixes (énergie cumulée, tranches inconnues cumulées) par statistique,
+        # vidés à chaque mise à jour
+        self._prefixes: Dict[str, Tuple[List[float], List[int], List[float]]] = {}
+
+    def add(self, sample: RateSample) -> None:
+        """Répartit un intervalle sur les tranches qu'il traverse, au prorata."""
+        soc_from, soc_to, minutes, power_kw = sample
+        energy_per_percent = minutes * power_kw / 60.0 / (soc_to - soc_from)
+        if energy_per_percent > MAX_ENERGY_PER_PERCENT:
+            return
+        low = max(int(soc_from), 0)
+        high = min(int(soc_to - 1e-9), SOC_BINS - 1)
+        # Quantiles : une observation par tranche couverte au moins à moitié
+        # (à défaut, la tranche du milieu de l'intervalle)
+        sketched = False
+        for index in range(low, high + 1):
+            overlap = min(soc_to, index + 1) - max(soc_from, index)
+            if overlap <= 0:
+                continue
+            soc_bin = self.bins.get(index)
+            if soc_bin is None:
+                soc_bin = self.bins[index] = SocBin()
+            soc_bin.add(energy_per_percent, overlap)
+            if overlap >= 0.5:
+                soc_bin.sketch.add(energy_per_percent)
+                sketched = True
+        if not sketched:
+            middle = min(int((soc_from + soc_to) / 2), SOC_BINS - 1)
+            if middle in self.bins:
+                self.bins[middle].sketch.add(energy_per_percent)
+        self.samples += 1
+        self._prefixes = {}
+
+    def _build_prefix(self, statistic: str) -> Tuple[List[float], List[int], List[float]]:
+        """Valeur par tranche (trous interpolés, extrémités prolongées) et préfixes."""
+        observed = sorted(self.bins)
+        values: List[Optional[float]] = [None] * SOC_BINS
+        if observed:
+            first, last = observed[0], observed[-1]
+            first_value = self.bins[first].value(statistic)
+            last_value = self.bins[last].value(statistic)
+            for index in range(max(first - RATE_EXTRAPOLATION, 0), min(last + RATE_EXTRAPOLATION, SOC_BINS - 1) + 1):
+                if index <= first:
+                    values[index] = first_value
+                elif index >= last:
+                    values[index] = last_value
+            for low, high in zip(observed, observed[1:]):
+                low_value, high_value = self.bins[low].value(statistic), self.bins[high].value(statistic)
+                for index in range(low, high + 1):
+                    values[index] = low_value + (high_value - low_value) * (index - low) / (high - low)
+
+        energy = [0.0] * (SOC_BINS + 1)
+        missing = [0] * (SOC_BINS + 1)
+        filled = [value if value is not None else 0.0 for value in values]
+        for index, value in enumerate(values):
+            energy[index + 1] = energy[index] + filled[index]
+            missing[index + 1] = missing[index] + (value is None)
+        return energy, missing, filled
+
+    def energy(self, current_soc: float, target_soc: float, statistic: str = "mean") -> Optional[float]:
+        """Énergie équivalente (kWh) de current_soc à target_soc ; None hors des tranches connues.
+
+        statistic : "mean" (moyenne) ou un quantile de QUANTILES ("p10", "p50", "p90").
+        """
+        prefix = self._prefixes.get(statistic)
+        if prefix is None:
+            prefix = self._prefixes[statistic] = self._build_prefix(statistic)
+        energy, missing, filled = prefix
+
+        current_soc = min(max(current_soc, 0.0), float(SOC_BINS))
+        target_soc = min(max(target_soc, 0.0), float(SOC_BINS))
+        if target_soc <= current_soc:
+            return 0.0
+        low = min(int(current_soc), SOC_BINS - 1)
+        high = min(int(target_soc - 1e-9), SOC_BINS - 1)
+        if missing[high + 1] - missing[low]:
+            return None
+
+        def cumulative(soc: float) -> float:
+            index = min(int(soc), SOC_BINS - 1)
+            return energy[index] + (soc - index) * filled[index]
+
+        return cumulative(target_soc) - cumulative(current_soc)
+
+    def summary(self) -> Dict[str, Any]:
+        """Résumé de la courbe (diagnostics)."""
+        observed = sorted(self.bins)
+        return {
+            "sessions": self.sessions,
+            "samples": self.samples,
+            "bins": len(observed),
+            "soc_range": [observed[0], observed[-1] + 1] if observed else None,
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Forme enregistrée dans le fichier des modèles."""
+        return {
+            "sessions": self.sessions,
+            "samples": self.samples,
+            "bins": {str(index): self.bins[index].as_list() for index in sorted(self.bins)},
+        }
+
+    @classmethod
+    def from_dict(cls, content: Dict[str, Any]) -> "RateCurve":
+        """Courbe relue depuis le fichier des modèles."""
+        curve = cls()
+        curve.sessions = int(content.get("sessions", 0))
+        curve.samples = int(content.get("samples", 0))
+        for index, values in content.get("bins", {}).items():
+            curve.bins[int(index)] = SocBin(*values[:3], QuantileSketch(*values[3]))
+        return curve
+
+
+def add_session_points(curve: RateCurve, session: ChargeSession) -> None:
+    """Ajoute à la courbe les intervalles d'une session enregistrée (une session comptée)."""
+    sampler = RateSampler()
+    counted = False
+    for timestamp, soc, power_kw in zip(session.timestamps, session.soc, session.power):
+        sample = sampler.add(timestamp, soc, power_kw)
+        if sample is None:
+            continue
+        if not counted:
+            curve.sessions += 1
+            counted = True
+        curve.add(sample)
+
+
+def curve_from_sessions(sessions: List[ChargeSession]) -> RateCurve:
+    """Courbe reconstruite à partir des points enregistrés des sessions."""
+    curve = RateCurve()
+    for session in sessions:
+        add_session_points(curve, session)
+    return curve
@@ -0,0 +1,243 @@
+"""Session de charge en colonnes compactes (tableaux typés, horodatages en secondes)."""
+import math
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Un point n'est gardé que s'il apporte une information : changement de
+# SOC, de puissance ou de temps restant au-delà de ces tolérances, ou point
+# de contrôle après POINT_MAX_INTERVAL sans changement
+SOC_TOLERANCE = 0.001  # %
+POINT_POWER_TOLERANCE = 0.5  # kW
+POINT_TIME_REMAINING_TOLERANCE = 5.0  # minutes
+POINT_MAX_INTERVAL = 15 * 60  # secondes
+
+# Point d'une session : (horodatage en secondes, SOC, temps restant, puissance kW)
+ChargePoint = Tuple[int, float, Optional[float], float]
+
+
+def to_epoch(moment: datetime) -> int:
+    """Horodatage en secondes d'un instant local."""
+    return int(moment.timestamp())
+
+
+def from_epoch(epoch: int) -> datetime:
+    """Instant local d'un horodatage en secondes."""
+    return datetime.fromtimestamp(epoch)
+
+
+class ChargeSession:
+    """Session de charge : en-tête et points en colonnes.
+
+    Les points sont gardés dans des tableaux typés (horodatage en secondes
+    sur 8 octets, SOC, temps restant et puissance en flottants 32 bits,
+    temps restant inconnu : NaN), soit une vingtaine d'octets par point au
+    lieu d'un dictionnaire de chaînes ISO. Le JSON n'est produit qu'aux
+    bords : fichier d'historique, fichier de reprise de l'import.
+    """
+
+    __slots__ = (
+        "session_key",
+        "charger_category",
+        "target_soc",
+        "power_kw",
+        "start",
+        "start_soc",
+        "end",
+        "timestamps",
+        "soc",
+        "time_remaining",
+        "power",
+    )
+
+    def __init__(
+        self,
+        session_key: str,
+        charger_category: str,
+        target_soc: float,
+        power_kw: float,
+        start: int,
+        start_soc: float,
+    ) -> None:
+        """Initialise une session sans point."""
+        self.session_key = session_key
+        self.charger_category = charger_category
+        self.target_soc = target_soc
+        self.power_kw = power_kw
+        self.start = start
+        self.start_soc = start_soc
+        # Fin de la session (secondes), None tant qu'elle est en cours
+        self.end: Optional[int] = None
+        self.timestamps = array("q")
+        self.soc = array("f")
+        self.time_remaining = array("f")
+        self.power = array("f")
+
+    def __len__(self) -> int:
+        """Nombre de points."""
+        return len(self.timestamps)
+
+    @property
+    def start_time(self) -> datetime:
+        """Début de la session."""
+        return from_epoch(self.start)
+
+    @property
+    def end_time(self) -> Optional[datetime]:
+        """Fin de la session (None si en cours)."""
+        return from_epoch(self.end) if self.end is not None else None
+
+    @property
+    def last_time(self) -> datetime:
+        """Horodatage du dernier point (début à défaut)."""
+        return from_epoch(self.timestamps[-1] if self.timestamps else self.start)
+
+    @property
+    def end_soc(self) -> Optional[float]:
+        """SOC du dernier point."""
+        return self.soc[-1] if self.soc else None
+
+    @property
+    def soc_gained(self) -> float:
+        """SOC gagné entre le premier et le dernier point."""
+        return self.soc[-1] - self.soc[0] if self.soc else 0.0
+
+    @property
+    def actual_duration_minutes(self) -> float:
+        """Durée réelle de la session (minutes), 0 si en cours."""
+        return (self.end - self.start) / 60.0 if self.end is not None else 0.0
+
+    def append(
+        self,
+        timestamp: datetime,
+        soc: float,
+        time_remaining: Optional[float],
+        power_kw: float,
+    ) -> bool:
+        """Ajoute un point s'il est informatif ; False s'il a été écarté.
+
+        La comparaison se fait sur les valeurs enregistrées (32 bits), comme
+        au sous-échantillonnage d'un historique relu.
+        """
+        self._push(to_epoch(timestamp), soc, time_remaining, power_kw)
+        if len(self.timestamps) > 1 and not self._informative(len(self.timestamps) - 1, len(self.timestamps) - 2):
+            for column in (self.timestamps, self.soc, self.time_remaining, self.power):
+                column.pop()
+            return False
+        return True
+
+    def _push(self, epoch: int, soc: float, time_remaining: Optional[float], power_kw: float) -> None:
+        """Ajoute un point sans condition."""
+        self.timestamps.append(epoch)
+        self.soc.append(soc)
+        self.time_remaining.append(math.nan if time_remaining is None else time_remaining)
+        self.power.append(power_kw or 0.0)
+
+    def _informative(self, index: int, last: int) -> bool:
+        """Indique si le point index diffère assez du point last pour être gardé.
+
+        Les points intermédiaires à SOC constant ne changent pas la courbe
+        apprise (seuls les changements de SOC forment des intervalles) : sur
+        une longue charge lente, ils sont l'essentiel des lectures.
+        """
+        if abs(self.soc[index] - self.soc[last]) > SOC_TOLERANCE:
+            return True
+        if abs(self.power[index] - self.power[last]) > POINT_POWER_TOLERANCE:
+            return True
+        time_remaining, last_time_remaining = self.time_remaining[index], self.time_remaining[last]
+        if math.isnan(time_remaining) != math.isnan(last_time_remaining):
+            return True
+        if abs(time_remaining - last_time_remaining) > POINT_TIME_REMAINING_TOLERANCE:
+            return True
+        return self.timestamps[index] - self.timestamps[last] >= POINT_MAX_INTERVAL
+
+    def downsample(self) -> int:
+        """Ne garde que les points informatifs ; retourne le nombre de points retirés."""
+        kept = []
+        for index in range(len(self.timestamps)):
+            if not kept or self._informative(index, kept[-1]):
+                kept.append(index)
+        removed = len(self.timestamps) - len(kept)
+        if removed:
+            for name in ("timestamps", "soc", "time_remaining", "power"):
+                column = getattr(self, name)
+                setattr(self, name, array(column.typecode, (column[index] for index in kept)))
+        return removed
+
+    def complete(self, end_time: datetime) -> None:
+        """Termine la session."""
+        self.end = to_epoch(end_time)
+
+    def points(self) -> Iterator[ChargePoint]:
+        """Points de la session (temps restant inconnu : None)."""
+        for epoch, soc, time_remaining, power_kw in zip(self.timestamps, self.soc, self.time_remaining, self.power):
+            yield epoch, soc, None if math.isnan(time_remaining) else time_remaining, power_kw
+
+    def header(self) -> Dict[str, Any]:
+        """En-tête de la session (journal, fichier d'historique)."""
+        return {
+            "session_key": self.session_key,
+            "charger_category": self.charger_category,
+            "target_soc": self.target_soc,
+            "power_kw": self.power_kw,
+            "start_time": self.start_time.isoformat(),
+            "start_soc": self.start_soc,
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Forme enregistrée : en-tête, résumé et points en colonnes."""
+        content = self.header()
+        if self.end is not None:
+            content.update({
+                "end_time": self.end_time.isoformat(),
+                "end_soc": _rounded(self.end_soc),
+                "soc_gained": _rounded(self.soc_gained),
+                "actual_duration_minutes": self.actual_duration_minutes,
+            })
+        content["points"] = {
+            "t": self.timestamps.tolist(),
+            "soc": [_rounded(value) for value in self.soc],
+            "time_remaining": [_rounded(value) for value in self.time_remaining],
+            "power_kw": [_rounded(value) for value in self.power],
+        }
+        return content
+
+    @classmethod
+    def from_header(cls, header: Dict[str, Any]) -> "ChargeSession":
+        """Session sans point depuis son en-tête (KeyError, ValueError si incomplet)."""
+        return cls(
+            header["session_key"],
+            header.get("charger_category", header["session_key"]),
+            header.get("target_soc") or 100.0,
+            header.get("power_kw") or 0.0,
+            to_epoch(datetime.fromisoformat(header["start_time"])),
+            header.get("start_soc") or 0.0,
+        )
+
+    @classmethod
+    def from_dict(cls, content: Dict[str, Any]) -> "ChargeSession":
+        """Session relue : colonnes, ou liste de points d'une version précédente."""
+        session = cls.from_header(content)
+        if content.get("end_time"):
+            session.end = to_epoch(datetime.fromisoformat(content["end_time"]))
+        columns = content.get("points")
+        if columns is not None:
+            session.timestamps = array("q", columns["t"])
+            session.soc = array("f", columns["soc"])
+            session.time_remaining = array("f", (math.nan if value is None else value for value in columns["time_remaining"]))
+            session.power = array("f", columns["power_kw"])
+            return session
+        for point in content.get("data_points", ()):
+            try:
+                epoch = to_epoch(datetime.fromisoformat(point["timestamp"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            session._push(epoch, point["soc"], point.get("time_remaining"), point.get("power_kw") or 0.0)
+        return session
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    """Valeur 32 bits arrondie pour le JSON (None pour NaN)."""
+    if value is None or math.isnan(value):
+        return None
+    return round(value, 3)
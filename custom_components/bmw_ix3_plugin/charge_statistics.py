@@ -0,0 +1,333 @@
+"""Statistiques de charge par jour, semaine et mois (cumuls incrémentaux)."""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE, UnitOfEnergy, UnitOfTime
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .charge_learning import SAVE_DELAY
+from .const import (
+    BATTERY_CAPACITY,
+    CHARGE_EFFICIENCY,
+    DOMAIN,
+    STORAGE_DIR,
+)
+from .storage import read_json, write_atomic
+
+if TYPE_CHECKING:
+    from .charge_session import ChargeSession
+    from .tariff_planner import TariffPlanner
+
+_LOGGER = logging.getLogger(__name__)
+
+# Version du format du fichier de statistiques (1 : dernière heure publiée
+# seulement, 2 : valeurs horaires conservées)
+STATISTICS_VERSION = 2
+
+# Périodes cumulées et nombre de périodes conservées (None : toutes)
+PERIODS = ("day", "week", "month")
+RETENTION = {"day": 400, "week": 110, "month": None}
+
+# Valeurs cumulées par période, et statistiques à long terme correspondantes
+ROLLUP_FIELDS = ("energy_kwh", "sessions", "charging_hours", "off_peak_hours", "cost")
+LONG_TERM_STATISTICS = {
+    "energy_kwh": ("charging_energy", "Énergie chargée", UnitOfEnergy.KILO_WATT_HOUR),
+    "sessions": ("charging_sessions", "Sessions de charge", None),
+    "charging_hours": ("charging_time", "Temps de charge", UnitOfTime.HOURS),
+    "off_peak_hours": ("off_peak_charging_time", "Temps de charge en heures creuses", UnitOfTime.HOURS),
+    "cost": ("charging_cost", "Coût de charge", None),
+}
+
+
+def period_keys(moment: datetime) -> Dict[str, str]:
+    """Clés de période d'un instant : "2026-10-18", "2026-W42", "2026-10"."""
+    year, week, _ = moment.isocalendar()
+    return {
+        "day": moment.strftime("%Y-%m-%d"),
+        "week": f"{year}-W{week:02d}",
+        "month": moment.strftime("%Y-%m"),
+    }
+
+
+def _empty_rollup() -> Dict[str, float]:
+    """Cumul vide d'une période."""
+    return {field: 0.0 for field in ROLLUP_FIELDS}
+
+
+class ChargeStatistics:
+    """Cumuls de charge par jour, semaine et mois.
+
+    Chaque session terminée est ventilée une seule fois sur ses créneaux
+    tarifaires (énergie, coût, heures creuses) puis ajoutée aux cumuls des
+    périodes concernées : le coût ne dépend que de la session, jamais de la
+    taille de l'historique. Les mêmes valeurs sont publiées heure par heure
+    en statistiques à long terme (graphiques sur un an sans relire
+    l'historique).
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, tariff_planner: "TariffPlanner") -> None:
+        """Initialise les statistiques."""
+        self.hass = hass
+        self.tariff_planner = tariff_planner
+        self.path = os.path.join(hass.config.path(STORAGE_DIR), f"statistics_{entry_id}.json")
+
+        # {période: {clé de période: cumul}}
+        self.rollups: Dict[str, Dict[str, Dict[str, float]]] = {period: {} for period in PERIODS}
+        # Incrémentée à chaque session ajoutée (entités à mettre à jour)
+        self.version = 0
+
+        # Valeurs horaires publiées en statistiques à long terme (conservées
+        # RETENTION["day"] jours) et sommes des heures plus anciennes retirées
+        self._hours: Dict[datetime, Dict[str, float]] = {}
+        self._base_sums: Dict[str, float] = {}
+
+        # Sessions terminées avant la fin du chargement
+        self.loaded = False
+        self._pending_sessions: List["ChargeSession"] = []
+
+        # Écriture différée (sessions rapprochées, import de l'historique)
+        self._unsub_save: Optional[Callable[[], None]] = None
+        self._save_lock = asyncio.Lock()
+        self._unsub_final_write: Optional[Callable[[], None]] = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+        )
+
+    async def async_load(self) -> None:
+        """Lit les cumuls (en exécuteur) puis ajoute les sessions en attente.
+
+        Un fichier illisible ou incohérent donne des cumuls vides.
+        """
+        try:
+            content = await self.hass.async_add_executor_job(
+                read_json, self.path, "Statistiques illisibles, ignorées: %s"
+            )
+            if content and content.get("version") in (1, STATISTICS_VERSION):
+                self._restore(content)
+        except Exception as err:
+            _LOGGER.error("Erreur lors du chargement des statistiques, cumuls repris à vide: %s", err)
+            self.rollups = {period: {} for period in PERIODS}
+            self._hours = {}
+            self._base_sums = {}
+        self.loaded = True
+        self.version += 1
+
+        pending = self._pending_sessions
+        self._pending_sessions = []
+        for session in pending:
+            self.add_session(session)
+
+    def _restore(self, content: Dict[str, Any]) -> None:
+        """Réapplique le contenu du fichier (version 1 convertie)."""
+        for period in PERIODS:
+            self.rollups[period] = content.get("rollups", {}).get(period, {})
+        long_term = content.get("long_term") or {}
+        if content["version"] == STATISTICS_VERSION:
+            self._hours = {
+                datetime.fromisoformat(hour): values
+                for hour, values in long_term.get("hours", {}).items()
+            }
+            self._base_sums = long_term.get("base_sums", {})
+        elif long_term.get("last_hour"):
+            # Seule la dernière heure est connue : les précédentes sont dans les sommes
+            hour_values = long_term.get("hour_values", {})
+            self._hours = {datetime.fromisoformat(long_term["last_hour"]): hour_values}
+            self._base_sums = {
+                field: total - hour_values.get(field, 0.0)
+                for field, total in long_term.get("sums", {}).items()
+            }
+
+    def add_session(self, session: "ChargeSession") -> None:
+        """Ajoute une session terminée aux cumuls et aux statistiques à long terme."""
+        if not self.loaded:
+            self._pending_sessions.append(session)
+            return
+
+        start = session.start_time
+        end = session.end_time
+        if end is None or end <= start:
+            return
+
+        # Énergie prélevée sur le réseau, répartie au prorata du temps
+        soc_gained = max(session.soc_gained, 0.0)
+        energy_kwh = soc_gained / 100.0 * BATTERY_CAPACITY / CHARGE_EFFICIENCY
+        duration_hours = (end - start).total_seconds() / 3600.0
+        power_kw = energy_kwh / duration_hours
+
+        slots, reference_price = self.tariff_planner.priced_slots(start, end)
+        priced = self.tariff_planner.priced
+        days: Dict[str, Dict[str, float]] = {}
+        hours: Dict[datetime, Dict[str, float]] = {}
+        for slot_start, slot_end, price in slots:
+            slot_hours = (slot_end - slot_start).total_seconds() / 3600.0
+            values = {
+                "energy_kwh": power_kw * slot_hours,
+                "charging_hours": slot_hours,
+                "off_peak_hours": slot_hours if price < reference_price else 0.0,
+                "cost": power_kw * slot_hours * price,
+            }
+            for bucket in (
+                days.setdefault(period_keys(slot_start)["day"], _empty_rollup()),
+                hours.setdefault(slot_start.replace(minute=0, second=0, microsecond=0), _empty_rollup()),
+            ):
+                for field, value in values.items():
+                    bucket[field] += value
+
+        # Session comptée le jour (semaine, mois) de son début
+        days.setdefault(period_keys(start)["day"], _empty_rollup())["sessions"] += 1
+        hours.setdefault(start.replace(minute=0, second=0, microsecond=0), _empty_rollup())["sessions"] += 1
+
+        for day, values in days.items():
+            keys = period_keys(datetime.strptime(day, "%Y-%m-%d"))
+            for period in PERIODS:
+                rollup = self.rollups[period].setdefault(keys[period], _empty_rollup())
+                for field, value in values.items():
+                    rollup[field] += value
+        self._prune()
+        self.version += 1
+
+        if not priced:
+            # Coûts relatifs : absents des statistiques à long terme (pas d'unité)
+            for values in hours.values():
+                values["cost"] = 0.0
+        self._publish_long_term(sorted(hours.items()), priced)
+        self._schedule_save()
+
+    def _prune(self) -> None:
+        """Supprime les périodes les plus anciennes au-delà de la rétention."""
+        for period, limit in RETENTION.items():
+            rollups = self.rollups[period]
+            while limit is not None and len(rollups) > limit:
+                del rollups[min(rollups)]
+
+    def _publish_long_term(self, hours: List[Tuple[datetime, Dict[str, float]]], priced: bool) -> None:
+        """Ajoute les cumuls horaires de la session et publie les statistiques externes.
+
+        Les sommes sont cumulées depuis la première session : elles sont
+        recalculées et republiées depuis la première heure de la session, si
+        bien qu'une session importée (antérieure aux heures déjà publiées)
+        décale les sommes des heures suivantes. Le coût n'est publié qu'avec
+        des prix en unité monétaire.
+        """
+        oldest = min(self._hours) if self._hours else None
+        if self._base_sums and oldest is not None:
+            # Heures retirées : les sommes antérieures ne sont plus connues
+            hours = [(hour, values) for hour, values in hours if hour >= oldest]
+        if not hours:
+            return
+        for hour, values in hours:
+            hour_values = self._hours.setdefault(hour, {field: 0.0 for field in LONG_TERM_STATISTICS})
+            for field in LONG_TERM_STATISTICS:
+                hour_values[field] = hour_values.get(field, 0.0) + values[field]
+        self._prune_hours()
+
+        first_hour = hours[0][0]
+        sums = {field: self._base_sums.get(field, 0.0) for field in LONG_TERM_STATISTICS}
+        rows: Dict[str, List[StatisticData]] = {field: [] for field in LONG_TERM_STATISTICS}
+        for hour in sorted(self._hours):
+            hour_values = self._hours[hour]
+            for field in LONG_TERM_STATISTICS:
+                sums[field] += hour_values.get(field, 0.0)
+                if hour >= first_hour:
+                    rows[field].append(
+                        StatisticData(start=hour.astimezone(), state=hour_values.get(field, 0.0), sum=sums[field])
+                    )
+
+        if "recorder" not in self.hass.config.components:
+            return
+        for field, (object_id, name, unit) in LONG_TERM_STATISTICS.items():
+            if not rows[field] or (field == "cost" and not priced):
+                continue
+            async_add_external_statistics(
+                self.hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"BMW iX3 {name}",
+                    source=DOMAIN,
+                    statistic_id=f"{DOMAIN}:{object_id}",
+                    unit_of_measurement=self.hass.config.currency if field == "cost" else unit,
+                ),
+                rows[field],
+            )
+
+    def _prune_hours(self) -> None:
+        """Retire les heures au-delà de la rétention en reportant leurs valeurs dans les sommes de base."""
+        cutoff = max(self._hours) - timedelta(days=RETENTION["day"])
+        for hour in [hour for hour in self._hours if hour < cutoff]:
+            for field, value in self._hours.pop(hour).items():
+                self._base_sums[field] = self._base_sums.get(field, 0.0) + value
+
+    def summary(self, period: str, moment: Optional[datetime] = None) -> Dict[str, Any]:
+        """Cumul de la période contenant moment (maintenant par défaut)."""
+        key = period_keys(moment or datetime.now())[period]
+        rollup = self.rollups[period].get(key) or _empty_rollup()
+        charging_hours = rollup["charging_hours"]
+        return {
+            "period": key,
+            "energy_kwh": round(rollup["energy_kwh"], 2),
+            "sessions": int(rollup["sessions"]),
+            "average_power_kw": round(rollup["energy_kwh"] / charging_hours, 2) if charging_hours else None,
+            "charging_hours": round(charging_hours, 2),
+            "off_peak_hours": round(rollup["off_peak_hours"], 2),
+            "cost": round(rollup["cost"], 2),
+        }
+
+    def _schedule_save(self) -> None:
+        """Planifie une sauvegarde différée (une écriture pour les sessions rapprochées)."""
+        if self._unsub_save is None:
+            self._unsub_save = async_call_later(self.hass, SAVE_DELAY, self._async_save_later)
+
+    @callback
+    def _async_save_later(self, _now: datetime) -> None:
+        """Déclenche l'écriture planifiée."""
+        self._unsub_save = None
+        self.hass.async_create_task(self.async_save())
+
+    async def async_save(self) -> None:
+        """Écrit les cumuls (encodage sur la boucle, écriture en exécuteur).
+
+        Les écritures sont sérialisées : deux sauvegardes ne partagent
+        jamais le fichier temporaire.
+        """
+        if self._unsub_save:
+            self._unsub_save()
+            self._unsub_save = None
+
+        async with self._save_lock:
+            payload = json.dumps(
+                {
+                    "version": STATISTICS_VERSION,
+                    "rollups": self.rollups,
+                    "long_term": {
+                        "hours": {hour.isoformat(): values for hour, values in self._hours.items()},
+                        "base_sums": self._base_sums,
+                    },
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            try:
+                await self.hass.async_add_executor_job(write_atomic, self.path, payload)
+            except OSError as err:
+                _LOGGER.error("Erreur lors de la sauvegarde des statistiques: %s", err)
+
+    async def _async_final_write(self, _event: Event) -> None:
+        """Dernière écriture à l'arrêt de Home Assistant."""
+        self._unsub_final_write = None
+        if self._unsub_save:
+            await self.async_save()
+
+    async def async_shutdown(self) -> None:
+        """Écrit les cumuls en attente et libère les abonnements."""
+        if self._unsub_final_write:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        if self._unsub_save:
+            await self.async_save()
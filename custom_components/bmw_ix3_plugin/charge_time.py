@@ -0,0 +1,129 @@
+"""Calcul des temps de charge pour BMW iX3."""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .charge_learning import ChargeLearning
+from .const import (
+    BATTERY_CAPACITY,
+    CHARGE_EFFICIENCY,
+    FAST_CHARGE_THRESHOLD,
+    SLOW_CHARGE_FACTOR,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _theoretical_energy(current_soc: float, target_soc: float) -> float:
+    """Énergie équivalente à puissance nominale (kWh), ralentissement compris.
+
+    Le temps théorique vaut cette énergie divisée par la puissance : elle ne
+    dépend que du SOC et de la cible, ce qui permet de la calculer une fois
+    par cible pour toute une grille de puissances.
+    """
+    # Calcul de l'énergie nécessaire (kWh), efficacité de charge comprise
+    if target_soc <= FAST_CHARGE_THRESHOLD:
+        # Charge rapide jusqu'à 80%
+        return (target_soc - current_soc) / 100.0 * BATTERY_CAPACITY / CHARGE_EFFICIENCY
+
+    # Charge mixte : rapide jusqu'à 80%, puis lente
+    energy_to_80 = (FAST_CHARGE_THRESHOLD - current_soc) / 100.0 * BATTERY_CAPACITY / CHARGE_EFFICIENCY
+    energy_above_80 = (target_soc - FAST_CHARGE_THRESHOLD) / 100.0 * BATTERY_CAPACITY / CHARGE_EFFICIENCY
+
+    if current_soc >= FAST_CHARGE_THRESHOLD:
+        energy_to_80 = 0.0
+    return energy_to_80 + energy_above_80 / SLOW_CHARGE_FACTOR
+
+
+def theoretical_charge_time(current_soc: float, target_soc: float, power_kw: float) -> float:
+    """Temps de charge théorique en minutes (ralentissement au-delà de 80%)."""
+    return _theoretical_energy(current_soc, target_soc) / power_kw * 60  # Conversion en minutes
+
+
+def calculate_charge_time(
+    current_soc: float,
+    target_soc: float,
+    power_kw: float,
+    charge_learning: Optional[ChargeLearning] = None,
+) -> Optional[float]:
+    """Calcule le temps de charge en minutes."""
+    if current_soc >= target_soc:
+        return 0.0
+
+    # Essayer d'abord d'utiliser les données d'apprentissage
+    if charge_learning is not None:
+        learned_time = charge_learning.predict_charge_time(
+            current_soc=current_soc,
+            target_soc=target_soc,
+            power_kw=power_kw,
+        )
+        if learned_time is not None:
+            _LOGGER.debug("Utilisation des données d'apprentissage: %s min", learned_time)
+            return learned_time
+
+    # Sinon, utiliser le calcul théorique
+    charge_time = theoretical_charge_time(current_soc, target_soc, power_kw)
+    _LOGGER.debug("Utilisation du calcul théorique: %s min", charge_time)
+    return charge_time
+
+
+def charge_time_grid(
+    current_soc: float,
+    powers: Sequence[float],
+    targets: Sequence[float],
+    charge_learning: Optional[ChargeLearning] = None,
+) -> List[List[float]]:
+    """Temps de charge (minutes) pour toutes les combinaisons cible × puissance.
+
+    Retourne une ligne par cible et une colonne par puissance. Le terme
+    théorique est calculé une fois par cible, et l'énergie apprise une fois
+    par couple (catégorie de chargeur, cible) : le coût ne croît pas avec le
+    nombre de puissances d'une même catégorie.
+    """
+    learned_cache: Dict[Tuple[str, float], Optional[float]] = {}
+    grid: List[List[float]] = []
+
+    for target_soc in targets:
+        if current_soc >= target_soc:
+            grid.append([0.0] * len(powers))
+            continue
+
+        energy = _theoretical_energy(current_soc, target_soc)
+        row: List[float] = []
+        for power_kw in powers:
+            learned_energy = None
+            if charge_learning is not None:
+                key = (charge_learning.get_charger_category(power_kw), target_soc)
+                if key not in learned_cache:
+                    learned_cache[key] = charge_learning.predict_charge_energy(
+                        current_soc=current_soc,
+                        target_soc=target_soc,
+                        power_kw=power_kw,
+                    )
+                learned_energy = learned_cache[key]
+            row.append((learned_energy if learned_energy is not None else energy) / power_kw * 60)
+        grid.append(row)
+
+    return grid
+
+
+def parse_grid_values(value: str) -> List[float]:
+    """Liste de nombres positifs triés depuis une chaîne "3.7, 7.4, 11"."""
+    values = set()
+    for item in value.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            number = float(item)
+        except ValueError:
+            _LOGGER.warning("Valeur de grille ignorée: %s", item)
+            continue
+        if number > 0:
+            values.add(number)
+    return sorted(values)
+
+
+def round_to_minute(moment: datetime) -> datetime:
+    """Heure arrondie à la minute la plus proche (attributs stables)."""
+    return (moment + timedelta(seconds=30)).replace(second=0, microsecond=0)
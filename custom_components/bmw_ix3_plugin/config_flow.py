@@ -6,6 +6,7 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
     DOMAIN,
@@ -14,7 +15,20 @@ from .const import (
     CONF_V2C_IP,
     CONF_V2C_USERNAME,
     CONF_V2C_PASSWORD,
+    CONF_GRID_POWERS,
+    CONF_GRID_TARGETS,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_TARIFF_WINDOWS,
+    CONF_TARIFF_ENTITY,
+    CONF_TARIFF_ATTRIBUTE,
+    CONF_TARIFF_FILE,
+    DEFAULT_GRID_POWERS,
+    DEFAULT_GRID_TARGETS,
+    DEFAULT_COMPACT_ATTRIBUTES,
+    DEFAULT_TARIFF_WINDOWS,
+    DEFAULT_TARIFF_ATTRIBUTE,
 )
+from .v2c_client import V2CTrydanClient
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -82,8 +96,10 @@ class BMWiX3ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def _test_v2c_connection(self, ip: str, username: str, password: str) -> bool:
         """Test de connexion à la borne V2C."""
-        # Simulation - à remplacer par un vrai test de connexion
+        # L'API locale Trydan n'utilise pas d'authentification
         _LOGGER.info("Test de connexion V2C à %s", ip)
+        client = V2CTrydanClient(async_get_clientsession(self.hass), ip)
+        await client.async_get_status()
         return True
 
     @staticmethod
@@ -117,5 +133,14 @@ class BMWiX3OptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional("target_soc", default=80): vol.All(
                     vol.Coerce(int), vol.Range(min=50, max=100)
                 ),
+                vol.Optional(CONF_GRID_POWERS, default=DEFAULT_GRID_POWERS): str,
+                vol.Optional(CONF_GRID_TARGETS, default=DEFAULT_GRID_TARGETS): str,
+                vol.Optional(
+                    CONF_COMPACT_ATTRIBUTES, default=DEFAULT_COMPACT_ATTRIBUTES
+                ): bool,
+                vol.Optional(CONF_TARIFF_WINDOWS, default=DEFAULT_TARIFF_WINDOWS): str,
+                vol.Optional(CONF_TARIFF_ENTITY, default=""): str,
+                vol.Optional(CONF_TARIFF_ATTRIBUTE, default=DEFAULT_TARIFF_ATTRIBUTE): str,
+                vol.Optional(CONF_TARIFF_FILE, default=""): str,
             }),
         )
@@ -9,6 +9,9 @@ CONF_V2C_IP = "v2c_ip"
 CONF_V2C_USERNAME = "v2c_username"
 CONF_V2C_PASSWORD = "v2c_password"
 
+# Répertoire de stockage (historique, journal, instantané) dans /config
+STORAGE_DIR = "bmw_ix3_learning"
+
 # Entités BMW
 BMW_BATTERY_LEVEL = "battery_level"
 BMW_CHARGING_STATUS = "charging_status"
@@ -32,10 +35,32 @@ CHARGE_TIME_100_11KW = "charge_time_100_11kw"
 CHARGE_TIME_80_22KW = "charge_time_80_22kw"
 CHARGE_TIME_100_22KW = "charge_time_100_22kw"
 
+# Grille de temps de charge (options, valeurs séparées par des virgules)
+CONF_GRID_POWERS = "charge_grid_powers"
+CONF_GRID_TARGETS = "charge_grid_targets"
+DEFAULT_GRID_POWERS = "3.7, 7.4, 11, 22"
+DEFAULT_GRID_TARGETS = "80, 100"
+
+# Attributs compacts (options) : les calculateurs n'exposent que des attributs
+# stables, les valeurs volatiles sont regroupées dans le capteur de plan de charge
+CONF_COMPACT_ATTRIBUTES = "compact_attributes"
+DEFAULT_COMPACT_ATTRIBUTES = True
+
+# Tarif de l'électricité (options) : plages fixes "22:00-06:00[=prix]", ou
+# série de prix par créneau dans l'attribut d'une entité ou un fichier JSON
+CONF_TARIFF_WINDOWS = "tariff_windows"
+CONF_TARIFF_ENTITY = "tariff_entity"
+CONF_TARIFF_ATTRIBUTE = "tariff_attribute"
+CONF_TARIFF_FILE = "tariff_file"
+DEFAULT_TARIFF_WINDOWS = ""
+DEFAULT_TARIFF_ATTRIBUTE = "raw_today, raw_tomorrow"
+TARIFF_FILE_CHECK_INTERVAL = 300  # secondes entre deux vérifications du fichier de prix
+
 # Planification
 DEPARTURE_TIME = "departure_time"
 TARGET_SOC = "target_soc"
 OPTIMAL_START_TIME = "optimal_start_time"
+PLAN_QUANTILE = "p90"  # temps de charge appris retenu pour planifier (dépassé une session sur dix)
 
 # Capacité batterie BMW iX3 (kWh)
 BATTERY_CAPACITY = 80.0
@@ -55,7 +80,23 @@ SLOW_CHARGE_FACTOR = 0.5  # Réduction de 50% après 80%
 
 # Mise à jour des données
 UPDATE_INTERVAL = 300  # 5 minutes
-CHARGING_UPDATE_INTERVAL = 60  # 1 minute pendant la charge
+PUSH_SAFETY_INTERVAL = 1800  # 30 minutes en mode push (filet de sécurité)
+PUSH_DEBOUNCE_DELAY = 2  # secondes de regroupement des changements BMW
+SNAPSHOT_INTERVAL = 300  # secondes entre deux enregistrements de l'instantané
+ADAPTIVE_MIN_INTERVAL = 10  # secondes, à l'approche d'un seuil
+ADAPTIVE_MAX_CHARGING_INTERVAL = 600  # secondes, au milieu d'une session
+
+# Clé de disponibilité du coordinateur dans coordinator.data_view
+DATA_VIEW_AVAILABLE = "coordinator.available"
+
+# Import de l'historique de l'enregistreur
+DEFAULT_HISTORY_IMPORT_DAYS = 365
+HISTORY_IMPORT_CHUNK = 86400  # secondes d'historique lues par morceau
+
+# Arrêt automatique
+AUTO_STOP_THRESHOLD = 80.0
+DEFAULT_TARGET_SOC = 80.0
+DEFAULT_CHARGING_POWER = 7.4  # kW, si la puissance n'est pas connue
 
 # Notifications iOS
 NOTIFICATION_CHARGING_START = "charging_start"
@@ -1,23 +1,65 @@
 """Coordinateur pour le plugin BMW iX3."""
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from datetime import date, datetime, time, timedelta
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
 
-import aiohttp
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_interval,
+)
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
+    DOMAIN,
+    DATA_VIEW_AVAILABLE,
     UPDATE_INTERVAL,
-    CHARGING_UPDATE_INTERVAL,
+    PUSH_SAFETY_INTERVAL,
+    PUSH_DEBOUNCE_DELAY,
+    SNAPSHOT_INTERVAL,
     CONF_BMW_USERNAME,
     CONF_BMW_PASSWORD,
     CONF_V2C_IP,
-    CONF_V2C_USERNAME,
-    CONF_V2C_PASSWORD,
+    AUTO_STOP_THRESHOLD,
+    DEFAULT_TARGET_SOC,
+    DEFAULT_CHARGING_POWER,
+    PLAN_QUANTILE,
 )
+from .auto_stop import AutoStopController
 from .charge_learning import ChargeLearning
+from .charge_model import QUANTILES
+from .charge_statistics import ChargeStatistics
+from .charge_time import calculate_charge_time, charge_time_grid
+from .entity_index import (
+    BMWEntityIndex,
+    PRIORITY_LAST_KNOWN,
+    UNAVAILABLE_STATES,
+    parse_charging_status,
+    parse_percentage,
+    parse_positive_float,
+    parse_time_remaining,
+)
+from .history_import import ChargeHistoryImport
+from .plan_executor import ChargePlanExecutor
+from .profiling import (
+    RefreshProfiler,
+    STAGE_BATTERY_SELECTION,
+    STAGE_ENTITY_SCAN,
+    STAGE_INDEX_BUILD,
+    STAGE_PUSH_UPDATE,
+    STAGE_RECORD_CHARGING_DATA,
+    STAGE_REFRESH,
+    STAGE_V2C_FETCH,
+)
+from .scheduler import next_refresh_interval
+from .snapshot import CoordinatorSnapshot
+from .tariff_planner import ChargingPlan, TariffPlanner
+from .v2c_client import V2CError, V2CTrydanClient
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,10 +71,66 @@ class BMWiX3Coordinator(DataUpdateCoordinator):
         """Initialise le coordinateur."""
         self.config = config
         self.entry_id = entry_id
-        self.session: Optional[aiohttp.ClientSession] = None
         
-        # Système d'apprentissage
-        self.charge_learning = ChargeLearning(hass, entry_id)
+        # Client de la borne V2C (session HTTP partagée de Home Assistant)
+        self.v2c_client: Optional[V2CTrydanClient] = None
+        if config.get(CONF_V2C_IP):
+            self.v2c_client = V2CTrydanClient(
+                async_get_clientsession(hass), config[CONF_V2C_IP]
+            )
+        
+        # Planification partagée par les entités (arrêt auto, SOC cible, départ)
+        self.auto_stop_enabled = True
+        self.planned_target_soc = DEFAULT_TARGET_SOC
+        self.departure_time = time(8, 0)
+        # Puissance prévue pour le plan (sinon puissance de charge connue)
+        self.planned_charging_power: Optional[float] = None
+        
+        # Durées des étapes de mise à jour (diagnostics)
+        self.profiler = RefreshProfiler()
+        
+        # Système d'apprentissage (historique chargé en arrière-plan)
+        self.charge_learning = ChargeLearning(hass, entry_id, self.profiler)
+        self._learning_task: Optional[asyncio.Task] = None
+        
+        # Dernières données connues, restaurées au démarrage et enregistrées
+        # périodiquement (seulement si elles ont changé) et à l'arrêt
+        self.snapshot = CoordinatorSnapshot(hass, entry_id)
+        self._unsub_final_write: Optional[Callable[[], None]] = None
+        self._unsub_snapshot_interval: Optional[Callable[[], None]] = None
+        self._saved_snapshot: Optional[Tuple[Any, Dict[str, Any]]] = None
+        
+        # Temps de charge partagés par les calculateurs, par génération de données
+        self._charge_time_cache: Dict[Tuple[float, float, float], Optional[float]] = {}
+        self._quantile_cache: Dict[Tuple[float, float, float], Optional[Dict[str, float]]] = {}
+        self._charge_time_generation: Optional[Dict[str, Any]] = None
+        
+        # Tarif de l'électricité et plans de charge, par génération de données
+        self.tariff_planner = TariffPlanner(hass, config)
+        self._plan_cache: Dict[Tuple[Any, ...], Optional[ChargingPlan]] = {}
+        
+        # Cumuls jour/semaine/mois, alimentés par chaque session terminée
+        self.charge_statistics = ChargeStatistics(hass, entry_id, self.tariff_planner)
+        self.charge_learning.async_add_session_listener(self.charge_statistics.add_session)
+        
+        # Vue à plat, en lecture seule, des valeurs publiées aux entités et
+        # clés modifiées depuis la publication précédente
+        self.data_view: Mapping[str, Any] = MappingProxyType({})
+        self.changed_keys: FrozenSet[str] = frozenset()
+        
+        # Index des entités BMW (construit à la première mise à jour)
+        self.entity_index = BMWEntityIndex(hass)
+        
+        # Mode push : suivi des entités sources BMW CarData
+        self._unsub_index_listener: Optional[Callable[[], None]] = None
+        self._unsub_state_tracking: Optional[Callable[[], None]] = None
+        self._push_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=PUSH_DEBOUNCE_DELAY,
+            immediate=False,
+            function=self._async_push_update,
+        )
         
         # Intervalle de mise à jour dynamique
         update_interval = timedelta(seconds=UPDATE_INTERVAL)
@@ -43,24 +141,162 @@ class BMWiX3Coordinator(DataUpdateCoordinator):
             name="BMW iX3 Plugin",
             update_interval=update_interval,
         )
+        
+        # Arrêt automatique local (démarré après la première mise à jour)
+        self.auto_stop = AutoStopController(self)
+        
+        # Exécution du plan de charge par minuteries (démarrée avec l'arrêt auto)
+        self.plan_executor = ChargePlanExecutor(self)
+        
+        # Import de l'historique de l'enregistreur (service import_charge_history)
+        self.history_import = ChargeHistoryImport(self, entry_id)
+
+    async def async_restore(self) -> bool:
+        """Prépare un démarrage non bloquant.
+        
+        Lance le chargement de l'historique d'apprentissage en arrière-plan
+        et restaure le dernier instantané des données. Retourne True si des
+        données ont été restaurées (la première mise à jour peut alors se
+        faire en arrière-plan).
+        """
+        self._learning_task = self.hass.async_create_background_task(
+            self._async_load_learning(), f"{DOMAIN} learning load {self.entry_id}"
+        )
+        self._unsub_final_write = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+        )
+        self._unsub_snapshot_interval = async_track_time_interval(
+            self.hass, self._async_save_snapshot, timedelta(seconds=SNAPSHOT_INTERVAL)
+        )
+        await self.tariff_planner.async_start(self._async_tariff_changed)
+        
+        snapshot = await self.snapshot.async_load()
+        if snapshot is None:
+            return False
+        self._restore_state(snapshot.get("state") or {})
+        self.data = snapshot.get("data")
+        self._saved_snapshot = (self.data, self._snapshot_state())
+        return self.data is not None
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        """Réglages de planification et d'arrêt automatique à conserver."""
+        return {
+            "auto_stop_enabled": self.auto_stop_enabled,
+            "auto_stop_fired": self.auto_stop.fired,
+            "planned_target_soc": self.planned_target_soc,
+            "departure_time": self.departure_time.strftime("%H:%M"),
+            "planned_charging_power": self.planned_charging_power,
+            "plan_execution": self.plan_executor.state(),
+        }
+
+    def _restore_state(self, state: Dict[str, Any]) -> None:
+        """Réapplique les réglages de l'instantané."""
+        try:
+            self.auto_stop_enabled = bool(state.get("auto_stop_enabled", self.auto_stop_enabled))
+            self.auto_stop.fired = bool(state.get("auto_stop_fired", False))
+            self.planned_target_soc = float(state.get("planned_target_soc", self.planned_target_soc))
+            if state.get("departure_time"):
+                hour, minute = state["departure_time"].split(":")
+                self.departure_time = time(int(hour), int(minute))
+            if state.get("planned_charging_power") is not None:
+                self.planned_charging_power = float(state["planned_charging_power"])
+            self.plan_executor.restore(state.get("plan_execution") or {})
+        except (TypeError, ValueError) as err:
+            _LOGGER.warning("Réglages de l'instantané ignorés: %s", err)
+
+    async def _async_save_snapshot(self, _now: Optional[datetime] = None) -> None:
+        """Enregistre l'instantané s'il a changé depuis la dernière écriture."""
+        if not self.data:
+            return
+        state = self._snapshot_state()
+        if self._saved_snapshot is not None:
+            saved_data, saved_state = self._saved_snapshot
+            if saved_data is self.data and saved_state == state:
+                return
+        self._saved_snapshot = (self.data, state)
+        await self.snapshot.async_save({"data": self.data, "state": state})
+
+    async def _async_load_learning(self) -> None:
+        """Charge les statistiques et l'historique, puis recalcule les temps avec les courbes apprises.
+
+        Chaque stockage gère ses propres erreurs de lecture (repris à vide) :
+        l'échec de l'un ne bloque pas l'autre.
+        """
+        await self.charge_statistics.async_load()
+        await self.charge_learning.async_load()
+
+        # Les temps en cache ont été calculés sans historique
+        self._charge_time_generation = None
+        if self.data is not None:
+            self.async_update_listeners()
+
+    async def async_wait_learning_loaded(self) -> bool:
+        """Attend la fin du chargement de l'apprentissage ; False s'il n'a pas été lancé."""
+        if self._learning_task is not None:
+            await asyncio.shield(self._learning_task)
+        return self.charge_learning.loaded and self.charge_statistics.loaded
+
+    @callback
+    def _async_tariff_changed(self) -> None:
+        """Recalcule le plan de charge avec les nouveaux prix."""
+        self._plan_cache = {}
+        if self.data is not None:
+            self.async_update_listeners()
+
+    async def _async_final_write(self, _event: Event) -> None:
+        """Enregistre l'instantané à l'arrêt de Home Assistant."""
+        self._unsub_final_write = None
+        await self._async_save_snapshot()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Suit le plan de charge, publie la vue des valeurs et ses différences, puis notifie les entités."""
+        self.plan_executor.async_follow_plan()
+        self._publish_data_view()
+        super().async_update_listeners()
+
+    def _publish_data_view(self) -> None:
+        """Construit la vue à plat ("section.clé") et calcule les clés modifiées."""
+        view: Dict[str, Any] = {
+            DATA_VIEW_AVAILABLE: self.last_update_success,
+            "planning.auto_stop_enabled": self.auto_stop_enabled,
+            "planning.planned_target_soc": self.planned_target_soc,
+            "planning.departure_time": self.departure_time,
+            "learning.curves_version": self.charge_learning.curves_version,
+            "planning.tariff_version": self.tariff_planner.version,
+            "statistics.version": self.charge_statistics.version,
+            "statistics.day": date.today(),
+        }
+        for section, values in (self.data or {}).items():
+            if isinstance(values, dict):
+                for key, value in values.items():
+                    view[f"{section}.{key}"] = value
+            else:
+                view[section] = values
+        
+        plan = self.current_charging_plan()
+        view["planning.charge_periods"] = plan.periods if plan else None
+        view["planning.plan_execution_enabled"] = self.plan_executor.enabled
+        view["planning.scheduled_periods"] = self.plan_executor.periods
+        
+        previous = self.data_view
+        self.changed_keys = frozenset(
+            key for key in view.keys() | previous.keys()
+            if key not in view or key not in previous or previous[key] != view[key]
+        )
+        self.data_view = MappingProxyType(view)
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Mise à jour des données."""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
         try:
             # Mise à jour des données BMW et V2C en parallèle
-            bmw_task = self._update_bmw_data()
-            v2c_task = self._update_v2c_data()
-            
-            bmw_data, v2c_data = await asyncio.gather(bmw_task, v2c_task)
+            with self.profiler.measure(STAGE_REFRESH):
+                bmw_data, v2c_data = await asyncio.gather(
+                    self._update_bmw_data(), self._update_v2c_data()
+                )
             
             # Ajustement de l'intervalle de mise à jour selon l'état de charge
-            if bmw_data.get("charging_status") == "CHARGING":
-                self.update_interval = timedelta(seconds=CHARGING_UPDATE_INTERVAL)
-            else:
-                self.update_interval = timedelta(seconds=UPDATE_INTERVAL)
+            self.update_interval = self._compute_update_interval(bmw_data, v2c_data)
             
             return {
                 "bmw": bmw_data,
@@ -89,135 +325,56 @@ class BMWiX3Coordinator(DataUpdateCoordinator):
                 "target_soc": None,
             }
             
+            # L'index est construit une seule fois puis tenu à jour par événements
+            if not self.entity_index.started:
+                with self.profiler.measure(STAGE_INDEX_BUILD):
+                    self._async_start_entity_tracking()
+            
             detected_entities = []
-            battery_candidates = []  # Pour prioriser "last known" vs "predicted"
             
-            # Parcourir toutes les entités pour trouver celles de BMW CarData
-            for entity_id in hass.states.async_entity_ids():
-                # Recherche flexible : bmw, ix3, cardata, bimmerdata, etc.
-                entity_lower = entity_id.lower()
-                if not any(keyword in entity_lower for keyword in ["bmw", "ix3", "cardata", "bimmerdata"]):
-                    continue
-                
-                state = hass.states.get(entity_id)
-                if not state or state.state in ("unknown", "unavailable", "None"):
-                    continue
-                
-                detected_entities.append(entity_id)
-                entity_name = state.name.lower()
-                
-                # Niveau de batterie - PRIORISER "last known" au lieu de "predicted"
-                if any(keyword in entity_name for keyword in [
-                    "state of charge", "battery charge level", "soc"
-                ]):
+            with self.profiler.measure(STAGE_BATTERY_SELECTION):
+                # Niveau de batterie - candidats déjà triés par priorité ("last known" d'abord)
+                for entity_id, priority in self.entity_index.battery_candidates():
+                    state = hass.states.get(entity_id)
+                    if not state or state.state in UNAVAILABLE_STATES:
+                        continue
+                    
+                    detected_entities.append(entity_id)
+                    if bmw_entities["battery_level"] is not None:
+                        continue
+                    
                     try:
                         value = float(state.state)
                         if 0 <= value <= 100:  # Validation
-                            # Prioriser "last known" sur "predicted"
-                            is_last_known = "last known" in entity_name
-                            battery_candidates.append({
-                                "entity_id": entity_id,
-                                "value": value,
-                                "priority": 1 if is_last_known else 2  # 1 = priorité haute
-                            })
-                            _LOGGER.debug("Batterie trouvée: %s = %s%% (last known: %s)", 
-                                         entity_id, value, is_last_known)
+                            bmw_entities["battery_level"] = value
+                            _LOGGER.info("Batterie sélectionnée: %s = %s%% (priorité: %s)", 
+                                       entity_id, value, 
+                                       "last known" if priority == PRIORITY_LAST_KNOWN else "predicted")
                     except (ValueError, TypeError):
                         pass
             
-            # Sélectionner la meilleure entité batterie (priorité à "last known")
-            if battery_candidates:
-                # Trier par priorité (1 = last known, 2 = predicted)
-                battery_candidates.sort(key=lambda x: x["priority"])
-                best_battery = battery_candidates[0]
-                bmw_entities["battery_level"] = best_battery["value"]
-                _LOGGER.info("Batterie sélectionnée: %s = %s%% (priorité: %s)", 
-                           best_battery["entity_id"], best_battery["value"], 
-                           "last known" if best_battery["priority"] == 1 else "predicted")
-            
-            # Parcourir à nouveau pour les autres entités
-            for entity_id in hass.states.async_entity_ids():
-                # Recherche flexible : bmw, ix3, cardata, bimmerdata, etc.
-                entity_lower = entity_id.lower()
-                if not any(keyword in entity_lower for keyword in ["bmw", "ix3", "cardata", "bimmerdata"]):
-                    continue
-                
-                state = hass.states.get(entity_id)
-                if not state or state.state in ("unknown", "unavailable", "None"):
-                    continue
-                
-                entity_name = state.name.lower()
-                
-                # Ignorer les entités de batterie déjà traitées
-                if any(keyword in entity_name for keyword in [
-                    "state of charge", "battery charge level", "soc"
-                ]):
-                    continue  # Déjà traité dans la première boucle
-                
-                # État de charge - entités spécifiques BMW CarData
-                if any(keyword in entity_name for keyword in [
-                    "charging status", "hv charging status"
-                ]):
-                    status = state.state.upper()
-                    bmw_entities["charging_status"] = status
-                    _LOGGER.debug("État charge trouvé: %s = %s", entity_id, status)
-                
-                # Puissance de charge - entités spécifiques BMW CarData
-                elif any(keyword in entity_name for keyword in [
-                    "predicted charge speed", "charging power"
-                ]):
-                    try:
-                        value = float(state.state)
-                        if value >= 0:  # Validation
-                            bmw_entities["charging_power"] = value
-                            _LOGGER.debug("Puissance trouvée: %s = %s kW", entity_id, value)
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Autonomie électrique - entités spécifiques BMW CarData
-                elif any(keyword in entity_name for keyword in [
-                    "forecast electric range", "electric range", "range"
-                ]):
-                    try:
-                        value = float(state.state)
-                        if value >= 0:  # Validation
-                            bmw_entities["range_electric"] = value
-                            _LOGGER.debug("Autonomie trouvée: %s = %s km", entity_id, value)
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Temps restant de charge - entités spécifiques BMW CarData
-                elif any(keyword in entity_name for keyword in [
-                    "charging time remaining", "time remaining"
-                ]):
-                    try:
-                        # Peut être en minutes ou format "HH:MM"
-                        value_str = state.state
-                        if ":" in value_str:
-                            # Format "HH:MM"
-                            parts = value_str.split(":")
-                            hours = int(parts[0])
-                            minutes = int(parts[1])
-                            value = hours * 60 + minutes
-                        else:
-                            value = float(value_str)
-                        if value >= 0:  # Validation
-                            bmw_entities["charging_time_remaining"] = value
-                            _LOGGER.debug("Temps restant trouvé: %s = %s min", entity_id, value)
-                    except (ValueError, TypeError):
-                        pass
-                
-                # SOC cible - entités spécifiques BMW CarData
-                elif any(keyword in entity_name for keyword in [
-                    "target state of charge", "target soc", "target charge"
-                ]):
-                    try:
-                        value = float(state.state)
-                        if 0 <= value <= 100:  # Validation
-                            bmw_entities["target_soc"] = value
-                            _LOGGER.debug("SOC cible trouvé: %s = %s%%", entity_id, value)
-                    except (ValueError, TypeError):
-                        pass
+            with self.profiler.measure(STAGE_ENTITY_SCAN):
+                # Autres rôles - la dernière entité valide l'emporte
+                for role, parser in (
+                    ("charging_status", parse_charging_status),
+                    ("charging_power", parse_positive_float),
+                    ("range_electric", parse_positive_float),
+                    ("charging_time_remaining", parse_time_remaining),
+                    ("target_soc", parse_percentage),
+                ):
+                    for entity_id in self.entity_index.entities_for_role(role):
+                        state = hass.states.get(entity_id)
+                        if not state or state.state in UNAVAILABLE_STATES:
+                            continue
+                    
+                        detected_entities.append(entity_id)
+                        try:
+                            value = parser(state.state)
+                        except (ValueError, TypeError, IndexError):
+                            continue
+                        if value is not None:
+                            bmw_entities[role] = value
+                            _LOGGER.debug("%s trouvé: %s = %s", role, entity_id, value)
             
             # Log des entités détectées
             if detected_entities:
@@ -236,15 +393,18 @@ class BMWiX3Coordinator(DataUpdateCoordinator):
                 "last_update": datetime.now().isoformat(),
             }
             
-            # Enregistrer les données pour l'apprentissage si en charge
-            if bmw_data["charging_status"] == "CHARGING":
-                self.charge_learning.record_charging_data(
-                    soc=bmw_data["battery_level"],
-                    time_remaining=bmw_data.get("charging_time_remaining"),
-                    power_kw=bmw_data["charging_power"],
-                    target_soc=bmw_data.get("target_soc") or 100.0,
-                    charging_status=bmw_data["charging_status"],
-                )
+            # Enregistrer les données pour l'apprentissage si en charge,
+            # ou finaliser la session en cours quand la charge s'arrête
+            if (bmw_data["charging_status"] == "CHARGING"
+                    or self.charge_learning.current_session is not None):
+                with self.profiler.measure(STAGE_RECORD_CHARGING_DATA):
+                    self.charge_learning.record_charging_data(
+                        soc=bmw_data["battery_level"],
+                        time_remaining=bmw_data.get("charging_time_remaining"),
+                        power_kw=bmw_data["charging_power"],
+                        target_soc=bmw_data.get("target_soc") or 100.0,
+                        charging_status=bmw_data["charging_status"],
+                    )
             
             _LOGGER.info("🚗 BMW iX3 - Batterie: %s%%, État: %s, Autonomie: %s km", 
                         bmw_data["battery_level"], bmw_data["charging_status"], bmw_data["range_electric"])
@@ -261,52 +421,264 @@ class BMWiX3Coordinator(DataUpdateCoordinator):
                 "last_update": datetime.now().isoformat(),
             }
 
+    def get_charge_time(
+        self, current_soc: float, target_soc: float, power_kw: float
+    ) -> Optional[float]:
+        """Temps de charge en minutes, calculé une fois par génération de données.
+        
+        Tous les calculateurs partagent ce cache : une combinaison
+        (SOC, cible, puissance) n'est évaluée qu'une fois par mise à jour.
+        """
+        self._check_cache_generation()
+        key = (current_soc, target_soc, power_kw)
+        if key not in self._charge_time_cache:
+            self._charge_time_cache[key] = calculate_charge_time(
+                current_soc, target_soc, power_kw, self.charge_learning
+            )
+        return self._charge_time_cache[key]
+
+    def get_charge_time_quantiles(
+        self, current_soc: float, target_soc: float, power_kw: float
+    ) -> Optional[Dict[str, float]]:
+        """Temps de charge p10/p50/p90 (minutes) appris, par génération de données.
+        
+        None tant que la courbe de la catégorie de chargeur ne couvre pas
+        ces SOC (calcul théorique seul, sans dispersion connue).
+        """
+        self._check_cache_generation()
+        key = (current_soc, target_soc, power_kw)
+        if key not in self._quantile_cache:
+            self._quantile_cache[key] = (
+                {statistic: 0.0 for statistic in QUANTILES} if current_soc >= target_soc
+                else self.charge_learning.predict_charge_time_quantiles(current_soc, target_soc, power_kw)
+            )
+        return self._quantile_cache[key]
+
+    def _check_cache_generation(self) -> None:
+        """Vide les caches (temps de charge, plans) à chaque nouvelle génération de données."""
+        if self._charge_time_generation is not self.data:
+            self._charge_time_cache = {}
+            self._quantile_cache = {}
+            self._plan_cache = {}
+            self._charge_time_generation = self.data
+
+    def compute_charging_plan(
+        self,
+        current_soc: float,
+        target_soc: float,
+        departure: datetime,
+        power_kw: float,
+    ) -> Optional[ChargingPlan]:
+        """Créneaux de charge les moins chers pour atteindre la cible au départ.
+        
+        La durée de charge est le p90 de la courbe apprise (dépassé une
+        session sur dix) : la charge démarre au plus tard sans marge
+        arbitraire. Sans quantiles, le calcul théorique est utilisé. Le
+        plan est mis en cache jusqu'à la prochaine génération de données ou
+        au prochain changement de prix.
+        """
+        self._check_cache_generation()
+        key = (current_soc, target_soc, departure, power_kw, self.tariff_planner.version)
+        if key not in self._plan_cache:
+            quantiles = self.get_charge_time_quantiles(current_soc, target_soc, power_kw)
+            charge_time = (
+                quantiles[PLAN_QUANTILE] if quantiles is not None
+                else self.get_charge_time(current_soc, target_soc, power_kw)
+            )
+            self._plan_cache[key] = (
+                None if charge_time is None
+                else self.tariff_planner.plan(datetime.now(), departure, charge_time, power_kw)
+            )
+        return self._plan_cache[key]
+
+    def current_charging_plan(self) -> Optional[ChargingPlan]:
+        """Plan de charge pour le SOC actuel, le SOC cible et l'heure de départ."""
+        bmw_data = (self.data or {}).get("bmw", {})
+        current_soc = bmw_data.get("battery_level")
+        if current_soc is None:
+            return None
+        return self.compute_charging_plan(
+            current_soc,
+            self.planned_target_soc,
+            self.next_departure(),
+            self.planned_charging_power or self.effective_power(bmw_data),
+        )
+
+    def next_departure(self, departure_time: Optional[time] = None) -> datetime:
+        """Prochaine occurrence de l'heure de départ (planifiée par défaut)."""
+        now = datetime.now()
+        departure = datetime.combine(now.date(), departure_time or self.departure_time)
+        if departure <= now:
+            departure += timedelta(days=1)
+        return departure
+
+    def compute_charge_time_grid(
+        self,
+        current_soc: float,
+        powers: Sequence[float],
+        targets: Sequence[float],
+    ) -> List[List[float]]:
+        """Temps de charge (minutes) pour chaque cible (lignes) et puissance (colonnes)."""
+        return charge_time_grid(current_soc, powers, targets, self.charge_learning)
+
+    def _compute_update_interval(
+        self, bmw_data: Dict[str, Any], v2c_data: Optional[Dict[str, Any]] = None
+    ) -> timedelta:
+        """Intervalle de mise à jour adaptatif (seuils de charge, départ planifié)."""
+        charging = bmw_data.get("charging_status") == "CHARGING"
+        current_soc = bmw_data.get("battery_level") or 0.0
+        power_kw = self.effective_power(bmw_data, v2c_data)
+        
+        # Mode push : les données BMW arrivent par événements, le sondage au
+        # repos n'est qu'un filet de sécurité
+        idle_interval = UPDATE_INTERVAL if self._unsub_state_tracking is None else PUSH_SAFETY_INTERVAL
+        
+        thresholds = [self.planned_target_soc]
+        if self.auto_stop_enabled:
+            thresholds.append(AUTO_STOP_THRESHOLD)
+        
+        return next_refresh_interval(
+            charging=charging,
+            current_soc=current_soc,
+            thresholds=thresholds,
+            minutes_to_soc=lambda target: self.get_charge_time(current_soc, target, power_kw),
+            minutes_to_start=None if charging else self._minutes_to_planned_start(current_soc, power_kw),
+            idle_interval=idle_interval,
+        )
+
+    def effective_power(
+        self, bmw_data: Dict[str, Any], v2c_data: Optional[Dict[str, Any]] = None
+    ) -> float:
+        """Puissance de charge connue (BMW, puis V2C), sinon valeur par défaut."""
+        if v2c_data is None:
+            v2c_data = (self.data or {}).get("v2c", {})
+        return (
+            bmw_data.get("charging_power")
+            or v2c_data.get("charging_power")
+            or DEFAULT_CHARGING_POWER
+        )
+
+    def planned_start_time(self, current_soc: float, power_kw: float) -> Optional[datetime]:
+        """Début du plan de charge (créneaux les moins chers) pour la cible au départ."""
+        plan = self.compute_charging_plan(
+            current_soc, self.planned_target_soc, self.next_departure(), power_kw
+        )
+        return plan.start if plan else None
+
+    def _minutes_to_planned_start(self, current_soc: float, power_kw: float) -> Optional[float]:
+        """Minutes avant le début de charge nécessaire pour l'heure de départ."""
+        start = self.planned_start_time(current_soc, power_kw)
+        if start is None:
+            return None
+        return (start - datetime.now()).total_seconds() / 60.0
+
+    @callback
+    def _async_start_entity_tracking(self) -> None:
+        """Construit l'index et s'abonne aux changements des entités sources."""
+        self.entity_index.async_start()
+        self._unsub_index_listener = self.entity_index.async_add_listener(
+            self._async_track_source_entities
+        )
+        self._async_track_source_entities()
+
+    @callback
+    def _async_track_source_entities(self) -> None:
+        """(Ré)abonne le coordinateur aux entités BMW indexées."""
+        if self._unsub_state_tracking:
+            self._unsub_state_tracking()
+            self._unsub_state_tracking = None
+        
+        tracked = self.entity_index.tracked_entities
+        if not tracked:
+            return
+        
+        self._unsub_state_tracking = async_track_state_change_event(
+            self.hass, tracked, self._async_source_state_changed
+        )
+        _LOGGER.debug("Mode push actif sur %s entités BMW", len(tracked))
+
+    @callback
+    def _async_source_state_changed(self, event: Event) -> None:
+        """Regroupe les changements d'état BMW avant mise à jour."""
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if old_state is not None and new_state is not None and old_state.state == new_state.state:
+            return  # Seuls les attributs ont changé
+        
+        self.hass.async_create_task(self._push_debouncer.async_call())
+
+    async def _async_push_update(self) -> None:
+        """Publie les nouvelles données BMW sans attendre le prochain sondage."""
+        with self.profiler.measure(STAGE_PUSH_UPDATE):
+            bmw_data = await self._update_bmw_data()
+        data = dict(self.data or {})
+        data["bmw"] = bmw_data
+        data["last_update"] = datetime.now().isoformat()
+        
+        # async_set_updated_data replanifie le sondage avec cet intervalle
+        self.update_interval = self._compute_update_interval(bmw_data)
+        self.async_set_updated_data(data)
+
     async def _update_v2c_data(self) -> Dict[str, Any]:
         """Mise à jour des données V2C."""
+        if not self.v2c_client:
+            return {}
+        
         try:
-            v2c_ip = self.config.get(CONF_V2C_IP)
-            v2c_username = self.config.get(CONF_V2C_USERNAME, "admin")
-            v2c_password = self.config.get(CONF_V2C_PASSWORD, "")
-            
-            if not v2c_ip:
-                return {}
-            
-            # Simulation des données V2C - à remplacer par l'API réelle
-            v2c_data = {
-                "status": "CHARGING",  # CHARGING, READY, ERROR
-                "charging_enabled": True,
-                "charging_power": 7.4,  # kW
-                "charging_current": 32,  # A
-                "last_update": datetime.now().isoformat(),
-            }
+            with self.profiler.measure(STAGE_V2C_FETCH):
+                v2c_data = dict(await self.v2c_client.async_get_status())
+            v2c_data["last_update"] = datetime.now().isoformat()
             
             _LOGGER.debug("Données V2C mises à jour: %s", v2c_data)
             return v2c_data
             
+        except V2CError as err:
+            _LOGGER.warning("Borne V2C indisponible: %s", err)
+            return {}
         except Exception as err:
             _LOGGER.error("Erreur lors de la récupération des données V2C: %s", err)
             return {}
 
     async def async_shutdown(self) -> None:
         """Arrêt du coordinateur."""
-        if self.session:
-            await self.session.close()
+        if self._learning_task and not self._learning_task.done():
+            self._learning_task.cancel()
+        if self._unsub_final_write:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        if self._unsub_snapshot_interval:
+            self._unsub_snapshot_interval()
+            self._unsub_snapshot_interval = None
+        await self.history_import.async_stop()
+        self.tariff_planner.async_stop()
+        self.plan_executor.async_stop()
+        await self._async_save_snapshot()
+        self.auto_stop.async_stop()
+        self._push_debouncer.async_cancel()
+        if self._unsub_state_tracking:
+            self._unsub_state_tracking()
+            self._unsub_state_tracking = None
+        if self._unsub_index_listener:
+            self._unsub_index_listener()
+            self._unsub_index_listener = None
+        self.entity_index.async_stop()
+        await self.charge_learning.async_shutdown()
+        await self.charge_statistics.async_shutdown()
 
     async def control_v2c_charging(self, enabled: bool) -> bool:
         """Contrôle de la charge V2C."""
+        if not self.v2c_client:
+            return False
+        
         try:
-            v2c_ip = self.config.get(CONF_V2C_IP)
-            if not v2c_ip:
-                return False
-            
-            # Simulation du contrôle V2C - à remplacer par l'API réelle
             _LOGGER.info("Contrôle V2C: %s", "Activation" if enabled else "Désactivation")
+            await self.v2c_client.async_set_paused(not enabled)
             
             # Forcer une mise à jour après le contrôle
             await self.async_request_refresh()
             
             return True
             
-        except Exception as err:
+        except V2CError as err:
             _LOGGER.error("Erreur lors du contrôle V2C: %s", err)
             return False
@@ -0,0 +1,59 @@
+"""Diagnostics du plugin BMW iX3."""
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DOMAIN,
+    CONF_BMW_USERNAME,
+    CONF_BMW_PASSWORD,
+    CONF_V2C_IP,
+    CONF_V2C_USERNAME,
+    CONF_V2C_PASSWORD,
+)
+from .charge_statistics import PERIODS
+from .entity_index import ROLES
+
+TO_REDACT = {
+    CONF_BMW_USERNAME,
+    CONF_BMW_PASSWORD,
+    CONF_V2C_IP,
+    CONF_V2C_USERNAME,
+    CONF_V2C_PASSWORD,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Diagnostics d'une entrée : configuration, durées des mises à jour, apprentissage."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    update_interval = coordinator.update_interval
+
+    return {
+        "config": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": async_redact_data(dict(entry.options), TO_REDACT),
+        "refresh_timings": coordinator.profiler.summary(),
+        "update_interval_seconds": update_interval.total_seconds() if update_interval else None,
+        "last_update_success": coordinator.last_update_success,
+        "entity_index": {
+            "started": coordinator.entity_index.started,
+            "detected_entities": len(coordinator.entity_index.detected_entities),
+            "roles": {
+                role: coordinator.entity_index.entities_for_role(role) for role in ROLES
+            },
+        },
+        "v2c": {
+            "configured": coordinator.v2c_client is not None,
+            "available": coordinator.v2c_client.available if coordinator.v2c_client else None,
+        },
+        "learning": coordinator.charge_learning.get_learning_stats(),
+        "history_import": coordinator.history_import.summary(),
+        "statistics": {
+            period: coordinator.charge_statistics.summary(period)
+            for period in PERIODS
+        },
+        "data": coordinator.data,
+    }
@@ -0,0 +1,36 @@
+"""Entité de base du plugin BMW iX3."""
+from typing import Optional, Tuple
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DATA_VIEW_AVAILABLE
+
+
+class BMWiX3Entity(CoordinatorEntity):
+    """Entité du coordinateur qui n'écrit son état que si ses entrées changent.
+
+    Chaque sous-classe déclare dans _dependencies les clés de
+    coordinator.data_view qu'elle lit ("bmw.battery_level",
+    "planning.planned_target_soc"...). Une mise à jour du coordinateur qui
+    ne modifie aucune de ces clés ne produit ni écriture d'état, ni ligne
+    dans l'enregistreur, ni événement state_changed.
+    """
+
+    # Clés lues par l'entité ; None : écriture à chaque mise à jour
+    _dependencies: Optional[Tuple[str, ...]] = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Écrit l'état uniquement si une dépendance (ou la disponibilité) a changé."""
+        changed_keys = self.coordinator.changed_keys
+        if (self._dependencies is not None
+                and DATA_VIEW_AVAILABLE not in changed_keys
+                and changed_keys.isdisjoint(self._dependencies)):
+            return
+        self._async_refresh_values()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_refresh_values(self) -> None:
+        """Recalcule les valeurs mises en cache avant l'écriture de l'état."""
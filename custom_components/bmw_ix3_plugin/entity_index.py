@@ -0,0 +1,273 @@
+"""Index des entités BMW CarData utilisées par le coordinateur."""
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+_LOGGER = logging.getLogger(__name__)
+
+# Mots-clés identifiant une entité BMW (BMW Connected Drive, BMW CarData, etc.)
+BMW_ENTITY_KEYWORDS = ("bmw", "ix3", "cardata", "bimmerdata")
+
+# Mots-clés par rôle, testés sur le nom amical de l'entité (dans cet ordre)
+BATTERY_KEYWORDS = ("state of charge", "battery charge level", "soc")
+ROLE_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("charging_status", ("charging status", "hv charging status")),
+    ("charging_power", ("predicted charge speed", "charging power")),
+    ("range_electric", ("forecast electric range", "electric range", "range")),
+    ("charging_time_remaining", ("charging time remaining", "time remaining")),
+    ("target_soc", ("target state of charge", "target soc", "target charge")),
+)
+
+ROLE_BATTERY_LEVEL = "battery_level"
+ROLES = (ROLE_BATTERY_LEVEL,) + tuple(role for role, _ in ROLE_KEYWORDS)
+
+# États sans valeur exploitable
+UNAVAILABLE_STATES = ("unknown", "unavailable", "None")
+
+# Priorités des candidats batterie (1 = "last known", 2 = "predicted")
+PRIORITY_LAST_KNOWN = 1
+PRIORITY_OTHER = 2
+
+
+def is_bmw_entity(entity_id: str) -> bool:
+    """Indique si l'entity_id ressemble à une entité BMW."""
+    entity_lower = entity_id.lower()
+    return any(keyword in entity_lower for keyword in BMW_ENTITY_KEYWORDS)
+
+
+def classify_entity(name: str) -> Tuple[Optional[str], int]:
+    """Détermine le rôle d'une entité BMW à partir de son nom amical.
+
+    Retourne le rôle (ou None) et la priorité pour les candidats batterie.
+    """
+    entity_name = name.lower()
+
+    # Niveau de batterie - PRIORISER "last known" au lieu de "predicted"
+    if any(keyword in entity_name for keyword in BATTERY_KEYWORDS):
+        is_last_known = "last known" in entity_name
+        return ROLE_BATTERY_LEVEL, PRIORITY_LAST_KNOWN if is_last_known else PRIORITY_OTHER
+
+    for role, keywords in ROLE_KEYWORDS:
+        if any(keyword in entity_name for keyword in keywords):
+            return role, 0
+
+    return None, 0
+
+
+def parse_charging_status(value: str) -> str:
+    """État de charge BMW normalisé."""
+    return value.upper()
+
+
+def parse_positive_float(value: str) -> Optional[float]:
+    """Valeur numérique positive (puissance, autonomie)."""
+    number = float(value)
+    return number if number >= 0 else None
+
+
+def parse_percentage(value: str) -> Optional[float]:
+    """Pourcentage entre 0 et 100."""
+    number = float(value)
+    return number if 0 <= number <= 100 else None
+
+
+def parse_time_remaining(value: str) -> Optional[float]:
+    """Temps restant en minutes (minutes ou format "HH:MM")."""
+    if ":" in value:
+        parts = value.split(":")
+        number = int(parts[0]) * 60 + int(parts[1])
+    else:
+        number = float(value)
+    return number if number >= 0 else None
+
+
+# Lecture de l'état de chaque rôle
+ROLE_PARSERS: Dict[str, Callable[[str], Any]] = {
+    ROLE_BATTERY_LEVEL: parse_percentage,
+    "charging_status": parse_charging_status,
+    "charging_power": parse_positive_float,
+    "range_electric": parse_positive_float,
+    "charging_time_remaining": parse_time_remaining,
+    "target_soc": parse_percentage,
+}
+
+
+class BMWEntityIndex:
+    """Index persistant rôle → entités BMW.
+
+    L'index est construit une seule fois par un parcours complet des états,
+    puis maintenu par les événements state_changed et du registre des
+    entités. Une mise à jour du coordinateur ne consulte ainsi que les
+    entités déjà associées à un rôle.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise l'index."""
+        self.hass = hass
+        # entity_id → (rôle, priorité, nom) pour toutes les entités BMW
+        self._entities: Dict[str, Tuple[Optional[str], int, str]] = {}
+        # rôle → entity_ids dans l'ordre de découverte
+        self._roles: Dict[str, List[str]] = {role: [] for role in ROLES}
+        self._unsubscribers: List[Callable[[], None]] = []
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def started(self) -> bool:
+        """Indique si l'index est construit et suivi."""
+        return bool(self._unsubscribers)
+
+    @property
+    def detected_entities(self) -> List[str]:
+        """Entités BMW connues de l'index."""
+        return list(self._entities)
+
+    def entities_for_role(self, role: str) -> List[str]:
+        """Entités associées à un rôle, dans l'ordre de découverte."""
+        return self._roles[role]
+
+    @property
+    def tracked_entities(self) -> List[str]:
+        """Entités associées à un rôle (sources du coordinateur)."""
+        return [entity_id for entities in self._roles.values() for entity_id in entities]
+
+    def battery_candidates(self) -> List[Tuple[str, int]]:
+        """Candidats batterie triés par priorité (1 = "last known")."""
+        return sorted(
+            ((entity_id, self._entities[entity_id][1])
+             for entity_id in self._roles[ROLE_BATTERY_LEVEL]),
+            key=lambda candidate: candidate[1],
+        )
+
+    def preferred_entities(self) -> Dict[str, List[str]]:
+        """Entités de chaque rôle par ordre de préférence.
+
+        Même choix que le coordinateur : le meilleur candidat batterie
+        disponible, la dernière entité valide pour les autres rôles.
+        """
+        preferred = {
+            role: list(reversed(self._roles[role]))
+            for role in ROLES if role != ROLE_BATTERY_LEVEL
+        }
+        preferred[ROLE_BATTERY_LEVEL] = [entity_id for entity_id, _ in self.battery_candidates()]
+        return preferred
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Enregistre un callback appelé quand les entités suivies changent."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_start(self) -> None:
+        """Construit l'index et s'abonne aux changements."""
+        if self.started:
+            return
+
+        for state in self.hass.states.async_all():
+            if is_bmw_entity(state.entity_id):
+                self._index_entity(state.entity_id, state.name)
+
+        self._unsubscribers.append(
+            self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._async_state_changed,
+                event_filter=self._async_filter_state_changed,
+            )
+        )
+        self._unsubscribers.append(
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_registry_updated
+            )
+        )
+        _LOGGER.debug("Index des entités BMW construit: %s entités", len(self._entities))
+
+    @callback
+    def async_stop(self) -> None:
+        """Se désabonne des événements."""
+        while self._unsubscribers:
+            self._unsubscribers.pop()()
+
+    @callback
+    def _async_filter_state_changed(self, event: Event) -> bool:
+        """Ne retient que les entités indexées et les entités ajoutées.
+
+        Les mises à jour des autres entités (l'essentiel du bus) sont
+        écartées sans classification ; un renommage d'entity_id est vu comme
+        un retrait suivi d'un ajout.
+        """
+        return event.data["entity_id"] in self._entities or event.data.get("old_state") is None
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Met à jour l'index lors d'un ajout, retrait ou renommage d'entité."""
+        entity_id = event.data["entity_id"]
+        new_state = event.data.get("new_state")
+
+        if new_state is None:
+            if entity_id in self._entities:
+                self._async_notify_if(self._remove_entity(entity_id))
+            return
+
+        known = self._entities.get(entity_id)
+        if known is not None:
+            # Seul un changement de nom amical peut modifier le rôle
+            if known[2] != new_state.name:
+                old_role = known[0]
+                new_role = self._index_entity(entity_id, new_state.name)
+                self._async_notify_if(old_role is not None or new_role is not None)
+            return
+
+        # Entité inconnue : classée uniquement à son ajout
+        if event.data.get("old_state") is None and is_bmw_entity(entity_id):
+            self._async_notify_if(self._index_entity(entity_id, new_state.name) is not None)
+
+    @callback
+    def _async_registry_updated(self, event: Event) -> None:
+        """Gère les suppressions et renommages dans le registre des entités."""
+        action = event.data.get("action")
+        entity_id = event.data.get("entity_id")
+        old_entity_id = event.data.get("old_entity_id")
+
+        if action == "remove" and entity_id in self._entities:
+            self._async_notify_if(self._remove_entity(entity_id))
+        elif action == "update" and old_entity_id and old_entity_id in self._entities:
+            changed = self._remove_entity(old_entity_id)
+            state = self.hass.states.get(entity_id)
+            if state is not None and entity_id and is_bmw_entity(entity_id):
+                changed = self._index_entity(entity_id, state.name) is not None or changed
+            self._async_notify_if(changed)
+
+    def _index_entity(self, entity_id: str, name: str) -> Optional[str]:
+        """Ajoute (ou réindexe) une entité BMW et retourne son rôle."""
+        if entity_id in self._entities:
+            self._remove_entity(entity_id)
+        role, priority = classify_entity(name)
+        self._entities[entity_id] = (role, priority, name)
+        if role is not None:
+            self._roles[role].append(entity_id)
+            _LOGGER.debug("Entité BMW indexée: %s → %s", entity_id, role)
+        return role
+
+    def _remove_entity(self, entity_id: str) -> bool:
+        """Retire une entité de l'index (True si elle avait un rôle)."""
+        role, _, _ = self._entities.pop(entity_id)
+        if role is None:
+            return False
+        self._roles[role].remove(entity_id)
+        return True
+
+    @callback
+    def _async_notify_if(self, changed: bool) -> None:
+        """Prévient les abonnés si les entités suivies ont changé."""
+        if not changed:
+            return
+        for update_callback in list(self._listeners):
+            update_callback()
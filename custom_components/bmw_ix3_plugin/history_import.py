@@ -0,0 +1,301 @@
+"""Import de l'historique de charge depuis l'enregistreur Home Assistant."""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.const import COMPRESSED_STATE_LAST_UPDATED, COMPRESSED_STATE_STATE
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .charge_learning import (
+    INDETERMINATE_STATUSES,
+    SESSION_RESUME_GAP,
+    get_session_key,
+    new_session,
+)
+from .charge_session import ChargeSession
+from .const import HISTORY_IMPORT_CHUNK, STORAGE_DIR
+from .entity_index import ROLE_BATTERY_LEVEL, ROLE_PARSERS, UNAVAILABLE_STATES
+from .storage import read_json, write_atomic
+
+if TYPE_CHECKING:
+    from .coordinator import BMWiX3Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Version du format du fichier de reprise
+IMPORT_VERSION = 1
+
+# Rôle → entity_ids par ordre de préférence (la première valeur valide l'emporte)
+RoleEntities = Dict[str, List[str]]
+
+
+class SessionSegmenter:
+    """Découpe une suite de lectures BMW en sessions de charge terminées.
+
+    Mêmes règles que ChargeLearning.record_charging_data : une session
+    démarre avec l'état CHARGING, change avec la catégorie de chargeur,
+    se termine quand la charge s'arrête ou après plus de
+    SESSION_RESUME_GAP sans point. Seules la session ouverte et les
+    dernières valeurs des entités sont gardées en mémoire (reprise d'un
+    morceau d'historique au suivant).
+    """
+
+    def __init__(self, role_entities: RoleEntities) -> None:
+        """Initialise le découpage."""
+        self.role_entities = role_entities
+        self.entity_roles = {
+            entity_id: role
+            for role, entity_ids in role_entities.items()
+            for entity_id in entity_ids
+        }
+        # Dernière valeur valide par entité
+        self.values: Dict[str, Any] = {}
+        self.session: Optional[ChargeSession] = None
+        self.last_point_time: Optional[datetime] = None
+
+    def state(self) -> Dict[str, Any]:
+        """État à conserver dans le fichier de reprise."""
+        return {
+            "values": self.values,
+            "session": self.session.as_dict() if self.session is not None else None,
+            "last_point_time": self.last_point_time.isoformat() if self.last_point_time else None,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Reprend l'état du fichier de reprise."""
+        self.values = {
+            entity_id: value
+            for entity_id, value in (state.get("values") or {}).items()
+            if entity_id in self.entity_roles
+        }
+        session = state.get("session")
+        self.session = ChargeSession.from_dict(session) if session else None
+        last_point_time = state.get("last_point_time")
+        self.last_point_time = datetime.fromisoformat(last_point_time) if last_point_time else None
+
+    def process(self, changes: List[Tuple[datetime, str, str]]) -> List[ChargeSession]:
+        """Applique des changements d'état triés (instant, entité, état).
+
+        Retourne les sessions terminées. Les changements simultanés sont
+        appliqués ensemble, comme une mise à jour du coordinateur.
+        """
+        sessions: List[ChargeSession] = []
+        index = 0
+        while index < len(changes):
+            timestamp = changes[index][0]
+            while index < len(changes) and changes[index][0] == timestamp:
+                _, entity_id, state = changes[index]
+                self._set_value(entity_id, state)
+                index += 1
+            self._record(timestamp, sessions)
+        return sessions
+
+    def _set_value(self, entity_id: str, state: str) -> None:
+        """Dernière valeur valide d'une entité (indisponible : oubliée)."""
+        self.values.pop(entity_id, None)
+        if state in UNAVAILABLE_STATES:
+            return
+        try:
+            value = ROLE_PARSERS[self.entity_roles[entity_id]](state)
+        except (ValueError, TypeError, IndexError):
+            return
+        if value is not None:
+            self.values[entity_id] = value
+
+    def _value(self, role: str) -> Any:
+        """Valeur d'un rôle : première entité valide par ordre de préférence."""
+        for entity_id in self.role_entities.get(role, ()):
+            if entity_id in self.values:
+                return self.values[entity_id]
+        return None
+
+    def _record(self, timestamp: datetime, sessions: List[ChargeSession]) -> None:
+        """Équivalent de record_charging_data pour une lecture de l'historique."""
+        status = self._value("charging_status") or "UNKNOWN"
+        if status in INDETERMINATE_STATUSES:
+            return
+        if status != "CHARGING":
+            if self.session is not None:
+                self._close(timestamp, sessions)
+            return
+
+        soc = self._value(ROLE_BATTERY_LEVEL)
+        if soc is None:
+            return
+        if (self.session is not None and self.last_point_time is not None
+                and timestamp - self.last_point_time > SESSION_RESUME_GAP):
+            self._close(self.last_point_time, sessions)
+
+        power_kw = self._value("charging_power") or 0.0
+        target_soc = self._value("target_soc") or 100.0
+        if self.session is None or self.session.session_key != get_session_key(power_kw):
+            if self.session is not None:
+                self._close(timestamp, sessions)
+            self.session = new_session(soc, power_kw, target_soc, timestamp)
+
+        # Point gardé seulement s'il apporte une information
+        self.session.append(timestamp, soc, self._value("charging_time_remaining"), power_kw)
+        self.last_point_time = timestamp
+
+    def _close(self, end_time: datetime, sessions: List[ChargeSession]) -> None:
+        """Termine la session ouverte."""
+        self.session.complete(end_time)
+        sessions.append(self.session)
+        self.session = None
+        self.last_point_time = None
+
+
+def _import_chunk(
+    hass: HomeAssistant,
+    segmenter: SessionSegmenter,
+    start: datetime,
+    end: datetime,
+    include_start_state: bool,
+) -> List[ChargeSession]:
+    """Lit un morceau d'historique et le découpe en sessions (exécuteur de l'enregistreur)."""
+    states = history.get_significant_states(
+        hass,
+        dt_util.as_utc(start.astimezone()),
+        dt_util.as_utc(end.astimezone()),
+        list(segmenter.entity_roles),
+        include_start_time_state=include_start_state,
+        significant_changes_only=False,
+        minimal_response=True,
+        no_attributes=True,
+        compressed_state_format=True,
+    )
+    changes = sorted(
+        (datetime.fromtimestamp(row[COMPRESSED_STATE_LAST_UPDATED]), entity_id, row[COMPRESSED_STATE_STATE])
+        for entity_id, rows in states.items()
+        for row in rows
+    )
+    del states
+    return segmenter.process(changes)
+
+
+class ChargeHistoryImport:
+    """Import unique et reprenable de l'historique de l'enregistreur.
+
+    Les états des entités BMW indexées sont lus par morceaux de
+    HISTORY_IMPORT_CHUNK dans l'exécuteur de l'enregistreur, découpés en
+    sessions de charge sur place, puis ajoutés à l'apprentissage. Seuls un
+    morceau d'états et la session ouverte sont en mémoire ; la boucle
+    d'événements ne fait qu'ajouter les sessions terminées. L'avancement
+    est écrit après chaque morceau (import_{entry_id}.json) : un import
+    interrompu reprend là où il s'était arrêté.
+    """
+
+    def __init__(self, coordinator: "BMWiX3Coordinator", entry_id: str) -> None:
+        """Initialise l'import."""
+        self.coordinator = coordinator
+        self.hass = coordinator.hass
+        self.path = os.path.join(self.hass.config.path(STORAGE_DIR), f"import_{entry_id}.json")
+        self._task: Optional[asyncio.Task] = None
+        self.progress: Dict[str, Any] = {}
+
+    @property
+    def running(self) -> bool:
+        """Indique si un import est en cours."""
+        return self._task is not None and not self._task.done()
+
+    def async_start(self, days: int, restart: bool = False) -> bool:
+        """Lance l'import en arrière-plan ; False s'il est déjà en cours."""
+        if self.running:
+            return False
+        self._task = self.hass.async_create_background_task(
+            self._async_import(days, restart), "bmw_ix3_history_import"
+        )
+        return True
+
+    async def async_stop(self) -> None:
+        """Interrompt l'import (reprise au prochain appel du service)."""
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _async_import(self, days: int, restart: bool) -> None:
+        """Importe l'historique morceau par morceau."""
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.error("Import de l'historique impossible: enregistreur non chargé")
+            return
+        if not await self.coordinator.async_wait_learning_loaded():
+            _LOGGER.error("Import de l'historique impossible: apprentissage non chargé")
+            return
+        learning = self.coordinator.charge_learning
+
+        role_entities = self.coordinator.entity_index.preferred_entities()
+        if not role_entities[ROLE_BATTERY_LEVEL] or not role_entities["charging_status"]:
+            _LOGGER.error("Import de l'historique impossible: entités BMW (batterie, état de charge) introuvables")
+            return
+        segmenter = SessionSegmenter(role_entities)
+
+        progress = None if restart else await self.hass.async_add_executor_job(
+            read_json, self.path, "Avancement de l'import illisible, ignoré: %s"
+        )
+        if progress and progress.get("version") == IMPORT_VERSION:
+            if progress.get("completed"):
+                _LOGGER.info("Historique déjà importé (%s sessions), relancer avec restart", progress.get("imported"))
+                self.progress = progress
+                return
+            segmenter.restore(progress.get("segmenter") or {})
+            end = datetime.fromisoformat(progress["end"])
+            cursor = datetime.fromisoformat(progress["cursor"])
+        else:
+            end = datetime.now().replace(microsecond=0)
+            cursor = end - timedelta(days=days)
+            progress = {
+                "version": IMPORT_VERSION,
+                "start": cursor.isoformat(),
+                "end": end.isoformat(),
+                "imported": 0,
+            }
+        self.progress = progress
+        _LOGGER.info("Import de l'historique de charge: %s → %s", cursor, end)
+
+        recorder = get_instance(self.hass)
+        while cursor < end:
+            chunk_end = min(cursor + timedelta(seconds=HISTORY_IMPORT_CHUNK), end)
+            sessions = await recorder.async_add_executor_job(
+                _import_chunk, self.hass, segmenter, cursor, chunk_end, not segmenter.values
+            )
+            progress["imported"] += learning.import_sessions(sessions)
+            cursor = chunk_end
+            progress["cursor"] = cursor.isoformat()
+            progress["segmenter"] = segmenter.state()
+            # Écriture menée à terme même si l'import est interrompu : les
+            # sessions de ce morceau sont déjà dans l'apprentissage
+            await asyncio.shield(self._async_save_progress())
+
+        # Charge en cours à la fin de l'historique : laissée à l'apprentissage en direct
+        progress["completed"] = True
+        progress["segmenter"] = None
+        await self._async_save_progress()
+        _LOGGER.info("Import de l'historique terminé: %s sessions ajoutées", progress["imported"])
+
+    async def _async_save_progress(self) -> None:
+        """Écrit l'avancement (encodage sur la boucle, écriture en exécuteur)."""
+        payload = json.dumps(self.progress, ensure_ascii=False, separators=(",", ":"))
+        try:
+            await self.hass.async_add_executor_job(write_atomic, self.path, payload)
+        except OSError as err:
+            _LOGGER.error("Erreur lors de la sauvegarde de l'import: %s", err)
+
+    def summary(self) -> Dict[str, Any]:
+        """Avancement de l'import (diagnostics)."""
+        return {
+            "running": self.running,
+            "start": self.progress.get("start"),
+            "end": self.progress.get("end"),
+            "cursor": self.progress.get("cursor"),
+            "imported": self.progress.get("imported", 0),
+            "completed": self.progress.get("completed", False),
+        }
@@ -1,32 +1,33 @@
 """Entité numérique pour l'heure de départ."""
 import logging
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from typing import Any, Dict, Optional
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from ..const import DOMAIN
+from ..const import DOMAIN, DEFAULT_CHARGING_POWER
+from ..entity import BMWiX3Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class DepartureTimeNumber(CoordinatorEntity, NumberEntity):
+class DepartureTimeNumber(BMWiX3Entity, NumberEntity):
     """Entité numérique pour l'heure de départ."""
 
+    _dependencies = ("planning.departure_time",)
+
     def __init__(self, coordinator) -> None:
         """Initialise l'entité numérique."""
         super().__init__(coordinator)
         self._attr_unique_id = "bmw_ix3_departure_time"
         self._attr_name = "BMW iX3 Heure de départ"
-        self._departure_hour = 8  # 8h00 par défaut
-        self._departure_minute = 0
 
     @property
     def native_value(self) -> float:
         """Valeur actuelle (heure en format décimal)."""
-        return self._departure_hour + self._departure_minute / 60.0
+        departure_time = self.coordinator.departure_time
+        return departure_time.hour + departure_time.minute / 60.0
 
     @property
     def native_min_value(self) -> float:
@@ -66,15 +67,18 @@ class DepartureTimeNumber(CoordinatorEntity, NumberEntity):
 
     async def async_set_native_value(self, value: float) -> None:
         """Définit l'heure de départ."""
-        self._departure_hour = int(value)
-        self._departure_minute = int((value - self._departure_hour) * 60)
+        hour = int(value)
+        minute = int(round((value - hour) * 60))
+        self.coordinator.departure_time = time(hour, min(minute, 59))
         
-        _LOGGER.info("Heure de départ définie à %02d:%02d", self._departure_hour, self._departure_minute)
+        _LOGGER.info("Heure de départ définie à %02d:%02d", hour, minute)
         
         # Calculer l'heure de début de charge optimale
         await self._calculate_optimal_start_time()
         
         self.async_write_ha_state()
+        # Replanifier les mises à jour autour du début de charge
+        await self.coordinator.async_request_refresh()
 
     async def _calculate_optimal_start_time(self) -> None:
         """Calcule l'heure de début de charge optimale."""
@@ -83,33 +87,31 @@ class DepartureTimeNumber(CoordinatorEntity, NumberEntity):
         
         bmw_data = self.coordinator.data.get("bmw", {})
         current_soc = bmw_data.get("battery_level", 0)
-        charging_power = bmw_data.get("charging_power", 7.4)
+        charging_power = bmw_data.get("charging_power") or DEFAULT_CHARGING_POWER
         
-        # Calcul du temps de charge nécessaire (simplifié)
-        # À améliorer avec les vrais calculs de temps de charge
-        target_soc = 80  # Par défaut 80%
-        energy_needed = (target_soc - current_soc) / 100.0 * 80.0  # 80kWh de capacité
-        charge_time_hours = energy_needed / charging_power
+        # Temps de charge appris ou théorique vers le SOC cible planifié
+        charge_time = self.coordinator.get_charge_time(
+            current_soc, self.coordinator.planned_target_soc, charging_power
+        ) or 0.0
         
         # Calcul de l'heure de début
-        departure_time = time(self._departure_hour, self._departure_minute)
-        departure_datetime = datetime.combine(datetime.now().date(), departure_time)
+        departure_datetime = datetime.combine(datetime.now().date(), self.coordinator.departure_time)
         
         # Si l'heure de départ est dans le passé, prendre le lendemain
         if departure_datetime <= datetime.now():
-            departure_datetime = departure_datetime.replace(day=departure_datetime.day + 1)
+            departure_datetime += timedelta(days=1)
         
-        start_datetime = departure_datetime - datetime.timedelta(hours=charge_time_hours)
+        start_datetime = departure_datetime - timedelta(minutes=charge_time)
         
         _LOGGER.info("Heure de début de charge optimale: %s", start_datetime.strftime("%H:%M"))
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Attributs supplémentaires."""
-        departure_time_str = f"{self._departure_hour:02d}:{self._departure_minute:02d}"
+        departure_time = self.coordinator.departure_time
         
         return {
-            "departure_time_formatted": departure_time_str,
-            "departure_hour": self._departure_hour,
-            "departure_minute": self._departure_minute,
+            "departure_time_formatted": departure_time.strftime("%H:%M"),
+            "departure_hour": departure_time.hour,
+            "departure_minute": departure_time.minute,
         }
@@ -4,27 +4,28 @@ from typing import Any, Dict, Optional
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN
+from ..entity import BMWiX3Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class TargetSOCNumber(CoordinatorEntity, NumberEntity):
+class TargetSOCNumber(BMWiX3Entity, NumberEntity):
     """Entité numérique pour le pourcentage de charge cible."""
 
+    _dependencies = ("bmw.battery_level", "planning.planned_target_soc")
+
     def __init__(self, coordinator) -> None:
         """Initialise l'entité numérique."""
         super().__init__(coordinator)
         self._attr_unique_id = "bmw_ix3_target_soc"
         self._attr_name = "BMW iX3 SOC cible"
-        self._target_soc = 80.0  # 80% par défaut
 
     @property
     def native_value(self) -> float:
         """Valeur actuelle du SOC cible."""
-        return self._target_soc
+        return self.coordinator.planned_target_soc
 
     @property
     def native_min_value(self) -> float:
@@ -64,9 +65,11 @@ class TargetSOCNumber(CoordinatorEntity, NumberEntity):
 
     async def async_set_native_value(self, value: float) -> None:
         """Définit le SOC cible."""
-        self._target_soc = value
+        self.coordinator.planned_target_soc = value
         _LOGGER.info("SOC cible défini à %.1f%%", value)
         self.async_write_ha_state()
+        # Replanifier les mises à jour autour de la nouvelle cible
+        await self.coordinator.async_request_refresh()
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
@@ -76,10 +79,11 @@ class TargetSOCNumber(CoordinatorEntity, NumberEntity):
         
         bmw_data = self.coordinator.data.get("bmw", {})
         current_soc = bmw_data.get("battery_level", 0)
+        target_soc = self.coordinator.planned_target_soc
         
         return {
             "current_soc": current_soc,
-            "target_soc": self._target_soc,
-            "soc_difference": self._target_soc - current_soc,
-            "is_target_reached": current_soc >= self._target_soc,
+            "target_soc": target_soc,
+            "soc_difference": target_soc - current_soc,
+            "is_target_reached": current_soc >= target_soc,
         }
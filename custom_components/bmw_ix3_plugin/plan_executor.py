@@ -0,0 +1,214 @@
+"""Exécution du plan de charge par minuteries (sans automatisation YAML)."""
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_point_in_time
+
+from .tariff_planner import ChargingPlan
+
+if TYPE_CHECKING:
+    from .coordinator import BMWiX3Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Période de charge planifiée : (début, fin), heures locales naïves
+Period = Tuple[datetime, datetime]
+
+
+class ChargePlanExecutor:
+    """Démarre et arrête la borne V2C aux heures exactes du plan de charge.
+
+    Une fois activé (service schedule_charging ou commutateur), l'exécuteur
+    suit le plan du coordinateur : chaque période devient deux minuteries
+    async_track_point_in_time (démarrage, arrêt), annulées et replanifiées
+    quand le plan change (SOC, prix, cible, départ). Une période en cours
+    n'est pas interrompue par un nouveau plan, sauf si la cible est
+    atteinte. Les périodes planifiées sont conservées dans l'instantané.
+    """
+
+    def __init__(self, coordinator: "BMWiX3Coordinator") -> None:
+        """Initialise l'exécuteur."""
+        self.coordinator = coordinator
+        self.hass = coordinator.hass
+        self.enabled = False
+        self.periods: Tuple[Period, ...] = ()
+
+        self._started = False
+        # Charge démarrée par l'exécuteur (à arrêter en fin de période)
+        self._charging = False
+        # Périodes du dernier plan du coordinateur pris en compte
+        self._plan_periods: Optional[Tuple[Period, ...]] = None
+        self._unsub_timers: List[Callable[[], None]] = []
+
+    @property
+    def active_period(self) -> Optional[Period]:
+        """Période planifiée en cours, s'il y en a une."""
+        now = datetime.now()
+        for start, end in self.periods:
+            if start <= now < end:
+                return (start, end)
+        return None
+
+    @property
+    def next_start(self) -> Optional[datetime]:
+        """Prochain démarrage planifié."""
+        now = datetime.now()
+        return next((start for start, _ in self.periods if start > now), None)
+
+    def state(self) -> Dict[str, Any]:
+        """État à conserver dans l'instantané."""
+        return {
+            "enabled": self.enabled,
+            "charging": self._charging,
+            "periods": [[start.isoformat(), end.isoformat()] for start, end in self.periods],
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Réapplique l'état de l'instantané (minuteries armées au démarrage)."""
+        try:
+            self.enabled = bool(state.get("enabled", False))
+            self._charging = bool(state.get("charging", False))
+            self.periods = tuple(
+                (datetime.fromisoformat(start), datetime.fromisoformat(end))
+                for start, end in state.get("periods", [])
+            )
+        except (TypeError, ValueError) as err:
+            _LOGGER.warning("Plan de charge de l'instantané ignoré: %s", err)
+            self.periods = ()
+
+    @callback
+    def async_start(self) -> None:
+        """Arme les minuteries des périodes restaurées."""
+        self._started = True
+        now = datetime.now()
+        self.periods = tuple((start, end) for start, end in self.periods if end > now)
+        if not self.periods and self._charging:
+            # Période terminée pendant l'arrêt de Home Assistant
+            self._set_charging(False)
+        self._arm_timers()
+
+    @callback
+    def async_stop(self) -> None:
+        """Annule les minuteries (l'état reste dans l'instantané)."""
+        self._started = False
+        self._cancel_timers()
+
+    @callback
+    def async_enable(self) -> None:
+        """Active l'exécution du plan courant du coordinateur."""
+        self.enabled = True
+        self.async_follow_plan(force=True)
+
+    @callback
+    def async_disable(self) -> None:
+        """Annule le plan planifié ; arrête la charge démarrée par l'exécuteur."""
+        self.enabled = False
+        self._schedule(())
+
+    @callback
+    def async_follow_plan(self, force: bool = False) -> None:
+        """Replanifie les minuteries si le plan du coordinateur a changé.
+
+        Appelé avant chaque publication des données du coordinateur ; le
+        plan est en cache, l'appel ne coûte qu'une comparaison quand il n'a
+        pas changé.
+        """
+        if not self.enabled or not self._started:
+            return
+        plan = self.coordinator.current_charging_plan()
+        if plan is None:
+            return  # SOC inconnu : le plan planifié est conservé
+        if not force and plan.periods == self._plan_periods:
+            return
+        self._plan_periods = plan.periods
+        self._schedule(self._periods_from_plan(plan))
+
+    def _periods_from_plan(self, plan: ChargingPlan) -> Tuple[Period, ...]:
+        """Périodes à planifier, sans interrompre la période en cours."""
+        periods = [
+            (start.replace(microsecond=0), end.replace(microsecond=0))
+            for start, end in plan.periods
+        ]
+        if not periods:
+            return ()  # Cible atteinte
+
+        active = self.active_period
+        if active is None:
+            return tuple(periods)
+
+        # La période en cours va jusqu'à son terme ; le nouveau plan
+        # complète après elle
+        active_end = active[1]
+        following = [
+            (max(start, active_end), end) for start, end in periods if end > active_end
+        ]
+        if following and following[0][0] == active_end:
+            return ((active[0], following[0][1]),) + tuple(following[1:])
+        return (active,) + tuple(following)
+
+    def _schedule(self, periods: Tuple[Period, ...]) -> None:
+        """Remplace les périodes planifiées et réarme les minuteries."""
+        if periods == self.periods:
+            return
+        self.periods = periods
+        _LOGGER.info(
+            "Plan de charge planifié: %s",
+            ", ".join(f"{start:%H:%M:%S}-{end:%H:%M:%S}" for start, end in periods) or "aucune période",
+        )
+        if self.active_period is None and self._charging:
+            # Cible atteinte ou plan annulé pendant une période
+            self._set_charging(False)
+        self._arm_timers()
+
+    def _arm_timers(self) -> None:
+        """Une minuterie de démarrage et une d'arrêt par période."""
+        self._cancel_timers()
+        now = datetime.now()
+        for start, end in self.periods:
+            if start > now:
+                self._unsub_timers.append(
+                    async_track_point_in_time(self.hass, self._async_period_start, start.astimezone())
+                )
+            elif not self._charging:
+                # Période déjà commencée (nouveau plan, redémarrage)
+                self._set_charging(True)
+            self._unsub_timers.append(
+                async_track_point_in_time(self.hass, self._async_period_end, end.astimezone())
+            )
+
+    def _cancel_timers(self) -> None:
+        """Annule toutes les minuteries."""
+        for unsub in self._unsub_timers:
+            unsub()
+        self._unsub_timers = []
+
+    @callback
+    def _async_period_start(self, _now: datetime) -> None:
+        """Début d'une période : démarre la charge."""
+        if not self._charging:
+            self._set_charging(True)
+
+    @callback
+    def _async_period_end(self, _now: datetime) -> None:
+        """Fin d'une période : arrête la charge, sauf si la suivante commence."""
+        if self.active_period is None and self._charging:
+            self._set_charging(False)
+        now = datetime.now()
+        self.periods = tuple((start, end) for start, end in self.periods if end > now)
+        self.coordinator.async_update_listeners()
+
+    def _set_charging(self, enabled: bool) -> None:
+        """Démarre ou arrête la borne (commande envoyée en tâche)."""
+        self._charging = enabled
+        _LOGGER.info("Plan de charge: %s de la charge", "démarrage" if enabled else "arrêt")
+        self.hass.async_create_task(self._async_control(enabled))
+
+    async def _async_control(self, enabled: bool) -> None:
+        """Envoie la commande à la borne V2C."""
+        if not await self.coordinator.control_v2c_charging(enabled):
+            _LOGGER.warning(
+                "Plan de charge: commande V2C (%s) impossible",
+                "démarrage" if enabled else "arrêt",
+            )
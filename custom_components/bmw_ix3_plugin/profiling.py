@@ -0,0 +1,77 @@
+"""Mesure des étapes de mise à jour du coordinateur."""
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+# Nombre de mesures conservées par étape (fenêtre glissante)
+PROFILE_WINDOW = 200
+
+# Étapes mesurées, dans l'ordre d'une mise à jour
+STAGE_REFRESH = "refresh"
+STAGE_PUSH_UPDATE = "push_update"
+STAGE_INDEX_BUILD = "entity_index_build"
+STAGE_ENTITY_SCAN = "entity_scan"
+STAGE_BATTERY_SELECTION = "battery_selection"
+STAGE_V2C_FETCH = "v2c_fetch"
+STAGE_RECORD_CHARGING_DATA = "record_charging_data"
+STAGE_SAVE_HISTORY = "save_history"
+
+
+def _percentile(values: list, percent: float) -> float:
+    """Percentile par rang le plus proche (valeurs triées)."""
+    index = min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+class RefreshProfiler:
+    """Durées récentes (ms) de chaque étape de mise à jour.
+
+    L'enregistrement est en O(1) ; les percentiles ne sont calculés qu'à la
+    lecture (diagnostics, capteur de diagnostic).
+    """
+
+    def __init__(self, window: int = PROFILE_WINDOW) -> None:
+        """Initialise les fenêtres de mesure."""
+        self._window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, stage: str, duration_ms: float) -> None:
+        """Ajoute une mesure à la fenêtre de l'étape."""
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = deque(maxlen=self._window)
+            self._counts[stage] = 0
+        samples.append(duration_ms)
+        self._counts[stage] += 1
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Mesure la durée du bloc encadré."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def last(self, stage: str) -> Optional[float]:
+        """Dernière durée mesurée (ms) d'une étape, ou None."""
+        samples = self._samples.get(stage)
+        return samples[-1] if samples else None
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiques par étape : nombre total, dernière, p50, p95, max (ms)."""
+        stats = {}
+        for stage, samples in self._samples.items():
+            if not samples:
+                continue
+            values = sorted(samples)
+            stats[stage] = {
+                "count": self._counts[stage],
+                "last_ms": round(samples[-1], 3),
+                "p50_ms": round(_percentile(values, 50), 3),
+                "p95_ms": round(_percentile(values, 95), 3),
+                "max_ms": round(values[-1], 3),
+            }
+        return stats
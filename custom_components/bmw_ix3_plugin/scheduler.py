@@ -0,0 +1,60 @@
+"""Planification adaptative des mises à jour du coordinateur."""
+from datetime import timedelta
+from typing import Callable, Iterable, Optional
+
+from .const import (
+    ADAPTIVE_MAX_CHARGING_INTERVAL,
+    ADAPTIVE_MIN_INTERVAL,
+)
+
+# Fraction du temps restant avant un événement utilisée comme intervalle :
+# les mises à jour se resserrent à l'approche du seuil
+APPROACH_FACTOR = 0.5
+
+
+def _clamp(seconds: float, minimum: float, maximum: float) -> timedelta:
+    """Intervalle borné."""
+    return timedelta(seconds=max(minimum, min(maximum, seconds)))
+
+
+def next_refresh_interval(
+    charging: bool,
+    current_soc: float,
+    thresholds: Iterable[float],
+    minutes_to_soc: Callable[[float], Optional[float]],
+    minutes_to_start: Optional[float],
+    idle_interval: float,
+) -> timedelta:
+    """Choisit le délai avant la prochaine mise à jour.
+
+    En charge, le délai est la moitié du temps prédit avant le prochain seuil
+    (arrêt auto à 80%, SOC cible), borné entre ADAPTIVE_MIN_INTERVAL et
+    ADAPTIVE_MAX_CHARGING_INTERVAL : rare au milieu d'une session, dense
+    juste avant un seuil. Hors charge, le délai se resserre avant le début
+    de charge planifié, sinon il vaut idle_interval (véhicule garé ou plein).
+    """
+    if charging:
+        upcoming = [
+            minutes
+            for minutes in (minutes_to_soc(threshold) for threshold in thresholds if threshold > current_soc)
+            if minutes is not None
+        ]
+        if not upcoming:
+            # Au-delà de tous les seuils : seule la fin de charge reste à observer
+            upcoming = [minutes for minutes in (minutes_to_soc(100.0),) if minutes]
+        if not upcoming:
+            return timedelta(seconds=ADAPTIVE_MAX_CHARGING_INTERVAL)
+        return _clamp(
+            min(upcoming) * 60 * APPROACH_FACTOR,
+            ADAPTIVE_MIN_INTERVAL,
+            ADAPTIVE_MAX_CHARGING_INTERVAL,
+        )
+
+    if minutes_to_start is not None and minutes_to_start > 0:
+        return _clamp(
+            minutes_to_start * 60 * APPROACH_FACTOR,
+            ADAPTIVE_MIN_INTERVAL,
+            idle_interval,
+        )
+
+    return timedelta(seconds=idle_interval)
@@ -3,11 +3,36 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from ..const import CONF_V2C_IP
+from ..charge_time import parse_grid_values
+from ..const import (
+    CONF_V2C_IP,
+    CONF_GRID_POWERS,
+    CONF_GRID_TARGETS,
+    CONF_COMPACT_ATTRIBUTES,
+    DEFAULT_GRID_POWERS,
+    DEFAULT_GRID_TARGETS,
+    DEFAULT_COMPACT_ATTRIBUTES,
+)
 from .bmw_sensor import BMWiX3Sensor
 from .charge_calculator import ChargeTimeCalculator
+from .charge_grid import ChargeTimeGridSensor
+from .charge_plan import ChargePlanSensor
+from .charge_statistics import ChargeStatisticsSensor
+from .refresh_timing import RefreshTimingSensor
 from .v2c_sensor import V2CSensor
 
+# Calculateurs de temps de charge : (clé, nom, puissance kW, SOC cible)
+CHARGE_CALCULATORS = (
+    ("charge_time_80_3_7kw", "Temps charge 80% (3.7kW)", "3.7", 80),
+    ("charge_time_100_3_7kw", "Temps charge 100% (3.7kW)", "3.7", 100),
+    ("charge_time_80_7_4kw", "Temps charge 80% (7.4kW)", "7.4", 80),
+    ("charge_time_100_7_4kw", "Temps charge 100% (7.4kW)", "7.4", 100),
+    ("charge_time_80_11kw", "Temps charge 80% (11kW)", "11", 80),
+    ("charge_time_100_11kw", "Temps charge 100% (11kW)", "11", 100),
+    ("charge_time_80_22kw", "Temps charge 80% (22kW)", "22", 80),
+    ("charge_time_100_22kw", "Temps charge 100% (22kW)", "22", 100),
+)
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -24,20 +49,48 @@ async def async_setup_entry(
         BMWiX3Sensor(coordinator, "range_electric", "Autonomie électrique", "km", "mdi:map-marker-distance"),
     ]
     
-    # Calculateurs de temps de charge
+    # Calculateurs de temps de charge (clé, nom, puissance, cible)
+    options = config_entry.options
+    compact_attributes = options.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES)
     charge_calculators = [
-        ChargeTimeCalculator(coordinator, "charge_time_80_3_7kw", "Temps charge 80% (3.7kW)", "3.7"),
-        ChargeTimeCalculator(coordinator, "charge_time_100_3_7kw", "Temps charge 100% (3.7kW)", "3.7", target_soc=100),
-        ChargeTimeCalculator(coordinator, "charge_time_80_7_4kw", "Temps charge 80% (7.4kW)", "7.4"),
-        ChargeTimeCalculator(coordinator, "charge_time_100_7_4kw", "Temps charge 100% (7.4kW)", "7.4", target_soc=100),
-        ChargeTimeCalculator(coordinator, "charge_time_80_11kw", "Temps charge 80% (11kW)", "11"),
-        ChargeTimeCalculator(coordinator, "charge_time_100_11kw", "Temps charge 100% (11kW)", "11", target_soc=100),
-        ChargeTimeCalculator(coordinator, "charge_time_80_22kw", "Temps charge 80% (22kW)", "22"),
-        ChargeTimeCalculator(coordinator, "charge_time_100_22kw", "Temps charge 100% (22kW)", "22", target_soc=100),
+        ChargeTimeCalculator(
+            coordinator, key, name, power_kw, target_soc=target_soc,
+            compact_attributes=compact_attributes,
+        )
+        for key, name, power_kw, target_soc in CHARGE_CALCULATORS
+    ]
+    
+    # Plan de charge : valeurs volatiles de tous les calculateurs
+    charge_plan = ChargePlanSensor(
+        coordinator,
+        [(target_soc, float(power_kw)) for _, _, power_kw, target_soc in CHARGE_CALCULATORS],
+    )
+    
+    # Grille configurable des temps de charge (puissances × cibles)
+    grid_powers = parse_grid_values(options.get(CONF_GRID_POWERS, DEFAULT_GRID_POWERS))
+    grid_targets = [
+        target for target in parse_grid_values(options.get(CONF_GRID_TARGETS, DEFAULT_GRID_TARGETS))
+        if target <= 100
     ]
     
     # Liste des entités à ajouter
-    entities = bmw_sensors + charge_calculators
+    entities = bmw_sensors + charge_calculators + [charge_plan]
+    
+    if grid_powers and grid_targets:
+        entities.append(ChargeTimeGridSensor(coordinator, grid_powers, grid_targets))
+    
+    # Statistiques de charge (cumuls jour, semaine, mois)
+    entities.extend(
+        ChargeStatisticsSensor(coordinator, period, name)
+        for period, name in (
+            ("day", "BMW iX3 Charge du jour"),
+            ("week", "BMW iX3 Charge de la semaine"),
+            ("month", "BMW iX3 Charge du mois"),
+        )
+    )
+    
+    # Diagnostic des durées de mise à jour (désactivé par défaut)
+    entities.append(RefreshTimingSensor(coordinator))
     
     # Ajouter les capteurs V2C uniquement si la borne est configurée
     if config_entry.data.get(CONF_V2C_IP):
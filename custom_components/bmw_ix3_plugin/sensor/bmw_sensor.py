@@ -7,14 +7,14 @@ from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN
+from ..entity import BMWiX3Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class BMWiX3Sensor(CoordinatorEntity, SensorEntity):
+class BMWiX3Sensor(BMWiX3Entity, SensorEntity):
     """Capteur BMW iX3."""
 
     def __init__(
@@ -32,6 +32,8 @@ class BMWiX3Sensor(CoordinatorEntity, SensorEntity):
         self._unit = unit
         self._icon = icon
         self._attr_unique_id = f"bmw_ix3_{key}"
+        # La date de mise à jour (attribut) ne déclenche pas d'écriture à elle seule
+        self._dependencies = (f"bmw.{key}", "bmw.charging_status", "bmw.battery_level")
 
     @property
     def name(self) -> str:
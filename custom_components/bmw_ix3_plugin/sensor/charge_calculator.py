@@ -4,23 +4,35 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import (
     DOMAIN,
     BATTERY_CAPACITY,
-    CHARGE_EFFICIENCY,
-    FAST_CHARGE_THRESHOLD,
-    SLOW_CHARGE_FACTOR,
 )
+from ..charge_time import round_to_minute
+from ..entity import BMWiX3Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class ChargeTimeCalculator(CoordinatorEntity, SensorEntity):
+class ChargeTimeCalculator(BMWiX3Entity, SensorEntity):
     """Calculateur de temps de charge."""
 
+    _dependencies = ("bmw.battery_level", "learning.curves_version")
+    # Valeurs qui changent à chaque écriture : non conservées par l'enregistreur
+    _unrecorded_attributes = frozenset(
+        {
+            "current_soc",
+            "target_time",
+            "target_time_formatted",
+            "charge_time_p10",
+            "charge_time_p50",
+            "charge_time_p90",
+        }
+    )
+
     def __init__(
         self,
         coordinator,
@@ -28,6 +40,7 @@ class ChargeTimeCalculator(CoordinatorEntity, SensorEntity):
         name: str,
         power_kw: str,
         target_soc: int = 80,
+        compact_attributes: bool = True,
     ) -> None:
         """Initialise le calculateur."""
         super().__init__(coordinator)
@@ -35,7 +48,55 @@ class ChargeTimeCalculator(CoordinatorEntity, SensorEntity):
         self._name = name
         self._power_kw = float(power_kw)
         self._target_soc = target_soc
+        # Mode compact : seuls les attributs fixes sont exposés, les valeurs
+        # volatiles sont dans le capteur de plan de charge
+        self._compact_attributes = compact_attributes
         self._attr_unique_id = f"bmw_ix3_{key}"
+        
+        # Résultats calculés une fois par mise à jour du coordinateur
+        self._current_soc: Optional[float] = None
+        self._charge_time: Optional[float] = None
+        self._quantiles: Optional[Dict[str, float]] = None
+        self._target_time: Optional[datetime] = None
+
+    async def async_added_to_hass(self) -> None:
+        """Calcule les valeurs initiales à l'ajout de l'entité."""
+        await super().async_added_to_hass()
+        self._update_charge_time()
+
+    @callback
+    def _async_refresh_values(self) -> None:
+        """Recalcule le temps de charge une seule fois par mise à jour."""
+        self._update_charge_time()
+
+    def _update_charge_time(self) -> None:
+        """Met en cache le temps de charge et l'heure d'atteinte de la cible."""
+        self._current_soc = None
+        self._charge_time = None
+        self._quantiles = None
+        self._target_time = None
+        
+        if not self.coordinator.data:
+            return
+        
+        bmw_data = self.coordinator.data.get("bmw", {})
+        current_soc = bmw_data.get("battery_level")
+        if current_soc is None:
+            return
+        
+        self._current_soc = current_soc
+        self._charge_time = self.coordinator.get_charge_time(
+            current_soc, self._target_soc, self._power_kw
+        )
+        if not self._compact_attributes:
+            self._quantiles = self.coordinator.get_charge_time_quantiles(
+                current_soc, self._target_soc, self._power_kw
+            )
+        if self._charge_time is not None:
+            # Heure d'atteinte du pourcentage cible, arrondie à la minute
+            self._target_time = round_to_minute(
+                datetime.now() + timedelta(minutes=self._charge_time)
+            )
 
     @property
     def name(self) -> str:
@@ -45,21 +106,11 @@ class ChargeTimeCalculator(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> Optional[float]:
         """Temps de charge calculé en minutes (arrondi)."""
-        if not self.coordinator.data:
-            return None
-        
-        bmw_data = self.coordinator.data.get("bmw", {})
-        current_soc = bmw_data.get("battery_level")
-        
-        if current_soc is None:
-            return None
-        
-        charge_time = self._calculate_charge_time(current_soc, self._target_soc, self._power_kw)
-        if charge_time is None:
+        if self._charge_time is None:
             return None
         
         # Arrondir à l'entier le plus proche
-        return round(charge_time)
+        return round(self._charge_time)
 
     @property
     def native_unit_of_measurement(self) -> str:
@@ -105,69 +156,26 @@ class ChargeTimeCalculator(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Attributs supplémentaires."""
-        if not self.coordinator.data:
+        target_time = self._target_time
+        if target_time is None:
             return {}
         
-        bmw_data = self.coordinator.data.get("bmw", {})
-        current_soc = bmw_data.get("battery_level")
-        
-        if current_soc is None:
-            return {}
-        
-        charge_time = self._calculate_charge_time(current_soc, self._target_soc, self._power_kw)
-        
-        if charge_time is None:
-            return {}
-        
-        # Calcul de l'heure d'atteinte du pourcentage cible
-        now = datetime.now()
-        target_time = now + timedelta(minutes=charge_time)
-        
-        return {
-            "current_soc": current_soc,
+        attributes = {
             "target_soc": self._target_soc,
             "power_kw": self._power_kw,
-            "target_time": target_time.isoformat(),
-            "target_time_formatted": target_time.strftime("%H:%M"),
             "battery_capacity_kwh": BATTERY_CAPACITY,
         }
+        if not self._compact_attributes:
+            attributes.update({
+                "current_soc": self._current_soc,
+                "target_time": target_time.isoformat(),
+                "target_time_formatted": target_time.strftime("%H:%M"),
+            })
+            if self._quantiles is not None:
+                # Dispersion apprise du temps de charge (minutes)
+                attributes.update({
+                    f"charge_time_{statistic}": round(minutes)
+                    for statistic, minutes in self._quantiles.items()
+                })
+        return attributes
 
-    def _calculate_charge_time(self, current_soc: float, target_soc: float, power_kw: float) -> Optional[float]:
-        """Calcule le temps de charge en minutes."""
-        if current_soc >= target_soc:
-            return 0.0
-        
-        # Essayer d'abord d'utiliser les données d'apprentissage
-        if hasattr(self.coordinator, 'charge_learning'):
-            learned_time = self.coordinator.charge_learning.predict_charge_time(
-                current_soc=current_soc,
-                target_soc=target_soc,
-                power_kw=power_kw,
-            )
-            if learned_time is not None:
-                _LOGGER.debug("Utilisation des données d'apprentissage: %s min", learned_time)
-                return learned_time
-        
-        # Sinon, utiliser le calcul théorique
-        # Calcul de l'énergie nécessaire (kWh)
-        energy_needed = (target_soc - current_soc) / 100.0 * BATTERY_CAPACITY
-        
-        # Prise en compte de l'efficacité de charge
-        energy_needed = energy_needed / CHARGE_EFFICIENCY
-        
-        # Calcul du temps de charge
-        if target_soc <= FAST_CHARGE_THRESHOLD:
-            # Charge rapide jusqu'à 80%
-            charge_time_hours = energy_needed / power_kw
-        else:
-            # Charge mixte : rapide jusqu'à 80%, puis lente
-            energy_to_80 = (FAST_CHARGE_THRESHOLD - current_soc) / 100.0 * BATTERY_CAPACITY / CHARGE_EFFICIENCY
-            energy_above_80 = (target_soc - FAST_CHARGE_THRESHOLD) / 100.0 * BATTERY_CAPACITY / CHARGE_EFFICIENCY
-            
-            time_to_80 = energy_to_80 / power_kw if current_soc < FAST_CHARGE_THRESHOLD else 0
-            time_above_80 = energy_above_80 / (power_kw * SLOW_CHARGE_FACTOR)
-            
-            charge_time_hours = time_to_80 + time_above_80
-        
-        _LOGGER.debug("Utilisation du calcul théorique: %s min", charge_time_hours * 60)
-        return charge_time_hours * 60  # Conversion en minutes
@@ -0,0 +1,108 @@
+"""Grille des temps de charge BMW iX3 (toutes puissances × cibles)."""
+import logging
+from typing import Any, Dict, List, Optional
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+
+from ..const import DOMAIN
+from ..entity import BMWiX3Entity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ChargeTimeGridSensor(BMWiX3Entity, SensorEntity):
+    """Grille des temps de charge pour tableaux de bord.
+
+    L'état est le temps le plus court pour atteindre la première cible ; la
+    grille complète est exposée en attributs.
+    """
+
+    _dependencies = ("bmw.battery_level", "learning.curves_version")
+
+    def __init__(self, coordinator, powers: List[float], targets: List[float]) -> None:
+        """Initialise la grille."""
+        super().__init__(coordinator)
+        self._powers = powers
+        self._targets = targets
+        self._attr_unique_id = "bmw_ix3_charge_time_grid"
+        self._attr_name = "BMW iX3 Grille temps de charge"
+
+        # Grille calculée une fois par mise à jour du coordinateur
+        self._current_soc: Optional[float] = None
+        self._grid: Optional[List[List[float]]] = None
+
+    async def async_added_to_hass(self) -> None:
+        """Calcule la grille initiale à l'ajout de l'entité."""
+        await super().async_added_to_hass()
+        self._update_grid()
+
+    @callback
+    def _async_refresh_values(self) -> None:
+        """Recalcule la grille une seule fois par mise à jour."""
+        self._update_grid()
+
+    def _update_grid(self) -> None:
+        """Met en cache la grille pour le SOC courant."""
+        self._current_soc = None
+        self._grid = None
+
+        if not self.coordinator.data:
+            return
+
+        current_soc = self.coordinator.data.get("bmw", {}).get("battery_level")
+        if current_soc is None:
+            return
+
+        self._current_soc = current_soc
+        self._grid = self.coordinator.compute_charge_time_grid(
+            current_soc, self._powers, self._targets
+        )
+
+    @property
+    def native_value(self) -> Optional[int]:
+        """Temps le plus court (minutes) pour atteindre la première cible."""
+        if not self._grid:
+            return None
+        return round(min(self._grid[0]))
+
+    @property
+    def native_unit_of_measurement(self) -> str:
+        """Unité de mesure."""
+        return "min"
+
+    @property
+    def icon(self) -> str:
+        """Icône du capteur."""
+        return "mdi:table-clock"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Informations sur l'appareil."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, "bmw_ix3")},
+            name="BMW iX3",
+            manufacturer="BMW",
+            model="iX3",
+            sw_version="1.0",
+        )
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Grille {cible: {puissance: minutes}}."""
+        if self._grid is None:
+            return {}
+
+        return {
+            "current_soc": self._current_soc,
+            "powers_kw": self._powers,
+            "targets_soc": self._targets,
+            "grid": {
+                f"{target:g}": {
+                    f"{power:g}": round(minutes)
+                    for power, minutes in zip(self._powers, row)
+                }
+                for target, row in zip(self._targets, self._grid)
+            },
+        }
@@ -0,0 +1,172 @@
+"""Plan de charge BMW iX3 (valeurs volatiles regroupées)."""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+
+from ..charge_time import round_to_minute
+from ..const import DOMAIN
+from ..entity import BMWiX3Entity
+from ..tariff_planner import ChargingPlan
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ChargePlanSensor(BMWiX3Entity, SensorEntity):
+    """Plan de charge : début des créneaux retenus pour la cible au départ.
+
+    Regroupe dans une seule entité les heures qui dépendent de l'instant
+    présent (fin de charge par cible et puissance, créneaux de charge les
+    moins chers selon le tarif). Ces attributs ne sont pas conservés par
+    l'enregistreur.
+    """
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _dependencies = (
+        "bmw.battery_level",
+        "bmw.charging_power",
+        "v2c.charging_power",
+        "planning.planned_target_soc",
+        "planning.departure_time",
+        "planning.charge_periods",
+        "planning.tariff_version",
+        "learning.curves_version",
+    )
+    _unrecorded_attributes = frozenset(
+        {
+            "current_soc",
+            "power_kw",
+            "target_time",
+            "finish_times",
+            "charge_time_quantiles",
+            "charge_periods",
+            "energy_kwh",
+            "estimated_cost",
+        }
+    )
+
+    def __init__(self, coordinator, combinations: List[Tuple[float, float]]) -> None:
+        """Initialise le plan ; combinations : (cible %, puissance kW) des calculateurs."""
+        super().__init__(coordinator)
+        self._combinations = combinations
+        self._attr_unique_id = "bmw_ix3_charge_plan"
+        self._attr_name = "BMW iX3 Plan de charge"
+
+        # Plan calculé une fois par changement des entrées
+        self._current_soc: Optional[float] = None
+        self._power_kw: Optional[float] = None
+        self._start_time: Optional[datetime] = None
+        self._plan: Optional[ChargingPlan] = None
+        self._target_time: Optional[datetime] = None
+        self._quantiles: Optional[Dict[str, float]] = None
+        self._finish_times: Dict[str, str] = {}
+
+    async def async_added_to_hass(self) -> None:
+        """Calcule le plan initial à l'ajout de l'entité."""
+        await super().async_added_to_hass()
+        self._update_plan()
+
+    @callback
+    def _async_refresh_values(self) -> None:
+        """Recalcule le plan avant l'écriture de l'état."""
+        self._update_plan()
+
+    def _update_plan(self) -> None:
+        """Met en cache le début planifié et les heures de fin de charge."""
+        self._current_soc = None
+        self._power_kw = None
+        self._start_time = None
+        self._plan = None
+        self._target_time = None
+        self._quantiles = None
+        self._finish_times = {}
+
+        if not self.coordinator.data:
+            return
+
+        bmw_data = self.coordinator.data.get("bmw", {})
+        current_soc = bmw_data.get("battery_level")
+        if current_soc is None:
+            return
+
+        now = datetime.now()
+        power_kw = self.coordinator.effective_power(bmw_data)
+        self._current_soc = current_soc
+        self._power_kw = power_kw
+
+        self._plan = self.coordinator.current_charging_plan()
+        if self._plan is not None and self._plan.start is not None:
+            self._start_time = round_to_minute(self._plan.start)
+
+        charge_time = self.coordinator.get_charge_time(
+            current_soc, self.coordinator.planned_target_soc, power_kw
+        )
+        if charge_time is not None:
+            self._target_time = round_to_minute(now + timedelta(minutes=charge_time))
+        self._quantiles = self.coordinator.get_charge_time_quantiles(
+            current_soc, self.coordinator.planned_target_soc, power_kw
+        )
+
+        for target_soc, combination_power in self._combinations:
+            minutes = self.coordinator.get_charge_time(current_soc, target_soc, combination_power)
+            if minutes is not None:
+                finish = round_to_minute(now + timedelta(minutes=minutes))
+                self._finish_times[f"{target_soc:g}_{combination_power:g}kw"] = finish.strftime("%H:%M")
+
+    @property
+    def native_value(self) -> Optional[datetime]:
+        """Heure de début de charge pour atteindre la cible à l'heure de départ."""
+        if self._start_time is None:
+            return None
+        return self._start_time.astimezone()
+
+    @property
+    def icon(self) -> str:
+        """Icône du capteur."""
+        return "mdi:calendar-clock"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Informations sur l'appareil."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, "bmw_ix3")},
+            name="BMW iX3",
+            manufacturer="BMW",
+            model="iX3",
+            sw_version="1.0",
+        )
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Cible, départ et heures de fin (arrondies à la minute)."""
+        if self._current_soc is None:
+            return {}
+
+        attributes = {
+            "current_soc": self._current_soc,
+            "target_soc": self.coordinator.planned_target_soc,
+            "departure_time": self.coordinator.departure_time.strftime("%H:%M"),
+            "power_kw": self._power_kw,
+            "target_time": self._target_time.isoformat() if self._target_time else None,
+            "finish_times": self._finish_times,
+            # Temps de charge appris jusqu'à la cible (minutes) : p90 pour le plan
+            "charge_time_quantiles": (
+                {statistic: round(minutes) for statistic, minutes in self._quantiles.items()}
+                if self._quantiles is not None else None
+            ),
+            "tariff_source": self.coordinator.tariff_planner.source,
+        }
+        if self._plan is not None:
+            attributes.update({
+                "charge_periods": [
+                    f"{round_to_minute(start).strftime('%H:%M')}-{round_to_minute(end).strftime('%H:%M')}"
+                    for start, end in self._plan.periods
+                ],
+                "energy_kwh": round(self._plan.energy_kwh, 1),
+                "estimated_cost": round(self._plan.cost, 2),
+                "feasible": self._plan.feasible,
+            })
+        return attributes
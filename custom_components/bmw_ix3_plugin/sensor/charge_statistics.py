@@ -0,0 +1,71 @@
+"""Statistiques de charge BMW iX3 (jour, semaine, mois)."""
+import logging
+from typing import Any, Dict
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+
+from ..const import DOMAIN
+from ..entity import BMWiX3Entity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ChargeStatisticsSensor(BMWiX3Entity, SensorEntity):
+    """Énergie chargée sur la période en cours, cumuls en attributs.
+
+    Les valeurs viennent des cumuls tenus par le coordinateur : aucun
+    parcours de l'historique à l'écriture de l'état.
+    """
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _dependencies = ("statistics.version", "statistics.day")
+
+    def __init__(self, coordinator, period: str, name: str) -> None:
+        """Initialise le capteur (period : "day", "week" ou "month")."""
+        super().__init__(coordinator)
+        self._period = period
+        self._attr_unique_id = f"bmw_ix3_charge_statistics_{period}"
+        self._attr_name = name
+        self._summary: Dict[str, Any] = {}
+
+    async def async_added_to_hass(self) -> None:
+        """Lit le cumul initial à l'ajout de l'entité."""
+        await super().async_added_to_hass()
+        self._summary = self.coordinator.charge_statistics.summary(self._period)
+
+    @callback
+    def _async_refresh_values(self) -> None:
+        """Relit le cumul de la période en cours."""
+        self._summary = self.coordinator.charge_statistics.summary(self._period)
+
+    @property
+    def native_value(self) -> float:
+        """Énergie chargée sur la période (kWh)."""
+        return self._summary.get("energy_kwh", 0.0)
+
+    @property
+    def icon(self) -> str:
+        """Icône du capteur."""
+        return "mdi:chart-bar"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Informations sur l'appareil."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, "bmw_ix3")},
+            name="BMW iX3",
+            manufacturer="BMW",
+            model="iX3",
+            sw_version="1.0",
+        )
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Sessions, puissance moyenne, temps de charge, heures creuses et coût."""
+        return {
+            key: value for key, value in self._summary.items() if key != "energy_kwh"
+        }
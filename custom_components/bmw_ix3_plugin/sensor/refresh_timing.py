@@ -0,0 +1,60 @@
+"""Capteur de diagnostic des durées de mise à jour du coordinateur."""
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from ..const import DOMAIN
+from ..profiling import STAGE_REFRESH
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RefreshTimingSensor(CoordinatorEntity, SensorEntity):
+    """Durée de la dernière mise à jour, avec p50/p95/max par étape en attributs.
+
+    Désactivé par défaut : à activer pour localiser une étape lente.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator) -> None:
+        """Initialise le capteur."""
+        super().__init__(coordinator)
+        self._attr_unique_id = "bmw_ix3_refresh_timing"
+        self._attr_name = "BMW iX3 Durée de mise à jour"
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Durée de la dernière mise à jour complète (ms)."""
+        duration = self.coordinator.profiler.last(STAGE_REFRESH)
+        return round(duration, 1) if duration is not None else None
+
+    @property
+    def native_unit_of_measurement(self) -> str:
+        """Unité de mesure."""
+        return "ms"
+
+    @property
+    def icon(self) -> str:
+        """Icône du capteur."""
+        return "mdi:timer-outline"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Informations sur l'appareil."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, "bmw_ix3")},
+            name="BMW iX3",
+            manufacturer="BMW",
+            model="iX3",
+            sw_version="1.0",
+        )
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Statistiques par étape {étape: {count, last_ms, p50_ms, p95_ms, max_ms}}."""
+        return self.coordinator.profiler.summary()
@@ -4,16 +4,23 @@ from typing import Any, Dict, Optional
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN
+from ..entity import BMWiX3Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class V2CSensor(CoordinatorEntity, SensorEntity):
+class V2CSensor(BMWiX3Entity, SensorEntity):
     """Capteur V2C Trydan."""
 
+    _dependencies = (
+        "v2c.status",
+        "v2c.charging_enabled",
+        "v2c.charging_power",
+        "v2c.charging_current",
+    )
+
     def __init__(
         self,
         coordinator,
@@ -42,7 +49,8 @@ class V2CSensor(CoordinatorEntity, SensorEntity):
             return None
         
         v2c_data = self.coordinator.data.get("v2c", {})
-        return v2c_data.get(self._key)
+        # Les clés des capteurs sont préfixées ("v2c_status" → "status")
+        return v2c_data.get(self._key.removeprefix("v2c_"))
 
     @property
     def native_unit_of_measurement(self) -> Optional[str]:
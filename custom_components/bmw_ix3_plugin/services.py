@@ -1,14 +1,16 @@
 """Services pour le plugin BMW iX3."""
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Dict
 
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 import voluptuous as vol
 
 from .const import (
     DOMAIN,
+    DEFAULT_HISTORY_IMPORT_DAYS,
     NOTIFICATION_CHARGING_START,
     NOTIFICATION_CHARGING_80,
     NOTIFICATION_CHARGING_100,
@@ -40,6 +42,19 @@ SERVICE_SCHEDULE_CHARGING = vol.Schema({
     vol.Optional("charging_power"): vol.All(vol.Coerce(float), vol.Range(min=3.7, max=22)),
 })
 
+SERVICE_CANCEL_CHARGING_SCHEDULE = vol.Schema({})
+
+SERVICE_IMPORT_CHARGE_HISTORY = vol.Schema({
+    vol.Optional("days", default=DEFAULT_HISTORY_IMPORT_DAYS): vol.All(vol.Coerce(int), vol.Range(min=1, max=730)),
+    vol.Optional("restart", default=False): bool,
+})
+
+SERVICE_PREDICT_CHARGE_TIME = vol.Schema({
+    vol.Required("target_soc"): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+    vol.Optional("current_soc"): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+    vol.Optional("charging_power"): vol.All(vol.Coerce(float), vol.Range(min=1, max=22)),
+})
+
 
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Configuration des services."""
@@ -99,28 +114,95 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         _LOGGER.info("Widget iOS mis à jour")
 
     async def schedule_charging(call: ServiceCall) -> None:
-        """Planifie une session de charge."""
+        """Planifie une session de charge exécutée par les minuteries du plugin."""
         departure_time = call.data["departure_time"]
         target_soc = call.data["target_soc"]
-        charging_power = call.data.get("charging_power", 7.4)
+        charging_power = call.data.get("charging_power")
         
-        # Calcul de l'heure de début de charge
-        start_time = await _calculate_charging_start_time(
-            hass, departure_time, target_soc, charging_power
-        )
+        coordinator = _get_coordinator(hass)
+        if coordinator is None:
+            _LOGGER.error("Impossible de planifier la charge: plugin non configuré")
+            return
+        
+        # Planification partagée avec les entités (SOC cible, heure de départ)
+        coordinator.departure_time = departure_time.replace(second=0, microsecond=0)
+        coordinator.planned_target_soc = target_soc
+        coordinator.planned_charging_power = charging_power
+        
+        # Créneaux les moins chers (SOC actuel, courbe apprise, tarif),
+        # démarrage et arrêt de la borne aux heures du plan
+        coordinator.plan_executor.async_enable()
+        coordinator.async_update_listeners()
         
-        if start_time:
-            # Création d'une automatisation temporaire pour démarrer la charge
-            await _create_charging_automation(hass, start_time, target_soc)
-            
+        plan = coordinator.current_charging_plan()
+        if plan and plan.start:
             _LOGGER.info(
-                "Charge planifiée: début à %s pour atteindre %d%% à %s",
-                start_time.strftime("%H:%M"),
+                "Charge planifiée: début à %s pour atteindre %d%% à %s "
+                "(%d période(s), %.1f kWh, coût estimé %.2f)",
+                plan.start.strftime("%H:%M"),
                 target_soc,
-                departure_time.strftime("%H:%M")
+                departure_time.strftime("%H:%M"),
+                len(plan.periods),
+                plan.energy_kwh,
+                plan.cost,
             )
+            if not plan.feasible:
+                _LOGGER.warning(
+                    "Cible non atteignable avant le départ: %.0f min de charge manquantes",
+                    plan.shortfall_minutes,
+                )
+        elif plan:
+            _LOGGER.info("Aucune charge nécessaire pour atteindre %d%%", target_soc)
         else:
-            _LOGGER.error("Impossible de planifier la charge")
+            _LOGGER.warning("SOC actuel inconnu, la charge sera planifiée à la prochaine mise à jour")
+
+    async def cancel_charging_schedule(call: ServiceCall) -> None:
+        """Annule la charge planifiée."""
+        coordinator = _get_coordinator(hass)
+        if coordinator is None:
+            return
+        
+        coordinator.plan_executor.async_disable()
+        coordinator.async_update_listeners()
+        _LOGGER.info("Charge planifiée annulée")
+
+    async def import_charge_history(call: ServiceCall) -> None:
+        """Importe les sessions de charge de l'historique de l'enregistreur (en arrière-plan)."""
+        coordinator = _get_coordinator(hass)
+        if coordinator is None:
+            _LOGGER.error("Impossible d'importer l'historique: plugin non configuré")
+            return
+        
+        if not coordinator.history_import.async_start(call.data["days"], call.data["restart"]):
+            _LOGGER.warning("Import de l'historique déjà en cours")
+
+    async def predict_charge_time(call: ServiceCall) -> ServiceResponse:
+        """Temps de charge prévu (minutes) et quantiles p10/p50/p90 appris."""
+        coordinator = _get_coordinator(hass)
+        if coordinator is None:
+            raise HomeAssistantError("Plugin BMW iX3 non configuré")
+        
+        bmw_data = (coordinator.data or {}).get("bmw", {})
+        current_soc = call.data.get("current_soc", bmw_data.get("battery_level"))
+        if current_soc is None:
+            raise HomeAssistantError("SOC actuel inconnu, préciser current_soc")
+        target_soc = call.data["target_soc"]
+        power_kw = call.data.get("charging_power") or coordinator.effective_power(bmw_data)
+        
+        charge_time = coordinator.get_charge_time(current_soc, target_soc, power_kw)
+        quantiles = coordinator.get_charge_time_quantiles(current_soc, target_soc, power_kw)
+        return {
+            "current_soc": current_soc,
+            "target_soc": target_soc,
+            "power_kw": power_kw,
+            "charge_time": round(charge_time, 1) if charge_time is not None else None,
+            # Sans quantiles : temps théorique seul (apprentissage insuffisant)
+            "learned": quantiles is not None,
+            **{
+                statistic: round(minutes, 1)
+                for statistic, minutes in (quantiles or {}).items()
+            },
+        }
 
     # Enregistrement des services
     hass.services.async_register(
@@ -143,6 +225,28 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         schedule_charging,
         schema=SERVICE_SCHEDULE_CHARGING,
     )
+    
+    hass.services.async_register(
+        DOMAIN,
+        "cancel_charging_schedule",
+        cancel_charging_schedule,
+        schema=SERVICE_CANCEL_CHARGING_SCHEDULE,
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        "import_charge_history",
+        import_charge_history,
+        schema=SERVICE_IMPORT_CHARGE_HISTORY,
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        "predict_charge_time",
+        predict_charge_time,
+        schema=SERVICE_PREDICT_CHARGE_TIME,
+        supports_response=SupportsResponse.ONLY,
+    )
 
 
 def _create_notification_message(
@@ -173,37 +277,10 @@ def _create_notification_message(
     return message
 
 
-async def _calculate_charging_start_time(
-    hass: HomeAssistant,
-    departure_time,
-    target_soc: float,
-    charging_power: float,
-) -> datetime:
-    """Calcule l'heure de début de charge optimale."""
-    # Récupération des données actuelles
-    current_soc = 65.0  # À récupérer depuis le coordinateur
-    battery_capacity = 80.0  # kWh
-    
-    # Calcul de l'énergie nécessaire
-    energy_needed = (target_soc - current_soc) / 100.0 * battery_capacity
-    charge_time_hours = energy_needed / charging_power
-    
-    # Calcul de l'heure de début
-    departure_datetime = datetime.combine(datetime.now().date(), departure_time)
-    if departure_datetime <= datetime.now():
-        departure_datetime += timedelta(days=1)
-    
-    start_datetime = departure_datetime - timedelta(hours=charge_time_hours)
-    
-    return start_datetime
-
-
-async def _create_charging_automation(
-    hass: HomeAssistant,
-    start_time: datetime,
-    target_soc: float,
-) -> None:
-    """Crée une automatisation temporaire pour la charge."""
-    # Cette fonction devrait créer une automatisation temporaire
-    # qui démarre la charge à l'heure calculée
-    _LOGGER.info("Création d'une automatisation de charge temporaire")
+def _get_coordinator(hass: HomeAssistant):
+    """Coordinateur de la première entrée configurée."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        coordinator = entry_data.get("coordinator")
+        if coordinator is not None:
+            return coordinator
+    return None
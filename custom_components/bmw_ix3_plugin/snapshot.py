@@ -0,0 +1,59 @@
+"""Instantané des dernières données du coordinateur (démarrage à chaud)."""
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import STORAGE_DIR
+from .storage import read_json, write_atomic
+
+_LOGGER = logging.getLogger(__name__)
+
+# Version du format de l'instantané (un format inconnu est ignoré)
+SNAPSHOT_VERSION = 1
+
+
+class CoordinatorSnapshot:
+    """Dernières données connues du coordinateur, relues au démarrage.
+
+    Les entités sont créées immédiatement avec ces valeurs, sans attendre
+    la première mise à jour complète ; les réglages de planification et
+    l'état de l'arrêt automatique sont conservés avec elles.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialise l'instantané."""
+        self.hass = hass
+        self.path = os.path.join(hass.config.path(STORAGE_DIR), f"snapshot_{entry_id}.json")
+
+    async def async_load(self) -> Optional[Dict[str, Any]]:
+        """Lit l'instantané (en exécuteur) ; None s'il est absent ou illisible.
+
+        Retourne le contenu enregistré : {"data": ..., "state": ...}.
+        """
+        snapshot = await self.hass.async_add_executor_job(
+            read_json, self.path, "Instantané illisible, ignoré: %s"
+        )
+        if not snapshot or snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        _LOGGER.debug("Instantané du %s restauré", snapshot.get("saved_at"))
+        return snapshot.get("content")
+
+    async def async_save(self, content: Dict[str, Any]) -> None:
+        """Écrit l'instantané (encodage sur la boucle, écriture en exécuteur)."""
+        payload = json.dumps(
+            {
+                "version": SNAPSHOT_VERSION,
+                "saved_at": datetime.now().isoformat(),
+                "content": content,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        try:
+            await self.hass.async_add_executor_job(write_atomic, self.path, payload)
+        except OSError as err:
+            _LOGGER.error("Erreur lors de la sauvegarde de l'instantané: %s", err)
@@ -0,0 +1,32 @@
+"""Lecture et écriture des fichiers JSON du stockage (en exécuteur)."""
+import json
+import logging
+import os
+from typing import Any, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def read_json(path: str, unreadable_message: str) -> Optional[Any]:
+    """Lit un fichier JSON ; None s'il est absent ou illisible.
+
+    unreadable_message est journalisé (avec l'erreur en argument) si le
+    fichier existe mais ne peut pas être lu.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        _LOGGER.warning(unreadable_message, err)
+        return None
+
+
+def write_atomic(path: str, payload: str) -> None:
+    """Écrit un fichier via un fichier temporaire renommé (atomique)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
@@ -6,6 +6,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from ..const import CONF_V2C_IP
 from .v2c_switch import V2CChargingSwitch
 from .auto_stop_switch import AutoStopSwitch
+from .scheduled_charging_switch import ScheduledChargingSwitch
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -18,8 +19,9 @@ async def async_setup_entry(
     # Toujours ajouter l'auto-stop
     switches = [AutoStopSwitch(coordinator)]
     
-    # Ajouter le switch V2C uniquement si la borne est configurée
+    # Ajouter le switch V2C et la charge planifiée uniquement si la borne est configurée
     if config_entry.data.get(CONF_V2C_IP):
         switches.append(V2CChargingSwitch(coordinator))
+        switches.append(ScheduledChargingSwitch(coordinator))
     
     async_add_entities(switches)
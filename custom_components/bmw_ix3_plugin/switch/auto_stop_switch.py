@@ -4,27 +4,32 @@ from typing import Any, Dict, Optional
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN
+from ..entity import BMWiX3Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class AutoStopSwitch(CoordinatorEntity, SwitchEntity):
+class AutoStopSwitch(BMWiX3Entity, SwitchEntity):
     """Commutateur d'arrêt automatique à 80%."""
 
+    _dependencies = (
+        "bmw.battery_level",
+        "bmw.charging_status",
+        "planning.auto_stop_enabled",
+    )
+
     def __init__(self, coordinator) -> None:
         """Initialise le commutateur."""
         super().__init__(coordinator)
         self._attr_unique_id = "bmw_ix3_auto_stop_80"
         self._attr_name = "BMW iX3 Arrêt auto 80%"
-        self._auto_stop_enabled = True  # Par défaut activé
 
     @property
     def is_on(self) -> bool:
         """État du commutateur."""
-        return self._auto_stop_enabled
+        return self.coordinator.auto_stop_enabled
 
     @property
     def icon(self) -> str:
@@ -45,14 +50,17 @@ class AutoStopSwitch(CoordinatorEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Active l'arrêt automatique à 80%."""
         _LOGGER.info("Activation de l'arrêt automatique à 80%")
-        self._auto_stop_enabled = True
+        self.coordinator.auto_stop_enabled = True
         self.async_write_ha_state()
+        # Replanifier les mises à jour autour du seuil de 80%
+        await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Désactive l'arrêt automatique à 80%."""
         _LOGGER.info("Désactivation de l'arrêt automatique à 80%")
-        self._auto_stop_enabled = False
+        self.coordinator.auto_stop_enabled = False
         self.async_write_ha_state()
+        await self.coordinator.async_request_refresh()
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
@@ -63,10 +71,12 @@ class AutoStopSwitch(CoordinatorEntity, SwitchEntity):
         bmw_data = self.coordinator.data.get("bmw", {})
         battery_level = bmw_data.get("battery_level", 0)
         charging_status = bmw_data.get("charging_status")
+        predicted_stop = self.coordinator.auto_stop.predicted_stop
         
         return {
             "current_battery_level": battery_level,
             "charging_status": charging_status,
             "auto_stop_threshold": 80,
-            "will_stop_at_80": self._auto_stop_enabled and charging_status == "CHARGING" and battery_level < 80,
+            "will_stop_at_80": self.coordinator.auto_stop_enabled and charging_status == "CHARGING" and battery_level < 80,
+            "predicted_stop_time": predicted_stop.isoformat() if predicted_stop else None,
         }
@@ -0,0 +1,71 @@
+"""Commutateur d'exécution du plan de charge."""
+import logging
+from typing import Any, Dict
+
+from homeassistant.components.switch import SwitchEntity
+from homeassistant.helpers.entity import DeviceInfo
+
+from ..const import DOMAIN
+from ..entity import BMWiX3Entity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ScheduledChargingSwitch(BMWiX3Entity, SwitchEntity):
+    """Charge planifiée : la borne suit le plan de charge (minuteries du plugin)."""
+
+    _dependencies = (
+        "planning.plan_execution_enabled",
+        "planning.scheduled_periods",
+    )
+
+    def __init__(self, coordinator) -> None:
+        """Initialise le commutateur."""
+        super().__init__(coordinator)
+        self._attr_unique_id = "bmw_ix3_scheduled_charging"
+        self._attr_name = "BMW iX3 Charge planifiée"
+
+    @property
+    def is_on(self) -> bool:
+        """État du commutateur."""
+        return self.coordinator.plan_executor.enabled
+
+    @property
+    def icon(self) -> str:
+        """Icône du commutateur."""
+        return "mdi:calendar-check" if self.is_on else "mdi:calendar-remove"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Informations sur l'appareil."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, "bmw_ix3")},
+            name="BMW iX3",
+            manufacturer="BMW",
+            model="iX3",
+            sw_version="1.0",
+        )
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Suit le plan de charge."""
+        _LOGGER.info("Activation de la charge planifiée")
+        self.coordinator.plan_executor.async_enable()
+        self.coordinator.async_update_listeners()
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Annule le plan de charge planifié."""
+        _LOGGER.info("Désactivation de la charge planifiée")
+        self.coordinator.plan_executor.async_disable()
+        self.coordinator.async_update_listeners()
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Périodes planifiées et prochain démarrage."""
+        executor = self.coordinator.plan_executor
+        next_start = executor.next_start
+        return {
+            "scheduled_periods": [
+                f"{start:%H:%M:%S}-{end:%H:%M:%S}" for start, end in executor.periods
+            ],
+            "next_start": next_start.isoformat() if next_start else None,
+        }
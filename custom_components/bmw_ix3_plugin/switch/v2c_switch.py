@@ -4,16 +4,23 @@ from typing import Any, Dict, Optional
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN
+from ..entity import BMWiX3Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class V2CChargingSwitch(CoordinatorEntity, SwitchEntity):
+class V2CChargingSwitch(BMWiX3Entity, SwitchEntity):
     """Commutateur de contrôle de la charge V2C."""
 
+    _dependencies = (
+        "v2c.charging_enabled",
+        "v2c.status",
+        "v2c.charging_power",
+        "v2c.charging_current",
+    )
+
     def __init__(self, coordinator) -> None:
         """Initialise le commutateur."""
         super().__init__(coordinator)
@@ -0,0 +1,478 @@
+"""Planification de la charge selon le tarif (créneaux les moins chers)."""
+import json
+import logging
+import os
+from datetime import datetime, time, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_TARIFF_WINDOWS,
+    CONF_TARIFF_ENTITY,
+    CONF_TARIFF_ATTRIBUTE,
+    CONF_TARIFF_FILE,
+    DEFAULT_TARIFF_WINDOWS,
+    DEFAULT_TARIFF_ATTRIBUTE,
+    TARIFF_FILE_CHECK_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Durée d'un créneau de planification (minutes)
+SLOT_MINUTES = 15
+
+# Prix relatifs des plages horaires sans prix explicite
+OFF_PEAK_PRICE = 0.0  # plage déclarée sans prix (heures creuses)
+PEAK_PRICE = 1.0  # heures non couvertes par une plage (heures pleines)
+
+# Durée de conservation des prix passés d'une entité (coût des sessions
+# terminées après la publication des prix du jour suivant)
+PRICE_RETENTION = timedelta(hours=48)
+
+# Clés reconnues dans une série de prix (Nord Pool, Tibber, EDS, fichier...)
+START_KEYS = ("start", "startsAt", "start_time", "hour", "time")
+END_KEYS = ("end", "endsAt", "end_time")
+PRICE_KEYS = ("value", "price", "total", "price_per_kwh")
+
+# Intervalle de prix : (début, fin, prix), heures locales naïves
+PriceInterval = Tuple[datetime, datetime, float]
+
+
+class ChargingPlan:
+    """Créneaux de charge retenus et coût estimé."""
+
+    def __init__(
+        self,
+        periods: Tuple[Tuple[datetime, datetime], ...],
+        required_minutes: float,
+        shortfall_minutes: float,
+        energy_kwh: float,
+        cost: float,
+    ) -> None:
+        """Initialise le plan."""
+        self.periods = periods
+        self.required_minutes = required_minutes
+        self.shortfall_minutes = shortfall_minutes
+        self.energy_kwh = energy_kwh
+        self.cost = cost
+
+    @property
+    def start(self) -> Optional[datetime]:
+        """Début de la première période de charge."""
+        return self.periods[0][0] if self.periods else None
+
+    @property
+    def end(self) -> Optional[datetime]:
+        """Fin de la dernière période de charge."""
+        return self.periods[-1][1] if self.periods else None
+
+    @property
+    def feasible(self) -> bool:
+        """True si les créneaux disponibles suffisent à atteindre la cible."""
+        return self.shortfall_minutes <= 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Représentation sérialisable (services, diagnostics)."""
+        return {
+            "periods": [
+                {"start": start.isoformat(), "end": end.isoformat()}
+                for start, end in self.periods
+            ],
+            "required_minutes": round(self.required_minutes, 1),
+            "shortfall_minutes": round(self.shortfall_minutes, 1),
+            "energy_kwh": round(self.energy_kwh, 2),
+            "estimated_cost": round(self.cost, 2),
+        }
+
+
+def parse_tariff_windows(value: str) -> List[Tuple[time, time, float]]:
+    """Plages "22:00-06:00, 12:00-14:00=0.15" : (début, fin, prix).
+
+    Une plage sans prix vaut OFF_PEAK_PRICE ; le reste de la journée vaut
+    PEAK_PRICE. Pour un coût en euros, couvrir toute la journée avec des
+    plages à prix explicite ("22:00-06:00=0.17, 06:00-22:00=0.25").
+    """
+    windows = []
+    for item in value.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            hours, _, price = item.partition("=")
+            start, end = (
+                datetime.strptime(part.strip(), "%H:%M").time()
+                for part in hours.split("-")
+            )
+            windows.append((start, end, float(price) if price.strip() else OFF_PEAK_PRICE))
+        except ValueError:
+            _LOGGER.warning("Plage tarifaire ignorée: %s", item)
+    return windows
+
+
+def window_intervals(
+    windows: Sequence[Tuple[time, time, float]], start: datetime, end: datetime
+) -> List[PriceInterval]:
+    """Intervalles de prix des plages journalières entre start et end.
+
+    Les heures non couvertes valent PEAK_PRICE ; une plage dont la fin
+    précède le début passe minuit.
+    """
+    intervals: List[PriceInterval] = []
+    day = start.date() - timedelta(days=1)
+    while day <= end.date():
+        for window_start, window_end, price in windows:
+            interval_start = datetime.combine(day, window_start)
+            interval_end = datetime.combine(day, window_end)
+            if interval_end <= interval_start:
+                interval_end += timedelta(days=1)
+            if interval_end > start and interval_start < end:
+                intervals.append((max(interval_start, start), min(interval_end, end), price))
+        day += timedelta(days=1)
+    intervals.sort()
+
+    # Heures pleines entre les plages
+    filled: List[PriceInterval] = []
+    cursor = start
+    for interval_start, interval_end, price in intervals:
+        if interval_start > cursor:
+            filled.append((cursor, interval_start, PEAK_PRICE))
+        if interval_end > cursor:
+            filled.append((max(interval_start, cursor), interval_end, price))
+            cursor = interval_end
+    if cursor < end:
+        filled.append((cursor, end, PEAK_PRICE))
+    return filled
+
+
+def _local_naive(value: Any) -> Optional[datetime]:
+    """Heure locale naïve (comme datetime.now()) depuis une chaîne ou un datetime."""
+    if isinstance(value, str):
+        value = dt_util.parse_datetime(value)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = dt_util.as_local(value).replace(tzinfo=None)
+    return value
+
+
+def _first_key(entry: Dict[str, Any], keys: Iterable[str]) -> Any:
+    """Première valeur présente parmi les clés."""
+    for key in keys:
+        if entry.get(key) is not None:
+            return entry[key]
+    return None
+
+
+def parse_price_series(entries: Iterable[Any]) -> List[PriceInterval]:
+    """Intervalles triés depuis une série [{"start": ..., "end": ..., "value": ...}].
+
+    La fin est optionnelle : elle vaut alors le début de l'entrée suivante
+    (ou SLOT_MINUTES pour la dernière). Les entrées invalides sont ignorées.
+    """
+    points: List[Tuple[datetime, Optional[datetime], float]] = []
+    for entry in entries or ():
+        if not isinstance(entry, dict):
+            continue
+        start = _local_naive(_first_key(entry, START_KEYS))
+        price = _first_key(entry, PRICE_KEYS)
+        if start is None or price is None:
+            continue
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            continue
+        points.append((start, _local_naive(_first_key(entry, END_KEYS)), price))
+    points.sort(key=lambda point: point[0])
+
+    intervals: List[PriceInterval] = []
+    for index, (start, end, price) in enumerate(points):
+        if end is None:
+            end = (
+                points[index + 1][0] if index + 1 < len(points)
+                else start + timedelta(minutes=SLOT_MINUTES)
+            )
+        if end > start:
+            intervals.append((start, end, price))
+    return intervals
+
+
+def price_slots(
+    intervals: Sequence[PriceInterval],
+    start: datetime,
+    end: datetime,
+    fallback_price: float,
+) -> List[PriceInterval]:
+    """Découpe [start, end] en créneaux alignés sur SLOT_MINUTES, avec leur prix.
+
+    Le premier et le dernier créneau peuvent être partiels. Le prix d'un
+    créneau est celui de l'intervalle qui contient son début (parcours
+    unique des intervalles triés) ; fallback_price hors série.
+    """
+    slots: List[PriceInterval] = []
+    if end <= start:
+        return slots
+
+    step = timedelta(minutes=SLOT_MINUTES)
+    aligned = start.replace(second=0, microsecond=0)
+    aligned -= timedelta(minutes=aligned.minute % SLOT_MINUTES)
+    slot_start = start
+    slot_end = aligned + step
+    index = 0
+    while slot_start < end:
+        slot_end = min(slot_end, end)
+        while index < len(intervals) and intervals[index][1] <= slot_start:
+            index += 1
+        if index < len(intervals) and intervals[index][0] <= slot_start:
+            price = intervals[index][2]
+        else:
+            price = fallback_price
+        slots.append((slot_start, slot_end, price))
+        slot_start = slot_end
+        slot_end = slot_start + step
+    return slots
+
+
+def plan_cheapest_slots(
+    slots: Sequence[PriceInterval], required_minutes: float, power_kw: float
+) -> ChargingPlan:
+    """Ensemble de créneaux de coût minimal couvrant required_minutes.
+
+    À puissance constante, le coût d'une minute de charge ne dépend que du
+    prix du créneau : prendre les créneaux par prix croissant est optimal
+    (à prix égal, le plus proche du départ, pour charger au plus tard). Un
+    créneau utilisé partiellement l'est sur sa fin. O(n log n) pour n
+    créneaux (192 pour 48 h), assez léger pour chaque mise à jour.
+    """
+    order = sorted(range(len(slots)), key=lambda i: (slots[i][2], -i))
+    remaining = required_minutes
+    chosen: List[Tuple[datetime, datetime, float]] = []
+    for i in order:
+        if remaining <= 0:
+            break
+        slot_start, slot_end, price = slots[i]
+        minutes = (slot_end - slot_start).total_seconds() / 60.0
+        if minutes > remaining:
+            slot_start = slot_end - timedelta(minutes=remaining)
+            minutes = remaining
+        chosen.append((slot_start, slot_end, price))
+        remaining -= minutes
+    chosen.sort()
+
+    periods: List[List[datetime]] = []
+    cost = 0.0
+    for slot_start, slot_end, price in chosen:
+        cost += price * power_kw * (slot_end - slot_start).total_seconds() / 3600.0
+        if periods and periods[-1][1] == slot_start:
+            periods[-1][1] = slot_end
+        else:
+            periods.append([slot_start, slot_end])
+
+    used_minutes = required_minutes - max(remaining, 0.0)
+    return ChargingPlan(
+        periods=tuple((start, end) for start, end in periods),
+        required_minutes=required_minutes,
+        shortfall_minutes=max(remaining, 0.0),
+        energy_kwh=power_kw * used_minutes / 60.0,
+        cost=cost,
+    )
+
+
+class TariffPlanner:
+    """Tarif de l'électricité et calcul des créneaux de charge.
+
+    Sources, par priorité : attribut d'une entité (série de prix par 15 min
+    ou par heure, suivie par événements), fichier JSON local (relu quand il
+    change), plages fixes des options. Sans tarif, tous les créneaux ont le
+    même prix et le plan se réduit à une charge au plus tard avant le départ.
+    """
+
+    def __init__(self, hass: HomeAssistant, config: Dict[str, Any]) -> None:
+        """Initialise le planificateur depuis la configuration (options comprises)."""
+        self.hass = hass
+        windows = config.get(CONF_TARIFF_WINDOWS, DEFAULT_TARIFF_WINDOWS)
+        self.windows = parse_tariff_windows(windows)
+        # Plages toutes à prix explicite : coûts en unité monétaire
+        self._windows_priced = bool(self.windows) and all(
+            "=" in item for item in windows.replace(";", ",").split(",") if item.strip()
+        )
+        self.entity_id: Optional[str] = config.get(CONF_TARIFF_ENTITY) or None
+        self.attributes = [
+            attribute.strip()
+            for attribute in config.get(CONF_TARIFF_ATTRIBUTE, DEFAULT_TARIFF_ATTRIBUTE).split(",")
+            if attribute.strip()
+        ]
+        self.file_path: Optional[str] = (
+            hass.config.path(config[CONF_TARIFF_FILE]) if config.get(CONF_TARIFF_FILE) else None
+        )
+
+        # Incrémentée à chaque changement de prix (invalidation des plans)
+        self.version = 0
+        self._entity_intervals: List[PriceInterval] = []
+        self._file_intervals: List[PriceInterval] = []
+        self._file_mtime: Optional[float] = None
+        self._on_change: Optional[Callable[[], None]] = None
+        self._unsubs: List[Callable[[], None]] = []
+
+    @property
+    def source(self) -> Optional[str]:
+        """Source de prix utilisée : "entity", "file", "windows" ou None."""
+        if self._entity_intervals:
+            return "entity"
+        if self._file_intervals:
+            return "file"
+        if self.windows:
+            return "windows"
+        return None
+
+    @property
+    def priced(self) -> bool:
+        """True si les coûts sont en unité monétaire (et non relatifs)."""
+        source = self.source
+        return source in ("entity", "file") or (source == "windows" and self._windows_priced)
+
+    async def async_start(self, on_change: Callable[[], None]) -> None:
+        """Charge les prix et suit leurs changements (entité, fichier)."""
+        self._on_change = on_change
+        if self.entity_id:
+            self._entity_intervals = self._read_entity_prices()
+            self._unsubs.append(
+                async_track_state_change_event(
+                    self.hass, [self.entity_id], self._async_entity_changed
+                )
+            )
+        if self.file_path:
+            await self._async_check_file()
+            self._unsubs.append(
+                async_track_time_interval(
+                    self.hass,
+                    self._async_check_file,
+                    timedelta(seconds=TARIFF_FILE_CHECK_INTERVAL),
+                )
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Arrête le suivi des prix."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        self._on_change = None
+
+    def _read_entity_prices(self) -> List[PriceInterval]:
+        """Série de prix lue dans les attributs de l'entité."""
+        state = self.hass.states.get(self.entity_id)
+        if state is None:
+            return []
+        entries: List[Any] = []
+        for attribute in self.attributes:
+            value = state.attributes.get(attribute)
+            if isinstance(value, list):
+                entries.extend(value)
+        return parse_price_series(entries)
+
+    @callback
+    def _async_entity_changed(self, event: Event) -> None:
+        """Relit la série de prix quand l'entité change."""
+        intervals = self._read_entity_prices()
+        if intervals:
+            # Prix passés conservés (sessions de la veille), nouvelle série ensuite
+            keep_after = datetime.now() - PRICE_RETENTION
+            intervals = [
+                interval for interval in self._entity_intervals
+                if interval[1] > keep_after and interval[0] < intervals[0][0]
+            ] + intervals
+        if intervals != self._entity_intervals:
+            self._entity_intervals = intervals
+            self._prices_changed()
+
+    async def _async_check_file(self, _now: Optional[datetime] = None) -> None:
+        """Relit le fichier de prix (en exécuteur) s'il a été modifié."""
+        result = await self.hass.async_add_executor_job(
+            _read_price_file, self.file_path, self._file_mtime
+        )
+        if result is None:
+            return
+        self._file_mtime, intervals = result
+        if intervals != self._file_intervals:
+            self._file_intervals = intervals
+            self._prices_changed()
+
+    def _prices_changed(self) -> None:
+        """Invalide les plans calculés avec les anciens prix."""
+        self.version += 1
+        _LOGGER.debug("Tarif mis à jour (source: %s)", self.source)
+        if self._on_change is not None:
+            self._on_change()
+
+    def intervals(self, start: datetime, end: datetime) -> Tuple[List[PriceInterval], float]:
+        """Intervalles de prix sur [start, end] et prix des heures hors série.
+
+        Une série incomplète (prix du lendemain pas encore publiés) est
+        complétée au prix le plus élevé connu : les créneaux connus et bon
+        marché restent préférés.
+        """
+        series = self._entity_intervals or self._file_intervals
+        if series:
+            return series, max(price for _, _, price in series)
+        if self.windows:
+            return window_intervals(self.windows, start, end), PEAK_PRICE
+        return [], OFF_PEAK_PRICE
+
+    def priced_slots(
+        self, start: datetime, end: datetime
+    ) -> Tuple[List[PriceInterval], float]:
+        """Créneaux de [start, end] avec leur prix, et prix des heures pleines.
+
+        Le prix de référence est le plus élevé des journées concernées : un
+        créneau moins cher est compté en heures creuses.
+        """
+        day_start = datetime.combine(start.date(), time())
+        day_end = datetime.combine(end.date(), time()) + timedelta(days=1)
+        intervals, fallback_price = self.intervals(day_start, day_end)
+        reference = max(
+            (price for interval_start, interval_end, price in intervals
+             if interval_end > day_start and interval_start < day_end),
+            default=fallback_price,
+        )
+        return price_slots(intervals, start, end, fallback_price), reference
+
+    def plan(
+        self,
+        start: datetime,
+        departure: datetime,
+        required_minutes: float,
+        power_kw: float,
+    ) -> ChargingPlan:
+        """Plan de coût minimal pour charger required_minutes avant le départ."""
+        intervals, fallback_price = self.intervals(start, departure)
+        slots = price_slots(intervals, start, departure, fallback_price)
+        return plan_cheapest_slots(slots, required_minutes, power_kw)
+
+
+def _read_price_file(
+    path: str, known_mtime: Optional[float]
+) -> Optional[Tuple[float, List[PriceInterval]]]:
+    """Lit le fichier de prix s'il a changé ; None s'il est inchangé ou illisible.
+
+    Format : liste d'entrées {"start", "end", "value"}, ou {"prices": [...]}.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+        if mtime == known_mtime:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        _LOGGER.warning("Fichier de prix illisible: %s", err)
+        return None
+    if isinstance(content, dict):
+        content = content.get("prices", [])
+    return mtime, parse_price_series(content)
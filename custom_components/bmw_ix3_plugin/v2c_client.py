@@ -0,0 +1,155 @@
+"""Client HTTP local pour la borne V2C Trydan."""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+# Délais des requêtes (secondes) : la borne est sur le réseau local, une
+# réponse lente signifie en pratique une borne injoignable
+CONNECT_TIMEOUT = 2.0
+REQUEST_TIMEOUT = 5.0
+
+# Attente avant de retenter une borne injoignable (secondes, exponentielle)
+RETRY_BACKOFF_MIN = 5.0
+RETRY_BACKOFF_MAX = 300.0
+
+# États de charge Trydan (clé "ChargeState")
+CHARGE_STATE_DISCONNECTED = 0
+CHARGE_STATE_CONNECTED = 1
+CHARGE_STATE_CHARGING = 2
+
+
+class V2CError(Exception):
+    """Erreur de communication avec la borne V2C."""
+
+
+class V2CConnectionError(V2CError):
+    """Borne V2C injoignable."""
+
+
+class V2CResponseError(V2CError):
+    """Réponse de la borne V2C invalide ou incomplète."""
+
+
+class V2CTrydanClient:
+    """Client de l'API HTTP locale Trydan (/RealTimeData, /write/Clé=Valeur).
+
+    Les requêtes passent par une session aiohttp partagée (connexions
+    keep-alive). Après un échec de connexion, les appels échouent
+    immédiatement jusqu'à la fin d'un délai d'attente exponentiel, pour ne
+    pas bloquer chaque mise à jour sur le délai de connexion.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, host: str, port: int = 80) -> None:
+        """Initialise le client."""
+        self._session = session
+        self._base_url = f"http://{host}:{port}" if port != 80 else f"http://{host}"
+        self._timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._last_data: Optional[Dict[str, Any]] = None
+        self._last_read = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Indique si la borne a répondu à la dernière requête."""
+        return self._backoff == 0.0
+
+    async def async_get_status(self, max_age: float = 0.0) -> Dict[str, Any]:
+        """Lit l'état temps réel de la borne.
+
+        Une lecture plus récente que max_age secondes est réutilisée sans
+        requête réseau.
+        """
+        if self._last_data is not None and time.monotonic() - self._last_read < max_age:
+            return self._last_data
+
+        raw = await self._async_request("/RealTimeData")
+        if not isinstance(raw, dict):
+            raise V2CResponseError(f"Réponse RealTimeData inattendue: {raw!r}")
+
+        try:
+            self._last_data = _parse_realtime_data(raw)
+        except (TypeError, ValueError) as err:
+            raise V2CResponseError(f"Réponse RealTimeData invalide: {err}") from err
+        self._last_read = time.monotonic()
+        return self._last_data
+
+    async def async_get_charging_power(self) -> float:
+        """Lecture rapide de la puissance de charge (kW)."""
+        return (await self.async_get_status())["charging_power"]
+
+    async def async_set_paused(self, paused: bool) -> None:
+        """Suspend ou reprend la charge."""
+        await self._async_write("Paused", 1 if paused else 0)
+
+    async def async_set_intensity(self, amps: int) -> None:
+        """Règle le courant de charge (A)."""
+        await self._async_write("Intensity", int(amps))
+
+    async def _async_write(self, key: str, value: int) -> None:
+        """Écrit un registre de la borne."""
+        await self._async_request(f"/write/{key}={value}", expect_json=False)
+        # La prochaine lecture doit refléter l'écriture
+        self._last_data = None
+
+    async def _async_request(self, path: str, expect_json: bool = True) -> Any:
+        """Requête GET avec délais courts et échec rapide si la borne est injoignable."""
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise V2CConnectionError(
+                f"Borne V2C injoignable, nouvel essai dans {self._retry_at - now:.0f} s"
+            )
+
+        try:
+            async with self._session.get(
+                f"{self._base_url}{path}", timeout=self._timeout
+            ) as response:
+                response.raise_for_status()
+                if expect_json:
+                    # Le Trydan ne renvoie pas toujours le bon Content-Type
+                    result = await response.json(content_type=None)
+                else:
+                    result = await response.text()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+            self._backoff = min(max(self._backoff * 2, RETRY_BACKOFF_MIN), RETRY_BACKOFF_MAX)
+            self._retry_at = time.monotonic() + self._backoff
+            raise V2CConnectionError(f"Borne V2C injoignable: {err}") from err
+        except (aiohttp.ClientError, ValueError) as err:
+            raise V2CError(f"Erreur de la borne V2C: {err}") from err
+
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        return result
+
+
+def _parse_realtime_data(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Extrait les valeurs utilisées par le plugin de la réponse RealTimeData.
+
+    Lève TypeError ou ValueError si une valeur n'est pas numérique ; le
+    compteur d'énergie vaut None si la borne ne le fournit pas.
+    """
+    charge_state = int(raw.get("ChargeState", CHARGE_STATE_DISCONNECTED))
+    paused = bool(int(raw.get("Paused", 0)))
+
+    charge_energy = raw.get("ChargeEnergy")
+
+    if charge_state == CHARGE_STATE_CHARGING and not paused:
+        status = "CHARGING"
+    elif charge_state == CHARGE_STATE_DISCONNECTED:
+        status = "DISCONNECTED"
+    else:
+        status = "READY"
+
+    return {
+        "status": status,
+        "charging_enabled": not paused,
+        "charging_power": round(float(raw.get("ChargePower", 0.0)) / 1000.0, 2),  # W → kW
+        "charging_current": int(raw.get("Intensity", 0)),
+        "charge_energy": float(charge_energy) if charge_energy is not None else None,  # kWh
+        "connected": charge_state != CHARGE_STATE_DISCONNECTED,
+    }
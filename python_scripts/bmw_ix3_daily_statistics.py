@@ -1,6 +1,10 @@
 """
 Script Python pour générer les statistiques quotidiennes de charge
 pour BMW iX3
+
+Les statistiques réelles sont tenues par l'intégration : capteurs
+sensor.bmw_ix3_charge_du_jour (semaine, mois) et statistiques à long terme
+bmw_ix3_plugin:charging_energy, charging_cost, etc.
 """
 import datetime
 import logging
@@ -0,0 +1,26 @@
+"""Configuration commune des tests : chemin du composant et instance Home Assistant."""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+
+@pytest.fixture
+def run_hass(tmp_path):
+    """Exécute une coroutine test(hass) avec une instance Home Assistant temporaire."""
+    from homeassistant.core import HomeAssistant
+
+    def run(test):
+        async def main():
+            hass = HomeAssistant(str(tmp_path))
+            try:
+                return await test(hass)
+            finally:
+                await hass.async_stop(force=True)
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,191 @@
+"""Tests de l'arrêt automatique : estimation du SOC et planification des vérifications."""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from bmw_ix3_plugin import auto_stop
+from bmw_ix3_plugin.auto_stop import AUTO_STOP_MAX_CHECK, AutoStopController
+from bmw_ix3_plugin.const import BATTERY_CAPACITY, CHARGE_EFFICIENCY
+from bmw_ix3_plugin.v2c_client import _parse_realtime_data
+
+# SOC gagné par kWh délivré par la borne
+SOC_PER_KWH = CHARGE_EFFICIENCY / BATTERY_CAPACITY * 100.0
+
+
+class FakeClock:
+    """Horloge monotone pilotée par le test."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(auto_stop.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def controller(clock):
+    coordinator = SimpleNamespace(hass=None, v2c_client=None)
+    stopper = AutoStopController(coordinator)
+    stopper._reference_soc = 50.0
+    stopper._reference_time = clock.now
+    return stopper
+
+
+def realtime(power_w, charge_energy=None):
+    """Réponse RealTimeData de la borne (ChargeEnergy omis si None)."""
+    raw = {"ChargeState": 2, "ChargePower": power_w, "Intensity": 16, "Paused": 0, "Locked": 0}
+    if charge_energy is not None:
+        raw["ChargeEnergy"] = charge_energy
+    return _parse_realtime_data(raw)
+
+
+def test_parse_without_charge_energy():
+    assert realtime(7400)["charge_energy"] is None
+    assert realtime(7400, 1.5)["charge_energy"] == 1.5
+
+
+def test_counter_present(controller, clock):
+    clock.now += 600  # 10 min à 7.4 kW avant la première lecture
+    first = controller._estimate_soc(realtime(7400, 3.0))
+    integrated = 7.4 * 600 / 3600
+    assert first == pytest.approx(50.0 + integrated * SOC_PER_KWH)
+
+    # Le compteur fait foi ensuite, même si la puissance instantanée diffère
+    clock.now += 600
+    soc = controller._estimate_soc(realtime(3000, 5.0))
+    assert soc == pytest.approx(50.0 + (integrated + 2.0) * SOC_PER_KWH)
+
+
+def test_counter_absent(controller, clock):
+    clock.now += 1800
+    soc = controller._estimate_soc(realtime(7400))
+    assert soc == pytest.approx(50.0 + 7.4 * 0.5 * SOC_PER_KWH)
+
+    clock.now += 1800
+    soc = controller._estimate_soc(realtime(7400))
+    assert soc == pytest.approx(50.0 + 7.4 * SOC_PER_KWH)
+
+
+@pytest.mark.parametrize("charge_energy", [0.0, 12.0])
+def test_counter_stuck_falls_back_to_integration(controller, clock, charge_energy):
+    # Compteur à zéro ou figé : le SOC doit continuer d'avancer
+    estimates = []
+    for _ in range(3):
+        clock.now += 900
+        estimates.append(controller._estimate_soc(realtime(7400, charge_energy)))
+    assert estimates[0] < estimates[1] < estimates[2]
+    assert estimates[-1] == pytest.approx(50.0 + 7.4 * 0.75 * SOC_PER_KWH)
+
+
+def test_counter_reset_takes_new_reference(controller, clock):
+    clock.now += 600
+    controller._estimate_soc(realtime(7400, 8.0))
+    clock.now += 600
+    # Compteur remis à zéro : nouvelle référence, pas de SOC en recul
+    soc = controller._estimate_soc(realtime(7400, 0.5))
+    assert soc >= 50.0
+
+
+def test_check_reschedules_on_malformed_response(controller):
+    async def failing_status():
+        raise TypeError("réponse inattendue")
+
+    delays = []
+    controller.coordinator.v2c_client = SimpleNamespace(async_get_status=failing_status)
+    controller._schedule_check = delays.append
+    asyncio.run(controller._async_check(None))
+    assert delays == [AUTO_STOP_MAX_CHECK]
+
+
+class FakeTimers:
+    """Remplace async_call_later : minuteries déclenchées par le test."""
+
+    def __init__(self, clock) -> None:
+        self.clock = clock
+        self.pending = []
+
+    def __call__(self, _hass, delay, action):
+        entry = [self.clock.now + delay, action]
+        self.pending.append(entry)
+        return lambda: self.pending.remove(entry)
+
+    def run_until(self, moment) -> None:
+        """Avance l'horloge jusqu'à moment en déclenchant les minuteries échues."""
+        while self.pending and min(entry[0] for entry in self.pending) <= moment:
+            entry = min(self.pending, key=lambda item: item[0])
+            self.pending.remove(entry)
+            self.clock.now = entry[0]
+            asyncio.run(entry[1](None))
+        self.clock.now = moment
+
+
+def theoretical_seconds(soc, target, power_kw):
+    """Temps de charge théorique, identique à l'intégration du contrôleur."""
+    return (target - soc) / 100.0 * BATTERY_CAPACITY / CHARGE_EFFICIENCY / power_kw * 3600
+
+
+@pytest.fixture
+def charging(monkeypatch, clock):
+    """Contrôleur branché sur un coordinateur et une borne simulés (7.4 kW)."""
+    timers = FakeTimers(clock)
+    monkeypatch.setattr(auto_stop, "async_call_later", timers)
+    stops = []
+
+    async def get_status():
+        return realtime(7400)
+
+    async def control_v2c_charging(enabled):
+        stops.append(clock.now)
+        return True
+
+    coordinator = SimpleNamespace(
+        hass=None,
+        data={"bmw": {"battery_level": 50.0, "charging_status": "CHARGING"}},
+        auto_stop_enabled=True,
+        v2c_client=SimpleNamespace(async_get_status=get_status),
+        effective_power=lambda bmw_data: 7.4,
+        get_charge_time=lambda soc, target, power_kw: theoretical_seconds(soc, target, power_kw) / 60,
+        control_v2c_charging=control_v2c_charging,
+    )
+    return SimpleNamespace(controller=AutoStopController(coordinator), timers=timers, stops=stops)
+
+
+def test_stale_soc_updates_keep_predicted_stop(charging, clock):
+    start = clock.now
+    crossing = start + theoretical_seconds(50.0, 80.0, 7.4)
+    charging.controller._handle_update()
+
+    # Mises à jour sans nouveau relevé BMW, y compris pendant les vérifications rapprochées
+    moment = start
+    while not charging.stops and moment < crossing + 600:
+        moment += 240
+        charging.timers.run_until(moment)
+        charging.controller._handle_update()
+        if not charging.stops:
+            remaining = (charging.controller.predicted_stop - datetime.now()).total_seconds()
+            assert remaining == pytest.approx(crossing - clock.now, abs=5)
+
+    assert charging.stops
+    assert crossing <= charging.stops[0] <= crossing + AUTO_STOP_MAX_CHECK
+
+
+def test_power_dip_keeps_checking(charging, clock, monkeypatch):
+    controller = charging.controller
+    controller._reference_soc = 50.0
+    controller._reference_time = clock.now
+
+    async def paused_status():
+        return realtime(0)
+
+    monkeypatch.setattr(controller.coordinator.v2c_client, "async_get_status", paused_status)
+    asyncio.run(controller._async_check(None))
+    assert [entry[0] for entry in charging.timers.pending] == [clock.now + AUTO_STOP_MAX_CHECK]
@@ -0,0 +1,55 @@
+"""Tests du chargement de l'apprentissage et des statistiques."""
+from datetime import datetime, timedelta
+
+from bmw_ix3_plugin import charge_learning, charge_statistics
+from bmw_ix3_plugin.charge_learning import PENDING_RECORDS_LIMIT, ChargeLearning
+from bmw_ix3_plugin.charge_statistics import ChargeStatistics
+from bmw_ix3_plugin.tariff_planner import TariffPlanner
+
+
+def failing_read(*_args):
+    raise RuntimeError("disque indisponible")
+
+
+def test_learning_load_failure_starts_empty(run_hass, monkeypatch):
+    monkeypatch.setattr(charge_learning, "_load_learning_files", failing_read)
+
+    async def test(hass):
+        learning = ChargeLearning(hass, "test")
+        start = datetime(2026, 10, 17, 22, 0)
+        for minute in range(3):
+            learning.record_charging_data(40 + minute, 60, 7.4, 80, "CHARGING", start + timedelta(minutes=minute))
+        await learning.async_load()
+        assert learning.loaded
+        # Les points reçus pendant le chargement sont rejoués
+        assert learning.current_session is not None
+        assert len(learning.current_session) == 3
+        await learning.async_shutdown()
+
+    run_hass(test)
+
+
+def test_pending_records_are_capped(run_hass):
+    async def test(hass):
+        learning = ChargeLearning(hass, "test")
+        start = datetime(2026, 10, 17, 22, 0)
+        for minute in range(PENDING_RECORDS_LIMIT + 10):
+            learning.record_charging_data(40, 60, 7.4, 80, "CHARGING", start + timedelta(minutes=minute))
+        assert len(learning._pending_records) == PENDING_RECORDS_LIMIT
+        assert learning._pending_records[0][-1] == start + timedelta(minutes=10)
+        await learning.async_shutdown()
+
+    run_hass(test)
+
+
+def test_statistics_load_failure_starts_empty(run_hass, monkeypatch):
+    monkeypatch.setattr(charge_statistics, "read_json", failing_read)
+
+    async def test(hass):
+        statistics = ChargeStatistics(hass, "test", TariffPlanner(hass, {}))
+        await statistics.async_load()
+        assert statistics.loaded
+        assert statistics.rollups == {period: {} for period in charge_statistics.PERIODS}
+        await statistics.async_shutdown()
+
+    run_hass(test)
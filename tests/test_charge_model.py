@@ -0,0 +1,111 @@
+"""Tests du modèle de charge : quantiles en flux et courbe par tranche de SOC."""
+import random
+
+import pytest
+
+from bmw_ix3_plugin.charge_model import (
+    RATE_EXTRAPOLATION,
+    SKETCH_EXACT,
+    QuantileSketch,
+    RateCurve,
+)
+
+
+def exact_quantile(values, probability):
+    ordered = sorted(values)
+    return QuantileSketch._exact(ordered, probability)
+
+
+def test_sketch_is_exact_up_to_buffer():
+    values = [float(value) for value in range(SKETCH_EXACT)]
+    random.Random(1).shuffle(values)
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    for probability in (0.1, 0.5, 0.9):
+        assert sketch.quantile(probability) == exact_quantile(values, probability)
+
+
+@pytest.mark.parametrize("count", [200, 2000])
+@pytest.mark.parametrize("drift", [0.0, 0.1])
+def test_sketch_accuracy_past_buffer(count, drift):
+    # Énergie par % bruitée, stable ou en lente hausse (vieillissement de la batterie)
+    generator = random.Random(7)
+    values = [generator.gauss(1.5, 0.2) + drift * index / count for index in range(count)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    spread = exact_quantile(values, 0.9) - exact_quantile(values, 0.1)
+    for probability in (0.1, 0.5, 0.9):
+        assert sketch.quantile(probability) == pytest.approx(exact_quantile(values, probability), abs=0.05 * spread)
+    assert sketch.quantile(0.0) == min(values)
+    assert sketch.quantile(1.0) == max(values)
+
+
+def test_sketch_round_trip():
+    sketch = QuantileSketch()
+    for value in range(100):
+        sketch.add(float(value))
+    restored = QuantileSketch(*sketch.as_list())
+    restored.add(50.0)
+    sketch.add(50.0)
+    assert restored.as_list() == sketch.as_list()
+
+
+def constant_curve(soc_from, soc_to, energy_per_percent, power_kw=7.4):
+    """Courbe apprise sur des intervalles de 1 % à énergie constante."""
+    curve = RateCurve()
+    minutes = energy_per_percent * 60.0 / power_kw
+    for soc in range(soc_from, soc_to):
+        curve.add((soc, soc + 1, minutes, power_kw))
+    return curve
+
+
+def test_energy_is_prefix_difference():
+    curve = constant_curve(20, 60, 0.8)
+    assert curve.energy(30, 50) == pytest.approx(16.0)
+    assert curve.energy(30.5, 31.25) == pytest.approx(0.6)
+    assert curve.energy(50, 30) == 0.0
+
+
+def test_energy_extrapolates_a_few_bins_only():
+    curve = constant_curve(20, 60, 0.8)
+    assert curve.energy(50, 60 + RATE_EXTRAPOLATION) == pytest.approx(0.8 * (10 + RATE_EXTRAPOLATION))
+    assert curve.energy(50, 60 + RATE_EXTRAPOLATION + 1) is None
+    assert curve.energy(20 - RATE_EXTRAPOLATION, 25) == pytest.approx(0.8 * (5 + RATE_EXTRAPOLATION))
+
+
+def test_gap_between_observed_bins_is_interpolated():
+    curve = constant_curve(20, 30, 0.8)
+    for soc in range(40, 50):
+        curve.add((soc, soc + 1, 1.0 * 60.0 / 7.4, 7.4))
+    # Tranches 30 à 39 interpolées linéairement de 0.8 à 1.0
+    expected = sum(0.8 + 0.2 * (index - 29) / 11 for index in range(30, 40))
+    assert curve.energy(30, 40) == pytest.approx(expected)
+
+
+def test_prefix_cache_follows_updates():
+    curve = constant_curve(20, 60, 0.8)
+    before = curve.energy(30, 40)
+    for _ in range(10):
+        curve.add((35, 36, 2.0 * 60.0 / 7.4, 7.4))
+    assert curve.energy(30, 40) > before
+
+
+def test_quantile_statistics_are_ordered():
+    generator = random.Random(3)
+    curve = RateCurve()
+    for _ in range(60):
+        energy_per_percent = generator.uniform(0.6, 1.0)
+        for soc in range(20, 60):
+            curve.add((soc, soc + 1, energy_per_percent * 60.0 / 7.4, 7.4))
+    p10, p50, p90 = (curve.energy(30, 50, statistic) for statistic in ("p10", "p50", "p90"))
+    assert p10 < p50 < p90
+    assert p50 == pytest.approx(20 * 0.8, rel=0.1)
+
+
+def test_curve_round_trip():
+    curve = constant_curve(20, 60, 0.8)
+    restored = RateCurve.from_dict(curve.as_dict())
+    assert restored.energy(25, 55) == pytest.approx(curve.energy(25, 55))
+    assert restored.energy(25, 55, "p90") == pytest.approx(curve.energy(25, 55, "p90"))
@@ -0,0 +1,86 @@
+"""Tests des statistiques de charge publiées à long terme."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from bmw_ix3_plugin import charge_statistics
+from bmw_ix3_plugin.charge_session import ChargeSession, to_epoch
+from bmw_ix3_plugin.charge_statistics import ChargeStatistics
+from bmw_ix3_plugin.tariff_planner import TariffPlanner
+
+PRICED_WINDOWS = {"tariff_windows": "22:00-06:00=0.17, 06:00-22:00=0.25"}
+RELATIVE_WINDOWS = {"tariff_windows": "22:00-06:00"}
+
+
+def make_session(start, hours, start_soc=30.0, soc_per_hour=10.0):
+    """Session terminée de 7 kW, un point par heure."""
+    session = ChargeSession("7kw", "7kw", 80.0, 7.4, to_epoch(start), start_soc)
+    for hour in range(hours + 1):
+        session.append(start + timedelta(hours=hour), start_soc + hour * soc_per_hour, None, 7.4)
+    session.complete(start + timedelta(hours=hours))
+    return session
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Statistiques externes publiées : {statistic_id: {heure: (état, somme)}}, unités."""
+    rows, units = {}, {}
+
+    def add_external_statistics(_hass, metadata, statistics):
+        units[metadata["statistic_id"]] = metadata["unit_of_measurement"]
+        series = rows.setdefault(metadata["statistic_id"], {})
+        for row in statistics:
+            series[row["start"].replace(tzinfo=None)] = (row["state"], row["sum"])
+
+    monkeypatch.setattr(charge_statistics, "async_add_external_statistics", add_external_statistics)
+    return rows, units
+
+
+def run_statistics(run_hass, config, sessions):
+    """Ajoute les sessions dans l'ordre donné et retourne les cumuls."""
+
+    async def test(hass):
+        hass.config.components.add("recorder")
+        statistics = ChargeStatistics(hass, "test", TariffPlanner(hass, config))
+        await statistics.async_load()
+        for session in sessions:
+            statistics.add_session(session)
+        await statistics.async_shutdown()
+        return statistics
+
+    return run_hass(test)
+
+
+def test_imported_sessions_reach_long_term_statistics(run_hass, published):
+    rows, _ = published
+    live = make_session(datetime(2026, 10, 10, 22, 0), 3)
+    imported = make_session(datetime(2026, 10, 5, 22, 0), 2)
+    statistics = run_statistics(run_hass, PRICED_WINDOWS, [live, imported])
+
+    energy = rows["bmw_ix3_plugin:charging_energy"]
+    sessions = rows["bmw_ix3_plugin:charging_sessions"]
+    # Heures de la session importée publiées, sommes des heures suivantes décalées
+    assert datetime(2026, 10, 5, 22, 0) in energy
+    assert sessions[datetime(2026, 10, 5, 22, 0)] == (1.0, 1.0)
+    assert sessions[datetime(2026, 10, 10, 22, 0)] == (1.0, 2.0)
+    last_hour = max(energy)
+    assert energy[last_hour][1] == pytest.approx(
+        sum(rollup["energy_kwh"] for rollup in statistics.rollups["day"].values())
+    )
+    # Sommes croissantes dans l'ordre des heures
+    totals = [energy[hour][1] for hour in sorted(energy)]
+    assert totals == sorted(totals)
+
+
+def test_relative_tariff_skips_cost_statistic(run_hass, published):
+    rows, _ = published
+    run_statistics(run_hass, RELATIVE_WINDOWS, [make_session(datetime(2026, 10, 10, 22, 0), 2)])
+    assert "bmw_ix3_plugin:charging_energy" in rows
+    assert "bmw_ix3_plugin:charging_cost" not in rows
+
+
+def test_priced_tariff_publishes_cost_in_currency(run_hass, published):
+    rows, units = published
+    run_statistics(run_hass, PRICED_WINDOWS, [make_session(datetime(2026, 10, 10, 22, 0), 2)])
+    assert "bmw_ix3_plugin:charging_cost" in rows
+    assert units["bmw_ix3_plugin:charging_cost"] is not None
@@ -0,0 +1,80 @@
+"""Tests de la classification et du suivi des entités BMW."""
+import pytest
+from homeassistant.helpers import entity_registry as er
+
+from bmw_ix3_plugin import entity_index
+from bmw_ix3_plugin.entity_index import (
+    PRIORITY_LAST_KNOWN,
+    PRIORITY_OTHER,
+    ROLE_BATTERY_LEVEL,
+    BMWEntityIndex,
+    classify_entity,
+    is_bmw_entity,
+)
+
+
+@pytest.mark.parametrize(
+    ("name", "role", "priority"),
+    [
+        ("iX3 State of Charge (last known)", ROLE_BATTERY_LEVEL, PRIORITY_LAST_KNOWN),
+        ("iX3 State of Charge predicted", ROLE_BATTERY_LEVEL, PRIORITY_OTHER),
+        ("iX3 HV Charging Status", "charging_status", 0),
+        ("iX3 Predicted charge speed", "charging_power", 0),
+        ("iX3 Charging time remaining", "charging_time_remaining", 0),
+        ("iX3 Target charge", "target_soc", 0),
+        ("iX3 Forecast electric range", "range_electric", 0),
+        ("iX3 Mileage", None, 0),
+    ],
+)
+def test_classify_entity(name, role, priority):
+    assert classify_entity(name) == (role, priority)
+
+
+def test_is_bmw_entity():
+    assert is_bmw_entity("sensor.bmw_ix3_state_of_charge")
+    assert is_bmw_entity("sensor.CarData_soc")
+    assert not is_bmw_entity("sensor.kitchen_temperature")
+
+
+def test_registry_added_entity_is_classified(run_hass, monkeypatch):
+    classified = []
+    monkeypatch.setattr(
+        entity_index, "is_bmw_entity",
+        lambda entity_id: classified.append(entity_id) or entity_id.startswith("sensor.ix3"),
+    )
+
+    async def test(hass):
+        await er.async_load(hass)
+        registry = er.async_get(hass)
+        index = BMWEntityIndex(hass)
+        index.async_start()
+        notified = []
+        index.async_add_listener(lambda: notified.append(True))
+
+        # Entité enregistrée puis publiée par son intégration
+        entry = registry.async_get_or_create("sensor", "cardata", "vin-soc", suggested_object_id="ix3_soc")
+        hass.states.async_set(entry.entity_id, 50, {"friendly_name": "iX3 State of Charge"})
+        await hass.async_block_till_done()
+        assert index.entities_for_role(ROLE_BATTERY_LEVEL) == [entry.entity_id]
+        assert notified
+
+        # Mises à jour d'une entité étrangère : classée une seule fois, à son ajout
+        for value in range(5):
+            hass.states.async_set("sensor.kitchen_temperature", value)
+        await hass.async_block_till_done()
+        assert classified.count("sensor.kitchen_temperature") == 1
+
+        # Renommage dans le registre : l'index suit le nouvel entity_id
+        registry.async_update_entity(entry.entity_id, new_entity_id="sensor.ix3_battery")
+        hass.states.async_remove(entry.entity_id)
+        hass.states.async_set("sensor.ix3_battery", 51, {"friendly_name": "iX3 State of Charge"})
+        await hass.async_block_till_done()
+        assert index.entities_for_role(ROLE_BATTERY_LEVEL) == ["sensor.ix3_battery"]
+
+        # Suppression du registre
+        registry.async_remove("sensor.ix3_battery")
+        await hass.async_block_till_done()
+        assert index.entities_for_role(ROLE_BATTERY_LEVEL) == []
+        index.async_stop()
+
+    run_hass(test)
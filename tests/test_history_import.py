@@ -0,0 +1,113 @@
+"""Tests du découpage en sessions de l'historique importé."""
+from datetime import datetime, timedelta
+
+from homeassistant.const import COMPRESSED_STATE_LAST_UPDATED, COMPRESSED_STATE_STATE
+
+from bmw_ix3_plugin import history_import
+from bmw_ix3_plugin.charge_learning import SESSION_RESUME_GAP
+from bmw_ix3_plugin.history_import import SessionSegmenter, _import_chunk
+
+ROLE_ENTITIES = {
+    "battery_level": ["sensor.ix3_state_of_charge"],
+    "charging_status": ["sensor.ix3_charging_status"],
+    "charging_power": ["sensor.ix3_charging_power"],
+}
+START = datetime(2026, 10, 17, 20, 0)
+
+
+def charging_changes(start, minutes, start_soc=40.0, status="CHARGING"):
+    """Lectures BMW d'une charge à 7.4 kW, une par 10 minutes (1 % par lecture)."""
+    changes = [
+        (start, "sensor.ix3_charging_status", status),
+        (start, "sensor.ix3_charging_power", "7.4"),
+    ]
+    for step in range(0, minutes + 1, 10):
+        changes.append((start + timedelta(minutes=step), "sensor.ix3_state_of_charge", str(start_soc + step / 10)))
+    return sorted(changes)
+
+
+def stop_change(moment):
+    return [(moment, "sensor.ix3_charging_status", "NOT_CHARGING")]
+
+
+def test_session_split_across_chunks_is_one_session():
+    changes = charging_changes(START, 180) + stop_change(START + timedelta(minutes=190))
+    middle = START + timedelta(minutes=95)
+    segmenter = SessionSegmenter(ROLE_ENTITIES)
+    first = segmenter.process([change for change in changes if change[0] < middle])
+    assert first == []
+    assert segmenter.session is not None
+
+    sessions = segmenter.process([change for change in changes if change[0] >= middle])
+    assert len(sessions) == 1
+    session = sessions[0]
+    assert session.start_time == START
+    assert session.end_time == START + timedelta(minutes=190)
+    assert session.soc_gained == 18.0
+
+
+def test_session_resumes_from_saved_state():
+    # Import interrompu entre deux morceaux : l'état de reprise garde la session ouverte
+    changes = charging_changes(START, 120) + stop_change(START + timedelta(minutes=130))
+    middle = START + timedelta(minutes=65)
+    segmenter = SessionSegmenter(ROLE_ENTITIES)
+    segmenter.process([change for change in changes if change[0] < middle])
+
+    resumed = SessionSegmenter(ROLE_ENTITIES)
+    resumed.restore(segmenter.state())
+    sessions = resumed.process([change for change in changes if change[0] >= middle])
+    assert len(sessions) == 1
+    assert sessions[0].start_time == START
+    assert sessions[0].soc_gained == 12.0
+
+
+def test_resume_gap_splits_sessions():
+    restart = START + timedelta(minutes=60) + SESSION_RESUME_GAP + timedelta(minutes=10)
+    changes = sorted(
+        charging_changes(START, 60)
+        + [(restart + timedelta(minutes=step), "sensor.ix3_state_of_charge", str(50 + step / 10))
+           for step in range(0, 61, 10)]
+        + stop_change(restart + timedelta(minutes=70))
+    )
+    sessions = SessionSegmenter(ROLE_ENTITIES).process(changes)
+    assert len(sessions) == 2
+    # La première session se termine à son dernier point, pas à la reprise
+    assert sessions[0].end_time == START + timedelta(minutes=60)
+    assert sessions[1].start_time == restart
+
+
+def test_unavailable_status_does_not_end_session():
+    changes = sorted(
+        charging_changes(START, 60)
+        + [(START + timedelta(minutes=25), "sensor.ix3_charging_status", "unavailable"),
+           (START + timedelta(minutes=35), "sensor.ix3_charging_status", "CHARGING")]
+        + stop_change(START + timedelta(minutes=70))
+    )
+    sessions = SessionSegmenter(ROLE_ENTITIES).process(changes)
+    assert len(sessions) == 1
+
+
+def test_import_chunk_reads_recorder_rows(monkeypatch):
+    changes = charging_changes(START, 180) + stop_change(START + timedelta(minutes=190))
+
+    def get_significant_states(_hass, start, end, entity_ids, **_kwargs):
+        rows = {}
+        for moment, entity_id, state in changes:
+            timestamp = moment.timestamp()
+            if entity_id in entity_ids and start.timestamp() <= timestamp < end.timestamp():
+                rows.setdefault(entity_id, []).append(
+                    {COMPRESSED_STATE_LAST_UPDATED: timestamp, COMPRESSED_STATE_STATE: state}
+                )
+        return rows
+
+    monkeypatch.setattr(history_import.history, "get_significant_states", get_significant_states)
+    segmenter = SessionSegmenter(ROLE_ENTITIES)
+    sessions = []
+    chunk_start = START - timedelta(hours=1)
+    while chunk_start < START + timedelta(hours=5):
+        chunk_end = chunk_start + timedelta(hours=1)
+        sessions += _import_chunk(None, segmenter, chunk_start, chunk_end, False)
+        chunk_start = chunk_end
+    assert len(sessions) == 1
+    assert sessions[0].start_time == START
+    assert sessions[0].soc_gained == 18.0
@@ -0,0 +1,62 @@
+"""Tests du choix des créneaux de charge les moins chers."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from bmw_ix3_plugin.tariff_planner import SLOT_MINUTES, parse_tariff_windows, plan_cheapest_slots
+
+START = datetime(2026, 10, 17, 22, 0)
+
+
+def make_slots(prices):
+    """Créneaux consécutifs de SLOT_MINUTES aux prix donnés."""
+    step = timedelta(minutes=SLOT_MINUTES)
+    return [(START + index * step, START + (index + 1) * step, price) for index, price in enumerate(prices)]
+
+
+def test_cheapest_slots_are_chosen():
+    plan = plan_cheapest_slots(make_slots([0.3, 0.1, 0.2, 0.1, 0.3]), 30, 7.0)
+    assert plan.periods == (
+        (START + timedelta(minutes=15), START + timedelta(minutes=30)),
+        (START + timedelta(minutes=45), START + timedelta(minutes=60)),
+    )
+    assert plan.cost == pytest.approx(0.1 * 7.0 * 0.5)
+    assert plan.feasible
+
+
+def test_tied_prices_prefer_latest_slots():
+    # À prix égal, charger au plus tard (le plus près du départ)
+    plan = plan_cheapest_slots(make_slots([0.2] * 8), 45, 7.0)
+    assert plan.periods == ((START + timedelta(minutes=75), START + timedelta(minutes=120)),)
+    assert plan.energy_kwh == pytest.approx(7.0 * 0.75)
+
+
+def test_tied_prices_after_cheaper_slot():
+    plan = plan_cheapest_slots(make_slots([0.2, 0.1, 0.2, 0.2]), 30, 7.0)
+    assert plan.periods == (
+        (START + timedelta(minutes=15), START + timedelta(minutes=30)),
+        (START + timedelta(minutes=45), START + timedelta(minutes=60)),
+    )
+
+
+def test_partial_slot_uses_its_end():
+    plan = plan_cheapest_slots(make_slots([0.1, 0.3]), 10, 7.0)
+    assert plan.periods == ((START + timedelta(minutes=5), START + timedelta(minutes=15)),)
+    assert plan.required_minutes == 10
+
+
+def test_adjacent_slots_are_merged():
+    plan = plan_cheapest_slots(make_slots([0.1, 0.1, 0.1, 0.5]), 45, 7.0)
+    assert plan.periods == ((START, START + timedelta(minutes=45)),)
+
+
+def test_shortfall_when_slots_are_insufficient():
+    plan = plan_cheapest_slots(make_slots([0.1, 0.2]), 60, 7.0)
+    assert not plan.feasible
+    assert plan.shortfall_minutes == pytest.approx(30)
+    assert plan.energy_kwh == pytest.approx(3.5)
+
+
+def test_parse_tariff_windows():
+    windows = parse_tariff_windows("22:00-06:00, 12:00-14:00=0.15; invalide")
+    assert [(start.hour, end.hour, price) for start, end, price in windows] == [(22, 6, 0.0), (12, 14, 0.15)]